@@ -125,7 +125,7 @@ class AsistenciaOwnerOrAdminOJefeMixin(BaseRolMixin):
 
         # JEFE puede acceder si el trabajador pertenece a su unidad
         if es_jefe(user):
-            if asistencia.trabajador.unidad == perfil.trabajador.unidad:
+            if asistencia.unidad_id == perfil.trabajador.unidad_id:
                 return True
 
         return False
@@ -155,7 +155,7 @@ class IncidenciaOwnerOrAdminOJefeMixin(BaseRolMixin):
             return True
 
         if es_jefe(user):
-            if incidencia.trabajador.unidad == perfil.trabajador.unidad:
+            if incidencia.unidad_id == perfil.trabajador.unidad_id:
                 return True
 
         return False
@@ -1,5 +1,16 @@
-from django.contrib import admin
-from .models import RegistroAsistencia
+import io
+
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import ImportarAsistenciasForm
+from .importacion import ImportadorAsistencias, leer_filas
+from .models import (
+    RegistroAsistencia, ResumenDiario, KardexMensual, RecalculoPendiente, TerminalChecador,
+    MarcajeTerminal,
+)
 
 @admin.register(RegistroAsistencia)
 class RegistroAsistenciaAdmin(admin.ModelAdmin):
@@ -21,7 +32,7 @@ class RegistroAsistenciaAdmin(admin.ModelAdmin):
     list_filter = (
         'estatus',
         'fecha',
-        'trabajador__unidad',
+        'unidad',
         'incidencia'
     )
 
@@ -33,3 +44,135 @@ class RegistroAsistenciaAdmin(admin.ModelAdmin):
 
     ordering = ('-fecha',)
     list_per_page = 20
+
+    change_list_template = 'admin/attendance/registroasistencia/change_list.html'
+
+    def save_model(self, request, obj, form, change):
+        # Guardar desde el admin corrige el registro aunque no se haya tocado
+        # ningún campo (ej. después de cambiar el calendario o la jornada)
+        obj.save(recalcular=True)
+
+    def get_urls(self):
+        urls = [
+            path(
+                'importar/',
+                self.admin_site.admin_view(self.importar_view),
+                name='attendance_registroasistencia_importar',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def importar_view(self, request):
+        """Carga masiva de checadas (CSV / JSON) sin pasar por save() fila por fila."""
+        if not self.has_add_permission(request):
+            return redirect('admin:attendance_registroasistencia_changelist')
+
+        form = ImportarAsistenciasForm(request.POST or None, request.FILES or None)
+
+        if request.method == 'POST' and form.is_valid():
+            archivo = form.cleaned_data['archivo']
+            stream = io.TextIOWrapper(archivo.file, encoding='utf-8-sig', newline='')
+
+            importador = ImportadorAsistencias(
+                tam_lote=form.cleaned_data['lote'],
+                usuario=request.user,
+            )
+            resultado = importador.importar(leer_filas(stream, form.cleaned_data['formato']))
+
+            messages.success(request, resultado.resumen())
+            for error in resultado.errores[:20]:
+                messages.warning(request, error)
+
+            return redirect('admin:attendance_registroasistencia_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Importar asistencias',
+            'form': form,
+        }
+        return TemplateResponse(
+            request, 'admin/attendance/registroasistencia/importar.html', context
+        )
+
+
+@admin.register(ResumenDiario)
+class ResumenDiarioAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'unidad', 'estatus', 'total', 'minutos_retardo', 'horas_trabajadas')
+    list_filter = ('estatus', 'unidad')
+    date_hierarchy = 'fecha'
+    ordering = ('-fecha',)
+
+    # Tabla derivada: se mantiene sola o con `reconstruir_resumen`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(KardexMensual)
+class KardexMensualAdmin(admin.ModelAdmin):
+    list_display = (
+        'trabajador', 'mes', 'unidad', 'dias_registrados', 'asistencias', 'retardos',
+        'faltas', 'justificados', 'minutos_retardo', 'horas_trabajadas',
+    )
+    list_filter = ('unidad',)
+    date_hierarchy = 'mes'
+    search_fields = ('trabajador__nombre', 'trabajador__apellido_paterno', 'trabajador__numero_empleado')
+    ordering = ('-mes',)
+
+    # Tabla derivada: se mantiene sola o con `reconstruir_kardex`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RecalculoPendiente)
+class RecalculoPendienteAdmin(admin.ModelAdmin):
+    list_display = ('motivo', 'trabajador', 'fecha_inicio', 'fecha_fin', 'creado_en', 'procesado_en', 'registros_cambiados')
+    list_filter = ('procesado_en',)
+    ordering = ('-creado_en',)
+
+
+@admin.register(TerminalChecador)
+class TerminalChecadorAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'identificador', 'activo', 'ultimo_uso')
+    list_filter = ('activo',)
+    search_fields = ('nombre', 'identificador')
+    readonly_fields = ('ultimo_uso',)
+    actions = ['regenerar_token']
+
+    def save_model(self, request, obj, form, change):
+        token = None if change else obj.asignar_token()
+        super().save_model(request, obj, form, change)
+        if token:
+            messages.warning(
+                request,
+                f"Token de {obj.identificador}: {token} — cópielo ahora, no se volverá a mostrar.",
+            )
+
+    @admin.action(description="Regenerar token de las terminales seleccionadas")
+    def regenerar_token(self, request, queryset):
+        for terminal in queryset:
+            token = terminal.asignar_token()
+            terminal.save(update_fields=['token_hash'])
+            messages.warning(request, f"Nuevo token de {terminal.identificador}: {token}")
+
+
+@admin.register(MarcajeTerminal)
+class MarcajeTerminalAdmin(admin.ModelAdmin):
+    list_display = ('terminal', 'trabajador', 'marcado_en', 'resultado', 'clave', 'recibido_en')
+    list_filter = ('resultado', 'terminal')
+    search_fields = ('clave', 'trabajador__numero_empleado')
+    date_hierarchy = 'fecha'
+    ordering = ('-recibido_en',)
+
+    # Bitácora: solo lectura
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AttendanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'attendance'
+
+    def ready(self):
+        # Mantiene ResumenDiario al guardar o eliminar asistencias
+        import attendance.signals
@@ -0,0 +1,227 @@
+# attendance/checadas.py
+# Registro de checadas enviadas por relojes checadores (API JSON)
+#
+# Un lote de checadas se procesa con un número fijo de consultas sin importar
+# su tamaño: claves ya recibidas, trabajadores, registros del día y jornadas
+# se leen una vez; los registros se escriben con bulk_create / bulk_update.
+#
+# Regla por trabajador y día: la checada más temprana es la entrada y la
+# más tardía (si es posterior) es la salida.
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.calendario import calendario
+from workers.jornadas import JornadaTimeline
+from workers.models import Trabajador
+from .models import MarcajeTerminal, RegistroAsistencia, TerminalChecador, calcular_resultado
+from .signals import notificar_cambios
+
+
+MAX_CHECADAS_POR_LOTE = getattr(settings, 'ASISTENCIA_API_MAX_CHECADAS', 1000)
+
+CAMPOS_ACTUALIZABLES = [
+    'hora_entrada',
+    'hora_salida',
+    'estatus',
+    'minutos_retardo',
+    'horas_trabajadas',
+    'updated_at',
+]
+
+
+class ChecadaInvalida(ValueError):
+    pass
+
+
+def autenticar_terminal(request):
+    """Regresa el TerminalChecador del header `Authorization: Token <token>` o None."""
+    encabezado = request.headers.get('Authorization', '')
+    tipo, _, token = encabezado.partition(' ')
+    if tipo.lower() != 'token' or not token.strip():
+        return None
+
+    return (
+        TerminalChecador.objects
+        .filter(token_hash=TerminalChecador.hash_token(token.strip()), activo=True)
+        .first()
+    )
+
+
+def _normalizar(checada):
+    if not isinstance(checada, dict):
+        raise ChecadaInvalida("la checada debe ser un objeto")
+
+    clave = str(checada.get('clave') or '').strip()
+    if not clave or len(clave) > 100:
+        raise ChecadaInvalida("clave de idempotencia requerida (máx. 100 caracteres)")
+
+    numero = str(checada.get('numero_empleado') or '').strip()
+    if not numero:
+        raise ChecadaInvalida("numero_empleado requerido")
+
+    marcado_en = parse_datetime(str(checada.get('marcado_en') or ''))
+    if marcado_en is None:
+        raise ChecadaInvalida("marcado_en inválido (ISO 8601)")
+    if timezone.is_naive(marcado_en):
+        marcado_en = timezone.make_aware(marcado_en)
+
+    dispositivo = str(checada.get('dispositivo') or '')[:50]
+    return clave, numero, marcado_en, dispositivo
+
+
+def registrar_checadas(terminal, checadas):
+    """
+    Procesa un lote y regresa una lista de resultados en el mismo orden:
+    {'clave', 'estado': 'registrada' | 'duplicada' | 'error', ...}.
+    """
+    try:
+        return _registrar(terminal, checadas)
+    except IntegrityError:
+        # Otro lote creó el mismo registro del día al mismo tiempo:
+        # se reintenta una vez leyendo el estado actual.
+        return _registrar(terminal, checadas)
+
+
+@transaction.atomic
+def _registrar(terminal, checadas):
+    resultados = [None] * len(checadas)
+    validas = []  # (indice, clave, numero, marcado_en, dispositivo)
+
+    for i, checada in enumerate(checadas):
+        try:
+            clave, numero, marcado_en, dispositivo = _normalizar(checada)
+        except ChecadaInvalida as e:
+            clave = checada.get('clave') if isinstance(checada, dict) else None
+            resultados[i] = {'clave': clave, 'estado': 'error', 'error': str(e)}
+            continue
+        validas.append((i, clave, numero, marcado_en, dispositivo))
+
+    # 1. Claves ya recibidas por esta terminal
+    recibidas = set(
+        MarcajeTerminal.objects
+        .filter(terminal=terminal, clave__in=[v[1] for v in validas])
+        .values_list('clave', flat=True)
+    )
+
+    # 2. Trabajadores
+    trabajadores, unidades = {}, {}
+    for numero, trabajador_id, unidad_id in (
+        Trabajador.objects
+        .filter(numero_empleado__in={v[2] for v in validas}, activo=True)
+        .values_list('numero_empleado', 'id', 'unidad_id')
+    ):
+        trabajadores[numero] = trabajador_id
+        unidades[trabajador_id] = unidad_id
+
+    nuevas = []  # (indice, clave, trabajador_id, hora local, dispositivo)
+    claves_lote = set()
+    for i, clave, numero, marcado_en, dispositivo in validas:
+        if clave in recibidas or clave in claves_lote:
+            resultados[i] = {'clave': clave, 'estado': 'duplicada'}
+            continue
+        trabajador_id = trabajadores.get(numero)
+        if trabajador_id is None:
+            resultados[i] = {'clave': clave, 'estado': 'error', 'error': f"trabajador '{numero}' no encontrado"}
+            continue
+        claves_lote.add(clave)
+        nuevas.append((i, clave, trabajador_id, timezone.localtime(marcado_en), dispositivo))
+
+    if not nuevas:
+        return resultados
+
+    # 3. Registros existentes y jornadas de los días involucrados
+    por_dia = {}
+    for _, _, trabajador_id, local, _ in nuevas:
+        por_dia.setdefault((trabajador_id, local.date()), []).append(local.time().replace(microsecond=0))
+
+    trabajador_ids = {t for t, _ in por_dia}
+    fechas = {f for _, f in por_dia}
+    existentes = {
+        (r.trabajador_id, r.fecha): r
+        for r in RegistroAsistencia.objects.filter(trabajador_id__in=trabajador_ids, fecha__in=fechas)
+    }
+    jornadas = JornadaTimeline.cargar(trabajador_ids, min(fechas), max(fechas))
+
+    ahora = timezone.now()
+    crear, actualizar, antes, registros = [], [], {}, {}
+
+    for (trabajador_id, fecha), horas in por_dia.items():
+        registro = existentes.get((trabajador_id, fecha))
+        if registro is None:
+            registro = RegistroAsistencia(
+                trabajador_id=trabajador_id, unidad_id=unidades[trabajador_id], fecha=fecha
+            )
+            crear.append(registro)
+        else:
+            actualizar.append(registro)
+        registros[(trabajador_id, fecha)] = registro
+        antes[(trabajador_id, fecha)] = (registro.hora_entrada, registro.hora_salida)
+
+        marcas = horas + [h for h in (registro.hora_entrada, registro.hora_salida) if h]
+        entrada, ultima = min(marcas), max(marcas)
+        registro.hora_entrada = entrada
+        registro.hora_salida = ultima if ultima > entrada else registro.hora_salida
+
+        estatus, minutos, horas_trab = calcular_resultado(
+            fecha,
+            registro.hora_entrada,
+            registro.hora_salida,
+            tiene_incidencia=bool(registro.incidencia_id),
+            inhabil=calendario.es_inhabil(fecha),
+            jornada=jornadas.jornada(trabajador_id, fecha),
+        )
+        registro.estatus = estatus
+        registro.minutos_retardo = minutos
+        registro.horas_trabajadas = Decimal(str(horas_trab))
+        registro.updated_at = ahora
+
+    # 4. Escritura
+    RegistroAsistencia.objects.bulk_create(crear)
+    RegistroAsistencia.objects.bulk_update(actualizar, CAMPOS_ACTUALIZABLES)
+
+    marcajes = []
+    for i, clave, trabajador_id, local, dispositivo in nuevas:
+        fecha = local.date()
+        registro = registros[(trabajador_id, fecha)]
+        hora = local.time().replace(microsecond=0)
+        entrada_antes, salida_antes = antes[(trabajador_id, fecha)]
+
+        if hora == registro.hora_entrada and hora != entrada_antes:
+            resultado = 'ENTRADA'
+        elif hora == registro.hora_salida and hora != salida_antes:
+            resultado = 'SALIDA'
+        else:
+            resultado = 'SIN_CAMBIO'
+
+        marcajes.append(MarcajeTerminal(
+            terminal=terminal,
+            clave=clave,
+            dispositivo=dispositivo or terminal.identificador,
+            trabajador_id=trabajador_id,
+            marcado_en=local,
+            fecha=fecha,
+            resultado=resultado,
+        ))
+        resultados[i] = {
+            'clave': clave,
+            'estado': 'registrada',
+            'resultado': resultado,
+            'registro': {
+                'fecha': fecha.isoformat(),
+                'hora_entrada': registro.hora_entrada.isoformat() if registro.hora_entrada else None,
+                'hora_salida': registro.hora_salida.isoformat() if registro.hora_salida else None,
+                'estatus': registro.estatus,
+                'minutos_retardo': registro.minutos_retardo,
+            },
+        }
+
+    MarcajeTerminal.objects.bulk_create(marcajes)
+    TerminalChecador.objects.filter(pk=terminal.pk).update(ultimo_uso=ahora)
+
+    notificar_cambios((r.trabajador_id, r.unidad_id, r.fecha) for r in registros.values())
+    return resultados
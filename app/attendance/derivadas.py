@@ -0,0 +1,26 @@
+# attendance/derivadas.py
+# Reemplazo de filas de las tablas derivadas de RegistroAsistencia
+#
+# ResumenDiario (attendance/resumen.py) y KardexMensual (attendance/kardex.py)
+# se mantienen igual: para las claves tocadas se bloquean (core/bloqueos.py),
+# se borran sus filas y se vuelven a agregar desde los registros. Cada módulo
+# solo define cómo agrupa y cómo construye sus filas.
+#
+# Las claves se juntan por transacción (attendance/signals.py, core/lotes.py)
+# y se recalculan una vez al confirmarla, no en cada save().
+
+from core.bloqueos import bloquear_claves
+
+
+def reemplazar(modelo, filas, nuevas, espacio=None, claves=(), batch_size=None):
+    """
+    Borra `filas` (queryset de `modelo`) e inserta `nuevas`. Con `espacio`,
+    antes toma el candado de cada una de `claves`. `nuevas` debe ser un
+    generador sobre un queryset: se agrega ya con los candados tomados.
+    Regresa las insertadas.
+    """
+    if espacio is not None:
+        bloquear_claves(espacio, claves)
+
+    filas.delete()
+    return len(modelo.objects.bulk_create(nuevas, batch_size=batch_size))
@@ -0,0 +1,246 @@
+# attendance/en_vivo.py
+# Tablero en vivo del día por unidad (server-sent events)
+#
+# Cada proceso ASGI tiene un solo `tablero` con el estado del día de las
+# unidades que alguien está viendo. Los clientes no consultan la base de
+# datos: reciben el estado guardado al conectarse y después solo los
+# trabajadores que cambiaron. Por unidad y por proceso se hace una consulta
+# cuando hay cambios, sin importar cuántos navegadores estén conectados.
+#
+# Origen de los cambios:
+# - En este proceso, `asistencias_modificadas` (al confirmar la transacción)
+#   avisa al tablero de inmediato.
+# - Escrituras de otros procesos (otro worker, terminales, comandos) renuevan
+#   un sello por unidad en el cache de Django; una sola tarea por proceso
+#   revisa esos sellos cada INTERVALO_SEGUNDOS (sin tocar la base de datos).
+
+import asyncio
+import contextvars
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import FilteredRelation, Q
+from django.utils import timezone
+
+from workers.models import Trabajador
+
+
+INTERVALO_SEGUNDOS = getattr(settings, 'TABLERO_INTERVALO_SEGUNDOS', 2)
+
+# Comentario SSE para que proxies y navegador no cierren la conexión
+LATIDO_SEGUNDOS = 15
+
+# Eventos pendientes por cliente; si se llena (cliente lento) se le manda el
+# estado completo en lugar de acumular cambios
+MAX_EVENTOS = 100
+
+PREFIJO = 'attendance:tablero'
+
+
+def _clave_sello(unidad_id):
+    return f'{PREFIJO}:{unidad_id}'
+
+
+def renovar_sellos(unidades):
+    sello = time.time_ns()
+    cache.set_many({_clave_sello(u): sello for u in unidades}, timeout=None)
+    return sello
+
+
+# ============================================================
+# ESTADO DE UNA UNIDAD (una consulta)
+# ============================================================
+
+def _estado(estatus, hora_entrada):
+    if estatus == 'RETARDO':
+        return 'RETARDO'
+    if hora_entrada is not None:
+        return 'PRESENTE'
+    if estatus in ('JUSTIFICADA', 'INHABIL'):
+        return 'JUSTIFICADO'
+    return 'PENDIENTE'
+
+
+def estado_unidad(unidad_id, fecha):
+    """{trabajador_id: fila} de los trabajadores activos de la unidad en `fecha`."""
+    filas = (
+        Trabajador.objects
+        .filter(unidad_id=unidad_id, activo=True)
+        .annotate(del_dia=FilteredRelation('asistencias', condition=Q(asistencias__fecha=fecha)))
+        .values_list(
+            'pk', 'nombre', 'apellido_paterno', 'numero_empleado',
+            'del_dia__hora_entrada', 'del_dia__estatus',
+        )
+        .order_by('apellido_paterno', 'nombre', 'pk')
+    )
+    return {
+        pk: {
+            'id': pk,
+            'nombre': f"{nombre or ''} {apellido or ''}".strip(),
+            'numero_empleado': numero or '',
+            'estado': _estado(estatus, entrada),
+            'hora_entrada': entrada.strftime('%H:%M') if entrada else None,
+        }
+        for pk, nombre, apellido, numero, entrada, estatus in filas
+    }
+
+
+# ============================================================
+# TABLERO (uno por proceso)
+# ============================================================
+
+class Tablero:
+    """
+    Eventos que reciben los clientes (tipo, datos):
+    - ('inicial', [filas]): estado completo del día
+    - ('cambios', {'filas': [...], 'quitar': [ids]}): solo lo que cambió
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._clientes = {}      # unidad_id -> set de asyncio.Queue
+        self._estados = {}       # unidad_id -> (fecha, {trabajador_id: fila})
+        self._sellos = {}        # unidad_id -> sello del cache con que se leyó
+        self._candados = {}      # unidad_id -> asyncio.Lock
+        self._programadas = set()
+        self._vigilante = None
+
+    # --------------------------------------------------
+    # Clientes (dentro del event loop)
+    # --------------------------------------------------
+
+    async def suscribir(self, unidad_id):
+        """Regresa (cola de eventos, filas del estado actual)."""
+        self._loop = asyncio.get_running_loop()
+        cola = asyncio.Queue(MAX_EVENTOS)
+        self._clientes.setdefault(unidad_id, set()).add(cola)
+
+        if self._vigilante is None or self._vigilante.done():
+            self._vigilante = self._loop.create_task(self._vigilar())
+
+        fecha, filas = self._estados.get(unidad_id, (None, None))
+        if fecha != timezone.localdate():
+            await self._refrescar(unidad_id)
+            fecha, filas = self._estados[unidad_id]
+        return cola, list(filas.values())
+
+    def cancelar(self, unidad_id, cola):
+        clientes = self._clientes.get(unidad_id)
+        if clientes is not None:
+            clientes.discard(cola)
+            if not clientes:
+                # Sin nadie viéndola no se mantiene su estado
+                del self._clientes[unidad_id]
+                self._estados.pop(unidad_id, None)
+                self._sellos.pop(unidad_id, None)
+
+    # --------------------------------------------------
+    # Avisos de cambios
+    # --------------------------------------------------
+
+    def notificar(self, unidades):
+        """Desde cualquier hilo (receptores de señales)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        # Contexto limpio: el del hilo de la vista marcaría a las tareas como
+        # ejecutándose dentro de sync_to_async y no podrían consultar la base
+        loop.call_soon_threadsafe(self._programar, set(unidades), context=contextvars.Context())
+
+    def _programar(self, unidades):
+        for unidad_id in unidades:
+            # Varios avisos seguidos se resuelven con un solo refresco
+            if unidad_id in self._clientes and unidad_id not in self._programadas:
+                self._programadas.add(unidad_id)
+                self._loop.create_task(self._refrescar(unidad_id))
+
+    async def _vigilar(self):
+        """Única tarea del proceso que revisa los sellos de las unidades vistas."""
+        while self._clientes:
+            await asyncio.sleep(INTERVALO_SEGUNDOS)
+            unidades = list(self._clientes)
+            sellos = await sync_to_async(cache.get_many)([_clave_sello(u) for u in unidades])
+            hoy = timezone.localdate()
+            self._programar([
+                u for u in unidades
+                if sellos.get(_clave_sello(u)) != self._sellos.get(u)
+                or self._estados.get(u, (None,))[0] != hoy
+            ])
+
+    async def _refrescar(self, unidad_id):
+        candado = self._candados.setdefault(unidad_id, asyncio.Lock())
+        async with candado:
+            self._programadas.discard(unidad_id)
+            if unidad_id not in self._clientes:
+                return
+
+            hoy = timezone.localdate()
+            # El sello se lee antes que los datos: un cambio posterior vuelve a refrescar
+            sello = await sync_to_async(cache.get)(_clave_sello(unidad_id))
+            nuevo = await sync_to_async(estado_unidad)(unidad_id, hoy)
+            if unidad_id not in self._clientes:
+                return
+            self._sellos[unidad_id] = sello
+
+            fecha, anterior = self._estados.get(unidad_id, (None, {}))
+            self._estados[unidad_id] = (hoy, nuevo)
+
+            if fecha is None:
+                return
+            if fecha != hoy:
+                self._enviar(unidad_id, ('inicial', list(nuevo.values())))
+                return
+
+            cambios = [fila for pk, fila in nuevo.items() if anterior.get(pk) != fila]
+            quitar = [pk for pk in anterior if pk not in nuevo]
+            if cambios or quitar:
+                self._enviar(unidad_id, ('cambios', {'filas': cambios, 'quitar': quitar}))
+
+    def _enviar(self, unidad_id, evento):
+        for cola in self._clientes.get(unidad_id, ()):
+            try:
+                cola.put_nowait(evento)
+            except asyncio.QueueFull:
+                while not cola.empty():
+                    cola.get_nowait()
+                cola.put_nowait(('inicial', list(self._estados[unidad_id][1].values())))
+
+
+tablero = Tablero()
+
+
+def cambios_confirmados(unidades):
+    """Receptor (al confirmar): avisa a otros procesos y al tablero de este."""
+    unidades = set(unidades) - {None}
+    if not unidades:
+        return
+    renovar_sellos(unidades)
+    tablero.notificar(unidades)
+
+
+# ============================================================
+# STREAM SSE
+# ============================================================
+
+def evento_sse(tipo, datos):
+    return f"event: {tipo}\ndata: {json.dumps(datos, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def eventos_unidad(unidad_id):
+    """Iterador asíncrono para StreamingHttpResponse(content_type='text/event-stream')."""
+    cola, filas = await tablero.suscribir(unidad_id)
+    try:
+        yield evento_sse('inicial', filas)
+        while True:
+            try:
+                tipo, datos = await asyncio.wait_for(cola.get(), LATIDO_SEGUNDOS)
+            except asyncio.TimeoutError:
+                yield ": latido\n\n"
+                continue
+            yield evento_sse(tipo, datos)
+    finally:
+        tablero.cancelar(unidad_id, cola)
@@ -0,0 +1,183 @@
+# attendance/faltas.py
+# Generación masiva de faltas para trabajadores que no checaron
+#
+# calcular_estatus() solo puede marcar FALTA cuando el registro ya existe.
+# Este proceso crea los registros faltantes: para cada día del rango toma a
+# los trabajadores activos con jornada vigente en un día laborable, sin
+# incidencia aprobada y sin registro, y los inserta en bloque.
+# Todo se resuelve con un número fijo de consultas, sin importar el rango.
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.calendario import calendario
+from incidents.models import Incidencia
+from workers.jornadas import JornadaTimeline
+from workers.models import Trabajador
+from .models import RegistroAsistencia
+from .signals import notificar_cambios
+
+
+LOTE_POR_DEFECTO = getattr(settings, 'ASISTENCIA_FALTAS_LOTE', 5000)
+
+
+class ResultadoFaltas:
+
+    def __init__(self, fi, ff):
+        self.fi = fi
+        self.ff = ff
+        self.creadas = 0
+        self.segundos = 0.0
+
+    def resumen(self):
+        return (
+            f"{self.creadas} faltas generadas del {self.fi} al {self.ff} "
+            f"en {self.segundos:.2f}s."
+        )
+
+
+def rango_fechas(fi, ff):
+    actual = fi
+    while actual <= ff:
+        yield actual
+        actual += timedelta(days=1)
+
+
+def _fechas_con_incidencia(trabajadores, fi, ff):
+    """(trabajador_id, fecha) cubiertos por una incidencia APROBADA."""
+    cubiertas = set()
+    incidencias = (
+        Incidencia.objects
+        .filter(
+            trabajador__in=trabajadores,
+            estatus='APROBADA',
+            fecha_inicio__lte=ff,
+            fecha_fin__gte=fi,
+        )
+        .values_list('trabajador_id', 'fecha_inicio', 'fecha_fin')
+    )
+    for trabajador_id, inicio, fin in incidencias:
+        for dia in rango_fechas(max(inicio, fi), min(fin, ff)):
+            cubiertas.add((trabajador_id, dia))
+    return cubiertas
+
+
+def faltas_pendientes(fi, ff):
+    """
+    Calcula (sin escribir) los pares (trabajador_id, fecha) que deben
+    registrarse como FALTA en el rango [fi, ff].
+    """
+    activos = Trabajador.objects.filter(activo=True).values('id')
+
+    jornadas = JornadaTimeline.cargar(activos, fi, ff)
+    if not jornadas.trabajadores():
+        return []
+
+    inhabiles = set(calendario.inhabiles_en_rango(fi, ff))
+    justificadas = _fechas_con_incidencia(activos, fi, ff)
+    registradas = set(
+        RegistroAsistencia.objects
+        .filter(trabajador__in=activos, fecha__range=(fi, ff))
+        .values_list('trabajador_id', 'fecha')
+    )
+
+    laborables = {}  # jornada_id -> días de la semana
+    pendientes = []
+
+    for trabajador_id in jornadas.trabajadores():
+        for inicio, fin, jornada in jornadas.segmentos(trabajador_id, fi, ff):
+            if jornada is None:
+                continue
+
+            if jornada.pk not in laborables:
+                laborables[jornada.pk] = jornada.dias_laborables()
+            dias_semana = laborables[jornada.pk]
+
+            for dia in rango_fechas(inicio, fin):
+                if dia in inhabiles or dia.weekday() not in dias_semana:
+                    continue
+
+                clave = (trabajador_id, dia)
+                if clave in registradas or clave in justificadas:
+                    continue
+
+                pendientes.append(clave)
+
+    return pendientes
+
+
+def _insertar_faltas(pendientes, unidades, tam_lote):
+    """
+    INSERT de varias filas por sentencia con SQL directo: con cientos de miles
+    de faltas, instanciar modelos y preparar cada valor con el ORM domina el
+    tiempo total. Las fechas se adaptan una sola vez por día distinto.
+    ON CONFLICT DO NOTHING (PostgreSQL y SQLite ≥ 3.24): si alguien checa
+    mientras corre el proceso, su registro prevalece sobre la falta.
+    """
+    ops = connection.ops
+    tabla = ops.quote_name(RegistroAsistencia._meta.db_table)
+    columnas = [
+        'trabajador_id', 'unidad_id', 'fecha', 'estatus', 'minutos_retardo',
+        'horas_trabajadas', 'created_at', 'updated_at',
+    ]
+    ahora = ops.adapt_datetimefield_value(timezone.now())
+    horas = ops.adapt_decimalfield_value(Decimal('0'), 5, 2)
+    fechas = {}
+    insertadas = 0
+
+    # SQLite limita el número de parámetros por sentencia
+    tam_lote = min(tam_lote, ops.bulk_batch_size(columnas, pendientes))
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(pendientes), tam_lote):
+            lote = pendientes[i:i + tam_lote]
+            params = []
+            for trabajador_id, fecha in lote:
+                if fecha not in fechas:
+                    fechas[fecha] = ops.adapt_datefield_value(fecha)
+                params.extend((
+                    trabajador_id, unidades.get(trabajador_id), fechas[fecha],
+                    'FALTA', 0, horas, ahora, ahora,
+                ))
+
+            fila = '(' + ', '.join(['%s'] * len(columnas)) + ')'
+            cursor.execute(
+                f"INSERT INTO {tabla} ({', '.join(map(ops.quote_name, columnas))}) "
+                f"VALUES {', '.join([fila] * len(lote))} "
+                f"ON CONFLICT DO NOTHING",
+                params,
+            )
+            insertadas += cursor.rowcount
+
+    return insertadas
+
+
+def generar_faltas(fi, ff, tam_lote=None, simular=False):
+    """
+    Inserta en bloque los registros FALTA del rango [fi, ff].
+    Con `simular=True` solo cuenta cuántos se crearían.
+    """
+    inicio = time.monotonic()
+    resultado = ResultadoFaltas(fi, ff)
+
+    pendientes = faltas_pendientes(fi, ff)
+
+    if simular or not pendientes:
+        resultado.creadas = len(pendientes)
+    else:
+        unidades = dict(
+            Trabajador.objects.filter(activo=True).values_list('id', 'unidad_id')
+        )
+        with transaction.atomic():
+            resultado.creadas = _insertar_faltas(
+                pendientes, unidades, tam_lote or LOTE_POR_DEFECTO
+            )
+            notificar_cambios((t, unidades.get(t), f) for t, f in pendientes)
+
+    resultado.segundos = time.monotonic() - inicio
+    return resultado
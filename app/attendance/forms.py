@@ -2,6 +2,7 @@ from django import forms
 from core.models import CalendarioLaboral
 from core.forms import ColoredFormMixin
 from .models import RegistroAsistencia
+from .importacion import LOTE_POR_DEFECTO
 
 
 class AsistenciaAdminForm(ColoredFormMixin, forms.ModelForm):
@@ -49,3 +50,22 @@ class AsistenciaTrabajadorForm(ColoredFormMixin, forms.ModelForm):
             raise forms.ValidationError("La hora de salida debe ser posterior a la hora de entrada.")
 
         return data
+
+
+class ImportarAsistenciasForm(forms.Form):
+    """
+    Carga de archivo de checadas desde el admin.
+    Columnas: numero_empleado, fecha, hora_entrada, hora_salida.
+    """
+    FORMATOS = [
+        ('csv', 'CSV'),
+        ('json', 'JSON / JSON Lines'),
+    ]
+
+    archivo = forms.FileField(label="Archivo")
+    formato = forms.ChoiceField(choices=FORMATOS, initial='csv')
+    lote = forms.IntegerField(
+        label="Filas por lote",
+        min_value=1,
+        initial=LOTE_POR_DEFECTO,
+    )
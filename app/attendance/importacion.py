@@ -0,0 +1,345 @@
+# attendance/importacion.py
+# Importación masiva de registros de asistencia (checadores / relojes)
+#
+# Evita el camino RegistroAsistencia.save() fila por fila: el calendario,
+# las jornadas y los registros existentes se resuelven una vez por lote,
+# los cálculos se hacen en memoria con las mismas reglas del modelo y la
+# escritura se hace con bulk_create / bulk_update.
+
+import csv
+import json
+import time
+from datetime import date, time as dtime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+
+from core.calendario import calendario
+from workers.jornadas import JornadaTimeline
+from workers.models import Trabajador
+from .models import RegistroAsistencia, calcular_resultado
+from .signals import notificar_cambios
+
+
+LOTE_POR_DEFECTO = getattr(settings, 'ASISTENCIA_IMPORTACION_LOTE', 2000)
+
+CAMPOS_ACTUALIZABLES = [
+    'hora_entrada',
+    'hora_salida',
+    'estatus',
+    'minutos_retardo',
+    'horas_trabajadas',
+    'updated_at',
+    'updated_by',
+]
+
+MAX_ERRORES_REPORTADOS = 100
+
+# Caracteres máximos de un objeto del JSON: si con más que esto no se ha
+# podido decodificar, el archivo está mal formado y no se sigue leyendo
+MAX_OBJETO_JSON = 1024 * 1024
+
+
+class ErrorFila(ValueError):
+    """Fila del archivo que no se puede interpretar."""
+
+
+class ErrorArchivo(ValueError):
+    """El archivo no se puede seguir leyendo (JSON mal formado, no es UTF-8...)."""
+
+
+class ResultadoImportacion:
+    """Contadores de una importación, para el comando y para el admin."""
+
+    def __init__(self):
+        self.filas = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.omitidos = 0
+        self.lotes = 0
+        self.errores = []
+        self.segundos = 0.0
+
+    @property
+    def filas_por_segundo(self):
+        if not self.segundos:
+            return 0
+        return round(self.filas / self.segundos, 1)
+
+    def agregar_error(self, linea, mensaje):
+        self.omitidos += 1
+        if len(self.errores) < MAX_ERRORES_REPORTADOS:
+            self.errores.append(f"Fila {linea}: {mensaje}")
+
+    def agregar_error_archivo(self, filas_leidas, mensaje):
+        # No cuenta como omitida: las filas siguientes no se pudieron leer
+        self.errores.append(
+            f"Archivo: {mensaje}; se detuvo la lectura después de {filas_leidas} filas"
+        )
+
+    def resumen(self):
+        return (
+            f"{self.filas} filas en {self.segundos:.2f}s "
+            f"({self.filas_por_segundo} filas/s): "
+            f"{self.creados} creadas, {self.actualizados} actualizadas, "
+            f"{self.omitidos} omitidas, {self.lotes} lotes."
+        )
+
+
+# ============================================================
+# LECTURA DEL ARCHIVO (streaming)
+# ============================================================
+
+def leer_csv(stream):
+    """Itera filas de un CSV con encabezados (numero_empleado, fecha, hora_entrada, hora_salida)."""
+    try:
+        for fila in csv.DictReader(stream):
+            yield {k.strip(): (v or '').strip() for k, v in fila.items() if k}
+    except UnicodeDecodeError:
+        raise ErrorArchivo("el archivo no está en UTF-8")
+    except csv.Error as e:
+        raise ErrorArchivo(f"CSV inválido ({e})")
+
+
+def leer_json(stream, tam_bloque=65536, max_objeto=MAX_OBJETO_JSON):
+    """
+    Itera objetos de un arreglo JSON o de un archivo JSON Lines sin cargar
+    todo el archivo en memoria. Lanza ErrorArchivo si el documento está mal
+    formado (o un objeto pasa de `max_objeto` caracteres) o no es UTF-8.
+    """
+    decoder = json.JSONDecoder()
+    separadores = ' \t\r\n,[]'
+    buffer = ''
+    pos = 0
+    leidos = 0   # caracteres ya descartados del inicio del buffer
+    fin = False
+
+    while True:
+        # Saltar separadores del arreglo y espacios
+        while pos < len(buffer) and buffer[pos] in separadores:
+            pos += 1
+
+        if pos < len(buffer):
+            try:
+                obj, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if fin or len(buffer) - pos > max_objeto:
+                    raise ErrorArchivo(f"JSON inválido cerca del carácter {leidos + e.pos} ({e.msg})")
+            else:
+                yield obj
+                continue
+        elif fin:
+            return
+
+        # Objeto incompleto o buffer agotado: leer el siguiente bloque
+        try:
+            bloque = stream.read(tam_bloque)
+        except UnicodeDecodeError:
+            raise ErrorArchivo("el archivo no está en UTF-8")
+        fin = not bloque
+        leidos += pos
+        buffer = buffer[pos:] + bloque
+        pos = 0
+
+
+def leer_filas(stream, formato):
+    if formato == 'csv':
+        return leer_csv(stream)
+    if formato == 'json':
+        return leer_json(stream)
+    raise ValueError(f"Formato no soportado: {formato}")
+
+
+def _a_hora(valor):
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, dtime):
+        return valor
+    hora = parse_time(str(valor))
+    if hora is None:
+        raise ErrorFila(f"hora inválida '{valor}'")
+    return hora
+
+
+def _a_fecha(valor):
+    if isinstance(valor, date):
+        return valor
+    fecha = parse_date(str(valor or ''))
+    if fecha is None:
+        raise ErrorFila(f"fecha inválida '{valor}'")
+    return fecha
+
+
+def normalizar_fila(fila):
+    """Convierte una fila cruda en (numero_empleado, fecha, hora_entrada, hora_salida)."""
+    if not isinstance(fila, dict):
+        raise ErrorFila("la fila debe ser un objeto")
+
+    numero = str(fila.get('numero_empleado') or '').strip()
+    if not numero:
+        raise ErrorFila("falta numero_empleado")
+
+    return (
+        numero,
+        _a_fecha(fila.get('fecha')),
+        _a_hora(fila.get('hora_entrada')),
+        _a_hora(fila.get('hora_salida')),
+    )
+
+
+# ============================================================
+# RESOLUCIÓN POR LOTE
+# ============================================================
+
+def dias_inhabiles(fechas):
+    """Conjunto de fechas inhábiles dentro del lote (cache del calendario)."""
+    return {fecha for fecha in fechas if calendario.es_inhabil(fecha)}
+
+
+# ============================================================
+# IMPORTADOR
+# ============================================================
+
+class ImportadorAsistencias:
+    """
+    Importa filas en lotes de `tam_lote`.
+    Dentro de un lote, varias filas del mismo trabajador y fecha se combinan:
+    se conserva la entrada más temprana y la salida más tardía.
+    """
+
+    def __init__(self, tam_lote=None, usuario=None):
+        self.tam_lote = tam_lote or LOTE_POR_DEFECTO
+        self.usuario = usuario
+        self._trabajadores = {}  # numero_empleado -> id (cache entre lotes)
+        self._unidades = {}      # trabajador id -> unidad_id
+
+    def importar(self, filas):
+        """
+        Si el archivo deja de poder leerse a la mitad (ErrorArchivo), se
+        reporta en `errores` y se guardan las filas leídas hasta ahí.
+        """
+        resultado = ResultadoImportacion()
+        inicio = time.monotonic()
+
+        lote = {}
+        try:
+            for linea, fila in enumerate(filas, start=1):
+                resultado.filas += 1
+                try:
+                    numero, fecha, entrada, salida = normalizar_fila(fila)
+                except ErrorFila as e:
+                    resultado.agregar_error(linea, str(e))
+                    continue
+
+                clave = (numero, fecha)
+                previo = lote.get(clave)
+                if previo:
+                    entrada = min(filter(None, [previo[0], entrada]), default=None)
+                    salida = max(filter(None, [previo[1], salida]), default=None)
+                lote[clave] = (entrada, salida, linea)
+
+                if len(lote) >= self.tam_lote:
+                    self._procesar_lote(lote, resultado)
+                    lote = {}
+        except ErrorArchivo as e:
+            resultado.agregar_error_archivo(resultado.filas, str(e))
+
+        if lote:
+            self._procesar_lote(lote, resultado)
+
+        resultado.segundos = time.monotonic() - inicio
+        return resultado
+
+    def _resolver_trabajadores(self, numeros):
+        faltantes = [n for n in numeros if n not in self._trabajadores]
+        if faltantes:
+            for numero, trabajador_id, unidad_id in (
+                Trabajador.objects
+                .filter(numero_empleado__in=faltantes)
+                .values_list('numero_empleado', 'id', 'unidad_id')
+            ):
+                self._trabajadores[numero] = trabajador_id
+                self._unidades[trabajador_id] = unidad_id
+
+    @transaction.atomic
+    def _procesar_lote(self, lote, resultado):
+        resultado.lotes += 1
+
+        self._resolver_trabajadores({numero for numero, _ in lote})
+
+        filas = {}
+        for (numero, fecha), (entrada, salida, linea) in lote.items():
+            trabajador_id = self._trabajadores.get(numero)
+            if trabajador_id is None:
+                resultado.agregar_error(linea, f"trabajador '{numero}' no encontrado")
+                continue
+            filas[(trabajador_id, fecha)] = (entrada, salida)
+
+        if not filas:
+            return
+
+        trabajador_ids = {t for t, _ in filas}
+        fechas = {f for _, f in filas}
+        fi, ff = min(fechas), max(fechas)
+
+        inhabiles = dias_inhabiles(fechas)
+        jornadas = JornadaTimeline.cargar(trabajador_ids, fi, ff)
+        existentes = {
+            (r.trabajador_id, r.fecha): r
+            for r in RegistroAsistencia.objects.filter(
+                trabajador_id__in=trabajador_ids,
+                fecha__range=(fi, ff),
+            )
+            if (r.trabajador_id, r.fecha) in filas
+        }
+
+        ahora = timezone.now()
+        nuevos, modificados = [], []
+
+        for (trabajador_id, fecha), (entrada, salida) in filas.items():
+            registro = existentes.get((trabajador_id, fecha))
+            if registro is None:
+                registro = RegistroAsistencia(
+                    trabajador_id=trabajador_id,
+                    unidad_id=self._unidades.get(trabajador_id),
+                    fecha=fecha,
+                    created_by=self.usuario,
+                )
+                nuevos.append(registro)
+            else:
+                modificados.append(registro)
+
+            if entrada:
+                registro.hora_entrada = entrada
+            if salida:
+                registro.hora_salida = salida
+
+            estatus, minutos, horas = calcular_resultado(
+                fecha,
+                registro.hora_entrada,
+                registro.hora_salida,
+                tiene_incidencia=bool(registro.incidencia_id),
+                inhabil=fecha in inhabiles,
+                jornada=jornadas.jornada(trabajador_id, fecha),
+            )
+            registro.estatus = estatus
+            registro.minutos_retardo = minutos
+            registro.horas_trabajadas = Decimal(str(horas))
+            registro.updated_by = self.usuario
+            # bulk_update no aplica auto_now
+            registro.updated_at = ahora
+
+        RegistroAsistencia.objects.bulk_create(nuevos, batch_size=self.tam_lote)
+        RegistroAsistencia.objects.bulk_update(
+            modificados, CAMPOS_ACTUALIZABLES, batch_size=self.tam_lote
+        )
+
+        notificar_cambios(
+            (r.trabajador_id, r.unidad_id, r.fecha) for r in nuevos + modificados
+        )
+
+        resultado.creados += len(nuevos)
+        resultado.actualizados += len(modificados)
@@ -0,0 +1,116 @@
+# attendance/kardex.py
+# Mantenimiento de la tabla KardexMensual
+#
+# Igual que ResumenDiario (attendance/resumen.py, attendance/derivadas.py): al
+# confirmar una transacción se vuelven a agregar solo los (trabajador, mes) que
+# tocó, bloqueados antes de borrar para que dos transacciones concurrentes no
+# choquen en la restricción única ni dupliquen filas con unidad NULL. Las
+# incidencias llegan aquí a través de los registros que marcan
+# (Incidencia.aplicar_a_asistencia), así que no necesitan una señal propia.
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .derivadas import reemplazar
+from .models import KardexMensual, RegistroAsistencia
+
+
+# Trabajadores por consulta al recalcular un mes
+LOTE_TRABAJADORES = 1000
+
+
+def inicio_mes(fecha):
+    return date(fecha.year, fecha.month, 1)
+
+
+def _fin_mes(mes):
+    if mes.month == 12:
+        return date(mes.year + 1, 1, 1)
+    return date(mes.year, mes.month + 1, 1)
+
+
+def _agregados(registros):
+    return (
+        registros
+        .values('trabajador', 'unidad', mes_registro=TruncMonth('fecha'))
+        .annotate(
+            dias=Count('id'),
+            asistencias=Count('id', filter=Q(estatus__in=RegistroAsistencia.ESTADOS_ASISTIO)),
+            retardos=Count('id', filter=Q(estatus='RETARDO')),
+            faltas=Count('id', filter=Q(estatus='FALTA')),
+            justificados=Count('id', filter=Q(estatus='JUSTIFICADA')),
+            inhabiles=Count('id', filter=Q(estatus='INHABIL')),
+            minutos=Sum('minutos_retardo'),
+            horas=Sum('horas_trabajadas'),
+        )
+        .order_by()
+    )
+
+
+def _nuevos_kardex(agregados):
+    for fila in agregados:
+        mes = fila['mes_registro']
+        yield KardexMensual(
+            trabajador_id=fila['trabajador'],
+            unidad_id=fila['unidad'],
+            # Algunos motores regresan datetime al truncar
+            mes=inicio_mes(mes),
+            dias_registrados=fila['dias'],
+            asistencias=fila['asistencias'],
+            retardos=fila['retardos'],
+            faltas=fila['faltas'],
+            justificados=fila['justificados'],
+            inhabiles=fila['inhabiles'],
+            minutos_retardo=fila['minutos'] or 0,
+            horas_trabajadas=fila['horas'] or 0,
+        )
+
+
+@transaction.atomic
+def actualizar_kardex(claves):
+    """Recalcula el kárdex de las claves (trabajador_id, primer día del mes), una vez cada una."""
+    por_mes = {}
+    for trabajador_id, mes in claves:
+        por_mes.setdefault(mes, set()).add(trabajador_id)
+
+    for mes, trabajadores in por_mes.items():
+        trabajadores = sorted(trabajadores)
+        for i in range(0, len(trabajadores), LOTE_TRABAJADORES):
+            lote = trabajadores[i:i + LOTE_TRABAJADORES]
+
+            registros = RegistroAsistencia.objects.filter(
+                trabajador_id__in=lote, fecha__gte=mes, fecha__lt=_fin_mes(mes)
+            )
+            reemplazar(
+                KardexMensual,
+                KardexMensual.objects.filter(mes=mes, trabajador_id__in=lote),
+                _nuevos_kardex(_agregados(registros)),
+                espacio='kardex',
+                claves=[(t, mes) for t in lote],
+            )
+
+
+@transaction.atomic
+def reconstruir_kardex(fi=None, ff=None):
+    """
+    Reconstruye el kárdex completo, o solo los meses que tocan [fi, ff].
+    Regresa las filas creadas.
+    """
+    kardex = KardexMensual.objects.all()
+    registros = RegistroAsistencia.objects.all()
+
+    if fi:
+        fi = inicio_mes(fi)
+        kardex = kardex.filter(mes__gte=fi)
+        registros = registros.filter(fecha__gte=fi)
+    if ff:
+        ff = _fin_mes(inicio_mes(ff))
+        kardex = kardex.filter(mes__lt=ff)
+        registros = registros.filter(fecha__lt=ff)
+
+    return reemplazar(
+        KardexMensual, kardex, _nuevos_kardex(_agregados(registros)), batch_size=5000
+    )
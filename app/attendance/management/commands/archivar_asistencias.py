@@ -0,0 +1,37 @@
+# attendance/management/commands/archivar_asistencias.py
+# Desprende y archiva en disco las particiones de un año cerrado (PostgreSQL)
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.particiones import ParticionadoNoDisponible, archivar_anio
+
+
+class Command(BaseCommand):
+    help = (
+        "Desprende las particiones mensuales de un año cerrado, las guarda como "
+        "CSV comprimido (gzip) y las elimina de la base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('anio', type=int, help="Año a archivar (ej. 2023)")
+        parser.add_argument('--destino', help="Directorio de salida (ASISTENCIA_ARCHIVO_DIR por omisión)")
+        parser.add_argument(
+            '--conservar', action='store_true',
+            help="Dejar las particiones desprendidas como tablas en lugar de borrarlas",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            archivados = archivar_anio(
+                options['anio'], destino=options['destino'], conservar=options['conservar']
+            )
+        except (ParticionadoNoDisponible, ValueError) as e:
+            raise CommandError(str(e))
+
+        total = 0
+        for ruta, filas in archivados:
+            total += filas
+            self.stdout.write(f"  {ruta}: {filas} registros")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(archivados)} particiones de {options['anio']} archivadas ({total} registros)."
+        ))
@@ -0,0 +1,34 @@
+# attendance/management/commands/crear_particiones.py
+# Crea las particiones mensuales próximas de RegistroAsistencia (PostgreSQL)
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.particiones import ParticionadoNoDisponible, crear_particiones
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea las particiones mensuales que falten desde --desde (hoy por omisión) "
+        "hasta --meses-adelante. Pensado para ejecutarse cada mes (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help="Primer mes a asegurar (YYYY-MM-DD)")
+        parser.add_argument('--meses-adelante', type=int, default=None)
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            desde = parse_date(options['desde'])
+            if desde is None:
+                raise CommandError("--desde: formato de fecha inválido. Use YYYY-MM-DD.")
+
+        try:
+            creadas = crear_particiones(desde=desde, meses_adelante=options['meses_adelante'])
+        except ParticionadoNoDisponible as e:
+            raise CommandError(str(e))
+
+        for nombre in creadas:
+            self.stdout.write(f"  {nombre}")
+        self.stdout.write(self.style.SUCCESS(f"{len(creadas)} particiones creadas."))
@@ -0,0 +1,67 @@
+# attendance/management/commands/generar_faltas.py
+# Proceso nocturno: crea registros FALTA para quienes no checaron
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from attendance.faltas import generar_faltas, LOTE_POR_DEFECTO
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera registros FALTA para trabajadores activos con jornada vigente "
+        "que no tienen registro ni incidencia aprobada en días laborables. "
+        "Sin argumentos procesa el día de ayer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help="Día a procesar (YYYY-MM-DD)")
+        parser.add_argument('--desde', help="Inicio del rango (YYYY-MM-DD)")
+        parser.add_argument('--hasta', help="Fin del rango (YYYY-MM-DD)")
+        parser.add_argument('--lote', type=int, default=LOTE_POR_DEFECTO)
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help="Solo cuenta las faltas, no las inserta",
+        )
+
+    def _fecha(self, valor, nombre):
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise CommandError(f"{nombre}: formato de fecha inválido. Use YYYY-MM-DD.")
+        return fecha
+
+    def handle(self, *args, **options):
+        hoy = timezone.now().date()
+
+        if options['fecha']:
+            fi = ff = self._fecha(options['fecha'], '--fecha')
+        elif options['desde'] or options['hasta']:
+            if not (options['desde'] and options['hasta']):
+                raise CommandError("--desde y --hasta deben usarse juntos.")
+            fi = self._fecha(options['desde'], '--desde')
+            ff = self._fecha(options['hasta'], '--hasta')
+        else:
+            fi = ff = hoy - timedelta(days=1)
+
+        if ff < fi:
+            raise CommandError("La fecha final no puede ser menor a la inicial.")
+
+        # El día en curso todavía puede recibir checadas
+        if ff >= hoy:
+            ff = hoy - timedelta(days=1)
+            if ff < fi:
+                self.stdout.write("No hay días cerrados en el rango.")
+                return
+
+        resultado = generar_faltas(
+            fi, ff,
+            tam_lote=options['lote'],
+            simular=options['simular'],
+        )
+
+        prefijo = "[simulación] " if options['simular'] else ""
+        self.stdout.write(self.style.SUCCESS(prefijo + resultado.resumen()))
@@ -0,0 +1,50 @@
+# attendance/management/commands/importar_asistencias.py
+# Importa un archivo de checadas (CSV o JSON) sin pasar por save() fila por fila
+
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.importacion import ImportadorAsistencias, leer_filas, LOTE_POR_DEFECTO
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa registros de asistencia desde un CSV o JSON "
+        "(numero_empleado, fecha, hora_entrada, hora_salida) en lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta del archivo a importar")
+        parser.add_argument(
+            '--formato',
+            choices=['csv', 'json'],
+            help="Por defecto se deduce de la extensión del archivo",
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=LOTE_POR_DEFECTO,
+            help=f"Filas por lote (default {LOTE_POR_DEFECTO})",
+        )
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        formato = options['formato'] or ('json' if ruta.lower().endswith(('.json', '.jsonl')) else 'csv')
+
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor a cero")
+
+        try:
+            stream = io.open(ruta, encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir {ruta}: {e}")
+
+        with stream:
+            importador = ImportadorAsistencias(tam_lote=options['lote'])
+            resultado = importador.importar(leer_filas(stream, formato))
+
+        for error in resultado.errores:
+            self.stderr.write(error)
+
+        self.stdout.write(self.style.SUCCESS(resultado.resumen()))
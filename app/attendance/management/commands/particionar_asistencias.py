@@ -0,0 +1,31 @@
+# attendance/management/commands/particionar_asistencias.py
+# Convierte RegistroAsistencia en tabla particionada por mes (PostgreSQL)
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.particiones import ParticionadoNoDisponible, particionar
+
+
+class Command(BaseCommand):
+    help = (
+        "Convierte la tabla de asistencias en una tabla particionada por mes "
+        "(requiere PostgreSQL y ASISTENCIA_PARTICIONADA = True). Copia todos "
+        "los registros en una transacción: ejecutar en una ventana de mantenimiento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses-adelante', type=int, default=None,
+            help="Particiones futuras a crear además de las del historial",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            creadas = particionar(meses_adelante=options['meses_adelante'])
+        except ParticionadoNoDisponible as e:
+            raise CommandError(str(e))
+
+        if creadas is None:
+            self.stdout.write("La tabla de asistencias ya está particionada.")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Tabla particionada: {creadas} particiones mensuales."))
@@ -0,0 +1,41 @@
+# attendance/management/commands/recalcular_asistencias.py
+# Recalcula estatus, retardos y horas de registros ya guardados
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.recalculo import recalcular, procesar_pendientes, LOTE_POR_DEFECTO
+
+
+class Command(BaseCommand):
+    help = (
+        "Sin argumentos procesa los recálculos encolados (RecalculoPendiente). "
+        "Con --desde/--hasta/--trabajador recalcula ese rango directamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help="Inicio del rango (YYYY-MM-DD)")
+        parser.add_argument('--hasta', help="Fin del rango (YYYY-MM-DD)")
+        parser.add_argument('--trabajador', type=int, help="Id del trabajador")
+        parser.add_argument('--lote', type=int, default=LOTE_POR_DEFECTO)
+
+    def handle(self, *args, **options):
+        if not (options['desde'] or options['hasta'] or options['trabajador']):
+            procesados = procesar_pendientes()
+            for pendiente, resultado in procesados:
+                self.stdout.write(f"{pendiente}: {resultado.resumen()}")
+            self.stdout.write(self.style.SUCCESS(f"{len(procesados)} recálculos pendientes procesados."))
+            return
+
+        fechas = {}
+        for nombre in ('desde', 'hasta'):
+            valor = options[nombre]
+            fechas[nombre] = parse_date(valor) if valor else None
+            if valor and fechas[nombre] is None:
+                raise CommandError(f"--{nombre}: formato de fecha inválido. Use YYYY-MM-DD.")
+
+        trabajadores = [options['trabajador']] if options['trabajador'] else None
+        resultado = recalcular(
+            trabajadores, fechas['desde'], fechas['hasta'], tam_lote=options['lote']
+        )
+        self.stdout.write(self.style.SUCCESS(resultado.resumen()))
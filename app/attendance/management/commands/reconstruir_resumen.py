@@ -0,0 +1,35 @@
+# attendance/management/commands/reconstruir_resumen.py
+# Reconstruye la tabla ResumenDiario a partir de RegistroAsistencia
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.resumen import reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los resúmenes diarios por unidad, fecha y estatus. "
+        "Sin argumentos reconstruye todo el historial."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help="Inicio del rango (YYYY-MM-DD)")
+        parser.add_argument('--hasta', help="Fin del rango (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        fechas = {}
+        for nombre in ('desde', 'hasta'):
+            valor = options[nombre]
+            fechas[nombre] = parse_date(valor) if valor else None
+            if valor and fechas[nombre] is None:
+                raise CommandError(f"--{nombre}: formato de fecha inválido. Use YYYY-MM-DD.")
+
+        inicio = time.monotonic()
+        creados = reconstruir_resumen(fechas['desde'], fechas['hasta'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{creados} resúmenes generados en {time.monotonic() - inicio:.2f}s."
+        ))
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def poblar_resumen(apps, schema_editor):
+    RegistroAsistencia = apps.get_model('attendance', 'RegistroAsistencia')
+    ResumenDiario = apps.get_model('attendance', 'ResumenDiario')
+
+    agregados = (
+        RegistroAsistencia.objects
+        .values('trabajador__unidad', 'fecha', 'estatus')
+        .annotate(total=Count('id'), minutos=Sum('minutos_retardo'), horas=Sum('horas_trabajadas'))
+        .order_by()
+    )
+    ResumenDiario.objects.bulk_create(
+        (
+            ResumenDiario(
+                unidad_id=fila['trabajador__unidad'],
+                fecha=fila['fecha'],
+                estatus=fila['estatus'],
+                total=fila['total'],
+                minutos_retardo=fila['minutos'] or 0,
+                horas_trabajadas=fila['horas'] or 0,
+            )
+            for fila in agregados
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_alter_registroasistencia_estatus'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('estatus', models.CharField(choices=[('NORMAL', 'Asistencia Normal'), ('RETARDO', 'Retardo'), ('FALTA', 'Falta'), ('JUSTIFICADA', 'Justificada por Incidencia'), ('INHABIL', 'Día Inhábil')], max_length=20)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('minutos_retardo', models.PositiveIntegerField(default=0)),
+                ('horas_trabajadas', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('unidad', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='core.unidadadministrativa')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Asistencia',
+                'verbose_name_plural': 'Resúmenes Diarios de Asistencia',
+                'ordering': ['-fecha', 'unidad', 'estatus'],
+                'indexes': [models.Index(fields=['fecha', 'unidad'], name='resumen_fecha_unidad_idx')],
+                'unique_together': {('unidad', 'fecha', 'estatus')},
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_resumendiario'),
+        ('workers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecalculoPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_inicio', models.DateField(blank=True, null=True)),
+                ('fecha_fin', models.DateField(blank=True, null=True)),
+                ('motivo', models.CharField(blank=True, max_length=200)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('procesado_en', models.DateTimeField(blank=True, null=True)),
+                ('registros_cambiados', models.PositiveIntegerField(blank=True, null=True)),
+                ('trabajador', models.ForeignKey(blank=True, help_text='Vacío = todos los trabajadores', null=True, on_delete=django.db.models.deletion.CASCADE, to='workers.trabajador')),
+            ],
+            options={
+                'verbose_name': 'Recálculo Pendiente',
+                'verbose_name_plural': 'Recálculos Pendientes',
+                'ordering': ['-creado_en'],
+            },
+        ),
+    ]
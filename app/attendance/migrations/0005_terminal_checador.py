@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_recalculopendiente'),
+        ('workers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminalChecador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('nombre', models.CharField(max_length=100, verbose_name='Nombre / Ubicación')),
+                ('identificador', models.CharField(max_length=50, unique=True, verbose_name='Id del dispositivo')),
+                ('token_hash', models.CharField(editable=False, max_length=64, unique=True)),
+                ('activo', models.BooleanField(default=True, verbose_name='¿Activo?')),
+                ('ultimo_uso', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Terminal Checador',
+                'verbose_name_plural': 'Terminales Checadores',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MarcajeTerminal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=100, verbose_name='Clave de idempotencia')),
+                ('dispositivo', models.CharField(blank=True, max_length=50)),
+                ('marcado_en', models.DateTimeField()),
+                ('fecha', models.DateField()),
+                ('resultado', models.CharField(choices=[('ENTRADA', 'Entrada'), ('SALIDA', 'Salida'), ('SIN_CAMBIO', 'Sin cambio')], max_length=20)),
+                ('recibido_en', models.DateTimeField(auto_now_add=True)),
+                ('trabajador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marcajes', to='workers.trabajador')),
+                ('terminal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marcajes', to='attendance.terminalchecador')),
+            ],
+            options={
+                'verbose_name': 'Marcaje de Terminal',
+                'verbose_name_plural': 'Marcajes de Terminal',
+                'ordering': ['-marcado_en'],
+                'indexes': [models.Index(fields=['trabajador', 'fecha'], name='marcaje_trabajador_fecha_idx')],
+                'unique_together': {('terminal', 'clave')},
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def poblar_kardex(apps, schema_editor):
+    RegistroAsistencia = apps.get_model('attendance', 'RegistroAsistencia')
+    KardexMensual = apps.get_model('attendance', 'KardexMensual')
+
+    agregados = (
+        RegistroAsistencia.objects
+        .values('trabajador', 'unidad', mes=TruncMonth('fecha'))
+        .annotate(
+            dias=Count('id'),
+            asistencias=Count('id', filter=Q(estatus__in=('NORMAL', 'RETARDO'))),
+            retardos=Count('id', filter=Q(estatus='RETARDO')),
+            faltas=Count('id', filter=Q(estatus='FALTA')),
+            justificados=Count('id', filter=Q(estatus='JUSTIFICADA')),
+            inhabiles=Count('id', filter=Q(estatus='INHABIL')),
+            minutos=Sum('minutos_retardo'),
+            horas=Sum('horas_trabajadas'),
+        )
+        .order_by()
+    )
+    KardexMensual.objects.bulk_create(
+        (
+            KardexMensual(
+                trabajador_id=fila['trabajador'],
+                unidad_id=fila['unidad'],
+                mes=fila['mes'].replace(day=1),
+                dias_registrados=fila['dias'],
+                asistencias=fila['asistencias'],
+                retardos=fila['retardos'],
+                faltas=fila['faltas'],
+                justificados=fila['justificados'],
+                inhabiles=fila['inhabiles'],
+                minutos_retardo=fila['minutos'] or 0,
+                horas_trabajadas=fila['horas'] or 0,
+            )
+            for fila in agregados
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_unidad_denormalizada'),
+        ('core', '0001_initial'),
+        ('workers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KardexMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('dias_registrados', models.PositiveSmallIntegerField(default=0)),
+                ('asistencias', models.PositiveSmallIntegerField(default=0)),
+                ('retardos', models.PositiveSmallIntegerField(default=0)),
+                ('faltas', models.PositiveSmallIntegerField(default=0)),
+                ('justificados', models.PositiveSmallIntegerField(default=0)),
+                ('inhabiles', models.PositiveSmallIntegerField(default=0)),
+                ('minutos_retardo', models.PositiveIntegerField(default=0)),
+                ('horas_trabajadas', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('trabajador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kardex', to='workers.trabajador')),
+                ('unidad', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kardex', to='core.unidadadministrativa')),
+            ],
+            options={
+                'verbose_name': 'Kárdex Mensual',
+                'verbose_name_plural': 'Kárdex Mensual',
+                'ordering': ['-mes', 'trabajador'],
+                'indexes': [models.Index(fields=['mes', 'unidad'], name='kardex_mes_unidad_idx')],
+                'unique_together': {('trabajador', 'unidad', 'mes')},
+            },
+        ),
+        migrations.RunPython(poblar_kardex, migrations.RunPython.noop),
+    ]
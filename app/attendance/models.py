@@ -3,10 +3,13 @@
 from django.db import models
 from django.utils import timezone
 from datetime import datetime, timedelta
+import hashlib
+import secrets
 
 from core.audit import AuditMixin
 from workers.models import Trabajador, TrabajadorJornada
-from core.models import CalendarioLaboral, TipoIncidencia
+from core.calendario import calendario
+from core.models import TipoIncidencia, UnidadAdministrativa
 
 
 class RegistroAsistencia(AuditMixin, models.Model):
@@ -28,6 +31,13 @@ class RegistroAsistencia(AuditMixin, models.Model):
         ('INHABIL', 'Día Inhábil'),
     ]
 
+    # Estatus que cuentan como asistencia efectiva (dashboard)
+    ESTADOS_ASISTIO = ('NORMAL', 'RETARDO')
+
+    # Campos de los que dependen estatus y retardo (además del calendario y
+    # la jornada, cuyos cambios recalcula attendance/recalculo.py)
+    CAMPOS_ESTATUS = {'trabajador', 'fecha', 'hora_entrada', 'incidencia'}
+
 
     trabajador = models.ForeignKey(
         Trabajador,
@@ -35,6 +45,18 @@ class RegistroAsistencia(AuditMixin, models.Model):
         related_name="asistencias"
     )
 
+    # Unidad del trabajador al momento del registro (evita el JOIN con
+    # Trabajador en las consultas por unidad). Se asigna en save() y en los
+    # procesos masivos; ver attendance/signals.py para cambios de unidad.
+    unidad = models.ForeignKey(
+        UnidadAdministrativa,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="asistencias"
+    )
+
     fecha = models.DateField(default=timezone.now)
     hora_entrada = models.TimeField(null=True, blank=True)
     hora_salida = models.TimeField(null=True, blank=True)
@@ -63,6 +85,15 @@ class RegistroAsistencia(AuditMixin, models.Model):
         verbose_name_plural = "Registros de Asistencia"
         ordering = ['-fecha', 'trabajador']
         unique_together = ('trabajador', 'fecha')  # evita duplicados
+        indexes = [
+            # Paginación por llave de la lista general: (fecha desc, id)
+            models.Index(fields=['-fecha', 'id'], name='asistencia_fecha_id_idx'),
+            # Consultas de JEFE y reportes por unidad
+            models.Index(fields=['unidad', 'fecha'], name='asistencia_unidad_fecha_idx'),
+            models.Index(fields=['unidad', 'estatus'], name='asistencia_unidad_estat_idx'),
+            # Feed de cambios para nómina: (updated_at, id) > cursor
+            models.Index(fields=['updated_at', 'id'], name='asistencia_updated_id_idx'),
+        ]
 
     # ------------------------------
     # MÉTODOS DE NEGOCIO
@@ -73,10 +104,7 @@ class RegistroAsistencia(AuditMixin, models.Model):
 
     # --- 1. Determinar si es día inhábil ---
     def es_inhabil(self):
-        return CalendarioLaboral.objects.filter(
-            fecha=self.fecha,
-            es_inhabil=True
-        ).exists()
+        return calendario.es_inhabil(self.fecha)
 
     # --- 2. Obtener jornada vigente del trabajador ---
     def jornada_vigente(self):
@@ -90,27 +118,11 @@ class RegistroAsistencia(AuditMixin, models.Model):
 
     # --- 3. Cálculo de minutos de retardo ---
     def calcular_retardo(self, hora_entrada, hora_jornada):
-        if not hora_entrada or not hora_jornada:
-            return 0
-
-        dif = (
-            datetime.combine(self.fecha, hora_entrada) -
-            datetime.combine(self.fecha, hora_jornada)
-        )
-
-        return max(0, int(dif.total_seconds() // 60))
+        return calcular_retardo(self.fecha, hora_entrada, hora_jornada)
 
     # --- 4. Cálculo de horas trabajadas ---
     def calcular_horas_trabajadas(self):
-        if not self.hora_entrada or not self.hora_salida:
-            return 0
-
-        dif = (
-            datetime.combine(self.fecha, self.hora_salida) -
-            datetime.combine(self.fecha, self.hora_entrada)
-        )
-
-        return round(dif.total_seconds() / 3600, 2)
+        return calcular_horas_trabajadas(self.fecha, self.hora_entrada, self.hora_salida)
 
     # --- 5. Cálculo del estatus final ---
     def calcular_estatus(self):
@@ -139,28 +151,292 @@ class RegistroAsistencia(AuditMixin, models.Model):
 
 
     # --- 6. Override save() con toda la lógica integrada ---
-    def save(self, *args, **kwargs):
-
-        # Regla principal: Día inhábil → limpiar todo
-        if self.es_inhabil():
-            self.estatus = "INHABIL"
-            self.minutos_retardo = 0
-            self.horas_trabajadas = 0
+    def save(self, *args, recalcular=False, **kwargs):
+        """
+        Calcula estatus, retardo y horas antes de guardar.
+
+        Al actualizar, solo se recalculan si cambió alguno de CAMPOS_ESTATUS
+        (si solo cambió la salida, solo las horas): un cambio posterior del
+        calendario o de la jornada no se refleja con un save() simple. Con
+        `recalcular=True` se recalcula todo siempre (attendance/recalculo.py
+        hace lo mismo en bloque).
+        """
+        cambios = self.changed_fields
+
+        # Unidad vigente del trabajador al crear o al reasignar el registro
+        if self.unidad_id is None or (not self._state.adding and 'trabajador' in cambios):
+            self.unidad_id = self.trabajador.unidad_id
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'unidad'}
+
+        if not recalcular and not self._state.adding and not cambios & self.CAMPOS_ESTATUS:
+            # Ej. solo se registró la salida: el estatus y el retardo no
+            # dependen de ella, basta con las horas (en día inhábil siguen en 0)
+            if 'hora_salida' in cambios:
+                self.horas_trabajadas = (
+                    0 if self.estatus == 'INHABIL' else self.calcular_horas_trabajadas()
+                )
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'horas_trabajadas'}
             return super().save(*args, **kwargs)
 
-        # Calcular retardo y horas
-        jornada = self.jornada_vigente()
+        inhabil = self.es_inhabil()
+        asignacion = None if inhabil else self.jornada_vigente()
 
-        if jornada and self.hora_entrada:
-            self.minutos_retardo = self.calcular_retardo(
-                self.hora_entrada, jornada.jornada.hora_entrada
-            )
-        else:
-            self.minutos_retardo = 0
+        self.estatus, self.minutos_retardo, self.horas_trabajadas = calcular_resultado(
+            self.fecha,
+            self.hora_entrada,
+            self.hora_salida,
+            tiene_incidencia=bool(self.incidencia_id),
+            inhabil=inhabil,
+            jornada=asignacion.jornada if asignacion else None,
+        )
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {
+                *kwargs['update_fields'], 'estatus', 'minutos_retardo', 'horas_trabajadas',
+            }
 
-        self.horas_trabajadas = self.calcular_horas_trabajadas()
+        return super().save(*args, **kwargs)
 
-        # Estatus final
-        self.estatus = self.calcular_estatus()
 
-        return super().save(*args, **kwargs)
+class ResumenDiario(models.Model):
+    """
+    Conteos materializados de RegistroAsistencia por unidad, fecha y estatus.
+    Se mantiene por (unidad, fecha) al guardar o eliminar registros
+    (attendance/resumen.py) y se reconstruye con `reconstruir_resumen`.
+    """
+
+    unidad = models.ForeignKey(
+        UnidadAdministrativa,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="resumenes_diarios"
+    )
+    fecha = models.DateField()
+    estatus = models.CharField(max_length=20, choices=RegistroAsistencia.ESTADOS)
+
+    total = models.PositiveIntegerField(default=0)
+    minutos_retardo = models.PositiveIntegerField(default=0)
+    horas_trabajadas = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Resumen Diario de Asistencia"
+        verbose_name_plural = "Resúmenes Diarios de Asistencia"
+        ordering = ['-fecha', 'unidad', 'estatus']
+        unique_together = ('unidad', 'fecha', 'estatus')
+        indexes = [
+            models.Index(fields=['fecha', 'unidad'], name='resumen_fecha_unidad_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.unidad} - {self.fecha} {self.estatus}: {self.total}"
+
+
+class KardexMensual(models.Model):
+    """
+    Totales mensuales de asistencia por trabajador (para nómina).
+    Hay una fila por (trabajador, unidad, mes): si el trabajador cambió de
+    unidad a media quincena sus días quedan repartidos como en los registros.
+    Se mantiene al guardar o eliminar registros (attendance/kardex.py) y se
+    reconstruye con `reconstruir_kardex`.
+    """
+
+    trabajador = models.ForeignKey(
+        Trabajador,
+        on_delete=models.CASCADE,
+        related_name="kardex"
+    )
+    unidad = models.ForeignKey(
+        UnidadAdministrativa,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="kardex"
+    )
+    # Primer día del mes
+    mes = models.DateField()
+
+    dias_registrados = models.PositiveSmallIntegerField(default=0)
+    asistencias = models.PositiveSmallIntegerField(default=0)
+    retardos = models.PositiveSmallIntegerField(default=0)
+    faltas = models.PositiveSmallIntegerField(default=0)
+    justificados = models.PositiveSmallIntegerField(default=0)
+    inhabiles = models.PositiveSmallIntegerField(default=0)
+    minutos_retardo = models.PositiveIntegerField(default=0)
+    horas_trabajadas = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Kárdex Mensual"
+        verbose_name_plural = "Kárdex Mensual"
+        ordering = ['-mes', 'trabajador']
+        unique_together = ('trabajador', 'unidad', 'mes')
+        indexes = [
+            models.Index(fields=['mes', 'unidad'], name='kardex_mes_unidad_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trabajador} - {self.mes:%Y-%m}"
+
+
+class RecalculoPendiente(models.Model):
+    """
+    Recálculo de asistencias demasiado grande para hacerse dentro de la
+    petición que lo originó (attendance/recalculo.py).
+    Lo procesa el comando `recalcular_asistencias`.
+    """
+
+    trabajador = models.ForeignKey(
+        Trabajador,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        help_text="Vacío = todos los trabajadores"
+    )
+    fecha_inicio = models.DateField(null=True, blank=True)
+    fecha_fin = models.DateField(null=True, blank=True)
+    motivo = models.CharField(max_length=200, blank=True)
+
+    creado_en = models.DateTimeField(auto_now_add=True)
+    procesado_en = models.DateTimeField(null=True, blank=True)
+    registros_cambiados = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Recálculo Pendiente"
+        verbose_name_plural = "Recálculos Pendientes"
+        ordering = ['-creado_en']
+
+    def __str__(self):
+        return f"{self.motivo} ({self.fecha_inicio} a {self.fecha_fin or '...'})"
+
+
+class TerminalChecador(AuditMixin, models.Model):
+    """
+    Reloj checador físico autorizado para enviar checadas por la API.
+    Solo se guarda el hash del token; el token en claro se muestra una vez.
+    """
+
+    nombre = models.CharField(max_length=100, verbose_name="Nombre / Ubicación")
+    identificador = models.CharField(max_length=50, unique=True, verbose_name="Id del dispositivo")
+    token_hash = models.CharField(max_length=64, unique=True, editable=False)
+    activo = models.BooleanField(default=True, verbose_name="¿Activo?")
+    ultimo_uso = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        verbose_name = "Terminal Checador"
+        verbose_name_plural = "Terminales Checadores"
+        ordering = ['nombre']
+
+    def __str__(self):
+        return f"{self.nombre} ({self.identificador})"
+
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def asignar_token(self):
+        """Genera un token nuevo, guarda su hash y regresa el token en claro."""
+        token = secrets.token_urlsafe(32)
+        self.token_hash = self.hash_token(token)
+        return token
+
+
+class MarcajeTerminal(models.Model):
+    """
+    Bitácora de checadas recibidas por la API.
+    La clave de idempotencia por terminal evita duplicar una checada
+    reenviada; no se liga por FK a RegistroAsistencia para no depender
+    de su llave primaria.
+    """
+
+    RESULTADOS = [
+        ('ENTRADA', 'Entrada'),
+        ('SALIDA', 'Salida'),
+        ('SIN_CAMBIO', 'Sin cambio'),
+    ]
+
+    terminal = models.ForeignKey(TerminalChecador, on_delete=models.CASCADE, related_name="marcajes")
+    clave = models.CharField(max_length=100, verbose_name="Clave de idempotencia")
+    dispositivo = models.CharField(max_length=50, blank=True)
+
+    trabajador = models.ForeignKey(Trabajador, on_delete=models.CASCADE, related_name="marcajes")
+    marcado_en = models.DateTimeField()
+    fecha = models.DateField()
+    resultado = models.CharField(max_length=20, choices=RESULTADOS)
+
+    recibido_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Marcaje de Terminal"
+        verbose_name_plural = "Marcajes de Terminal"
+        ordering = ['-marcado_en']
+        unique_together = ('terminal', 'clave')
+        indexes = [
+            models.Index(fields=['trabajador', 'fecha'], name='marcaje_trabajador_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trabajador_id} {self.marcado_en} ({self.resultado})"
+
+
+# ============================================================
+# REGLAS DE CÁLCULO (sin consultas)
+# Compartidas por save() y por los procesos masivos, que resuelven
+# calendario y jornada por lote en lugar de por registro.
+# ============================================================
+
+def calcular_retardo(fecha, hora_entrada, hora_jornada):
+    if not hora_entrada or not hora_jornada:
+        return 0
+
+    dif = (
+        datetime.combine(fecha, hora_entrada) -
+        datetime.combine(fecha, hora_jornada)
+    )
+
+    return max(0, int(dif.total_seconds() // 60))
+
+
+def calcular_horas_trabajadas(fecha, hora_entrada, hora_salida):
+    if not hora_entrada or not hora_salida:
+        return 0
+
+    dif = (
+        datetime.combine(fecha, hora_salida) -
+        datetime.combine(fecha, hora_entrada)
+    )
+
+    return round(dif.total_seconds() / 3600, 2)
+
+
+def calcular_resultado(fecha, hora_entrada, hora_salida, tiene_incidencia, inhabil, jornada):
+    """
+    Aplica las mismas reglas que calcular_estatus() sobre datos ya resueltos.
+    `jornada` es la JornadaLaboral vigente (o None).
+    Regresa (estatus, minutos_retardo, horas_trabajadas).
+    """
+    # Regla principal: Día inhábil → limpiar todo
+    if inhabil:
+        return "INHABIL", 0, 0
+
+    if jornada and hora_entrada:
+        minutos = calcular_retardo(fecha, hora_entrada, jornada.hora_entrada)
+    else:
+        minutos = 0
+
+    horas = calcular_horas_trabajadas(fecha, hora_entrada, hora_salida)
+
+    if tiene_incidencia:
+        estatus = "JUSTIFICADA"
+    elif not jornada:
+        estatus = "NORMAL"
+    elif not hora_entrada:
+        estatus = "FALTA"
+    elif minutos > 0:
+        estatus = "RETARDO"
+    else:
+        estatus = "NORMAL"
+
+    return estatus, minutos, horas
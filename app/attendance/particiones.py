@@ -0,0 +1,325 @@
+# attendance/particiones.py
+# Particionado mensual de RegistroAsistencia (solo PostgreSQL, opcional)
+#
+# Con ASISTENCIA_PARTICIONADA = True la tabla de asistencias se convierte en
+# una tabla particionada por rango de `fecha`, una partición por mes más una
+# partición DEFAULT para lo que caiga fuera. Las consultas existentes ya
+# filtran por fecha, así que PostgreSQL descarta las particiones que no
+# aplican sin cambiar las vistas ni los reportes.
+#
+# Consideraciones:
+# - La llave primaria pasa a ser (id, fecha): ningún modelo debe tener FK a
+#   RegistroAsistencia (por eso MarcajeTerminal no la tiene).
+# - `id` sigue saliendo de una secuencia, así que sigue siendo único.
+# - Los años cerrados se pueden desprender y guardar comprimidos en disco;
+#   ResumenDiario conserva sus conteos.
+
+import gzip
+import os
+import shutil
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import RegistroAsistencia
+
+
+TABLA = RegistroAsistencia._meta.db_table
+
+MESES_ADELANTE = getattr(settings, 'ASISTENCIA_PARTICIONES_ADELANTE', 3)
+
+
+class ParticionadoNoDisponible(Exception):
+    pass
+
+
+# ============================================================
+# UTILERÍAS
+# ============================================================
+
+def verificar_disponible():
+    if connection.vendor != 'postgresql':
+        raise ParticionadoNoDisponible(
+            "El particionado de asistencias solo está disponible en PostgreSQL."
+        )
+    if not getattr(settings, 'ASISTENCIA_PARTICIONADA', False):
+        raise ParticionadoNoDisponible(
+            "Active ASISTENCIA_PARTICIONADA en la configuración para usar el particionado."
+        )
+
+
+def _q(nombre):
+    return connection.ops.quote_name(nombre)
+
+
+def _inicio_mes(fecha):
+    return date(fecha.year, fecha.month, 1)
+
+
+def _mes_siguiente(fecha):
+    return _sumar_meses(_inicio_mes(fecha), 1)
+
+
+def _sumar_meses(mes, n):
+    indice = mes.year * 12 + mes.month - 1 + n
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _meses(desde, hasta):
+    """Primer día de cada mes entre `desde` y `hasta` (inclusive)."""
+    actual = _inicio_mes(desde)
+    while actual <= hasta:
+        yield actual
+        actual = _mes_siguiente(actual)
+
+
+def nombre_particion(mes):
+    return f"{TABLA}_p{mes.year}_{mes.month:02d}"
+
+
+NOMBRE_DEFAULT = f"{TABLA}_pdefault"
+
+
+def esta_particionada(cursor):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+        [TABLA],
+    )
+    return cursor.fetchone() is not None
+
+
+def particiones_existentes(cursor):
+    cursor.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        [TABLA],
+    )
+    return {fila[0] for fila in cursor.fetchall()}
+
+
+# ============================================================
+# CREACIÓN DE PARTICIONES
+# ============================================================
+
+def _crear_particion(cursor, mes):
+    """
+    Crea la partición de `mes`. Si la DEFAULT ya tiene filas de ese mes
+    (PostgreSQL no permite crearla así) se mueven antes de adjuntarla.
+    """
+    nombre = nombre_particion(mes)
+    desde, hasta = mes, _mes_siguiente(mes)
+
+    cursor.execute(f"CREATE TABLE {_q(nombre)} (LIKE {_q(TABLA)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+
+    if NOMBRE_DEFAULT in particiones_existentes(cursor):
+        cursor.execute(
+            f"WITH movidas AS (DELETE FROM {_q(NOMBRE_DEFAULT)} "
+            f"WHERE fecha >= %s AND fecha < %s RETURNING *) "
+            f"INSERT INTO {_q(nombre)} SELECT * FROM movidas",
+            [desde, hasta],
+        )
+
+    cursor.execute(
+        f"ALTER TABLE {_q(TABLA)} ATTACH PARTITION {_q(nombre)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [desde, hasta],
+    )
+    return nombre
+
+
+def crear_particiones(desde=None, hasta=None, meses_adelante=None):
+    """
+    Asegura una partición por mes en [desde, hoy + meses_adelante].
+    Regresa los nombres de las particiones creadas.
+    """
+    verificar_disponible()
+
+    hoy = timezone.localdate()
+    meses_adelante = MESES_ADELANTE if meses_adelante is None else meses_adelante
+    desde = desde or hoy
+    hasta = hasta or _sumar_meses(_inicio_mes(hoy), meses_adelante)
+
+    creadas = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not esta_particionada(cursor):
+            raise ParticionadoNoDisponible(
+                "La tabla de asistencias aún no está particionada; ejecute `particionar_asistencias`."
+            )
+        existentes = particiones_existentes(cursor)
+        for mes in _meses(desde, hasta):
+            if nombre_particion(mes) not in existentes:
+                creadas.append(_crear_particion(cursor, mes))
+    return creadas
+
+
+# ============================================================
+# CONVERSIÓN DE LA TABLA EXISTENTE
+# ============================================================
+
+def _restricciones(cursor, tabla):
+    """(nombre, tipo, definición) de la PK, UNIQUE y FK de `tabla`."""
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f')
+        """,
+        [tabla],
+    )
+    return cursor.fetchall()
+
+
+def _indices(cursor, tabla):
+    """Definición de los índices que no respaldan una restricción."""
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = to_regclass(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        """,
+        [tabla],
+    )
+    return [fila[0] for fila in cursor.fetchall()]
+
+
+def particionar(meses_adelante=None):
+    """
+    Convierte la tabla de asistencias en particionada por mes. Se hace en una
+    sola transacción: renombrar, crear la tabla padre con particiones desde
+    el primer mes con datos hasta `meses_adelante` meses después del último
+    (o de hoy, si es posterior), copiar, y recrear restricciones e índices.
+    Regresa el número de particiones creadas o None si ya estaba particionada.
+    """
+    verificar_disponible()
+    meses_adelante = MESES_ADELANTE if meses_adelante is None else meses_adelante
+
+    antigua = f"{TABLA}_sinparticion"
+    secuencia = f"{TABLA}_id_seq_part"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if esta_particionada(cursor):
+            return None
+
+        restricciones = _restricciones(cursor, TABLA)
+        indices = _indices(cursor, TABLA)
+
+        cursor.execute(f"SELECT MIN(fecha), MAX(fecha), MAX(id) FROM {_q(TABLA)}")
+        minima, maxima, ultimo_id = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {_q(TABLA)} RENAME TO {_q(antigua)}")
+        cursor.execute(
+            f"CREATE TABLE {_q(TABLA)} (LIKE {_q(antigua)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (fecha)"
+        )
+
+        # `id` era IDENTITY / serial de la tabla anterior: secuencia propia
+        cursor.execute(f"CREATE SEQUENCE {_q(secuencia)} AS bigint")
+        cursor.execute(
+            f"ALTER TABLE {_q(TABLA)} ALTER COLUMN id SET DEFAULT nextval(%s)", [secuencia]
+        )
+        cursor.execute(f"ALTER SEQUENCE {_q(secuencia)} OWNED BY {_q(TABLA)}.id")
+        if ultimo_id:
+            cursor.execute("SELECT setval(%s, %s)", [secuencia, ultimo_id])
+
+        # Sin huecos entre el último mes con datos y hoy: lo que se capture
+        # después para esos meses no debe caer en la DEFAULT
+        hoy = timezone.localdate()
+        hasta = _sumar_meses(_inicio_mes(max(maxima or hoy, hoy)), meses_adelante)
+        creadas = 0
+        for mes in _meses(min(minima or hoy, hoy), hasta):
+            _crear_particion(cursor, mes)
+            creadas += 1
+        cursor.execute(f"CREATE TABLE {_q(NOMBRE_DEFAULT)} PARTITION OF {_q(TABLA)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {_q(TABLA)} SELECT * FROM {_q(antigua)}")
+        cursor.execute(f"DROP TABLE {_q(antigua)}")
+
+        # Los nombres de índices y restricciones quedan libres al borrar la anterior
+        for nombre, tipo, definicion in restricciones:
+            if tipo == 'p':
+                definicion = "PRIMARY KEY (id, fecha)"
+            cursor.execute(f"ALTER TABLE {_q(TABLA)} ADD CONSTRAINT {_q(nombre)} {definicion}")
+        # Las definiciones se leyeron antes de renombrar: ya apuntan a TABLA
+        for definicion in indices:
+            cursor.execute(definicion)
+
+    return creadas
+
+
+# ============================================================
+# ARCHIVO DE AÑOS CERRADOS
+# ============================================================
+
+def _copiar_a_gzip(cursor, tabla, ruta):
+    sql = f"COPY (SELECT * FROM {_q(tabla)} ORDER BY fecha, id) TO STDOUT WITH CSV HEADER"
+    with gzip.open(ruta, 'wb') as destino:
+        crudo = cursor.cursor
+        if hasattr(crudo, 'copy_expert'):
+            # psycopg2
+            crudo.copy_expert(sql, destino)
+        else:
+            # psycopg 3
+            with crudo.copy(sql) as copia:
+                for bloque in copia:
+                    destino.write(bloque)
+
+
+def archivar_anio(anio, destino=None, conservar=False):
+    """
+    Desprende las particiones de `anio` (debe estar cerrado), las guarda como
+    CSV comprimido en `destino` y las elimina (o las deja como tablas sueltas
+    con `conservar=True`). Regresa [(archivo, filas), ...].
+    """
+    verificar_disponible()
+
+    if anio >= timezone.localdate().year:
+        raise ValueError(f"El año {anio} no está cerrado.")
+
+    with connection.cursor() as cursor:
+        if NOMBRE_DEFAULT in particiones_existentes(cursor):
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {_q(NOMBRE_DEFAULT)} WHERE fecha >= %s AND fecha < %s",
+                [date(anio, 1, 1), date(anio + 1, 1, 1)],
+            )
+            restantes = cursor.fetchone()[0]
+            if restantes:
+                raise ValueError(
+                    f"Hay {restantes} registros de {anio} en la partición DEFAULT; "
+                    f"cree sus particiones con `crear_particiones --desde {anio}-01-01`."
+                )
+
+    destino = destino or getattr(
+        settings, 'ASISTENCIA_ARCHIVO_DIR', os.path.join(settings.BASE_DIR, 'archivo_asistencias')
+    )
+    os.makedirs(destino, exist_ok=True)
+
+    archivados = []
+    for mes in _meses(date(anio, 1, 1), date(anio, 12, 1)):
+        nombre = nombre_particion(mes)
+        ruta = os.path.join(destino, f"{nombre}.csv.gz")
+        temporal = f"{ruta}.tmp"
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if nombre not in particiones_existentes(cursor):
+                continue
+
+            cursor.execute(f"ALTER TABLE {_q(TABLA)} DETACH PARTITION {_q(nombre)}")
+            cursor.execute(f"SELECT COUNT(*) FROM {_q(nombre)}")
+            filas = cursor.fetchone()[0]
+
+            _copiar_a_gzip(cursor, nombre, temporal)
+            if not conservar:
+                cursor.execute(f"DROP TABLE {_q(nombre)}")
+
+        # Solo se publica el archivo si la transacción se confirmó
+        shutil.move(temporal, ruta)
+        archivados.append((ruta, filas))
+
+    return archivados
@@ -0,0 +1,163 @@
+# attendance/recalculo.py
+# Recálculo incremental de asistencias
+#
+# estatus, minutos_retardo y horas_trabajadas solo se calculan en save().
+# Si después se agrega un día inhábil o se modifica el historial de jornadas,
+# los registros afectados quedan desactualizados. Este módulo recalcula solo
+# los (trabajador, fecha) afectados, por lotes y con bulk_update.
+
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.calendario import calendario
+from workers.jornadas import JornadaTimeline
+from .models import RegistroAsistencia, RecalculoPendiente, calcular_resultado
+from .signals import notificar_cambios
+
+
+LOTE_POR_DEFECTO = getattr(settings, 'ASISTENCIA_RECALCULO_LOTE', 2000)
+
+# Por encima de este número de registros el recálculo se encola
+MAX_SINCRONO = getattr(settings, 'ASISTENCIA_RECALCULO_MAX_SINCRONO', 5000)
+
+CAMPOS = ['estatus', 'minutos_retardo', 'horas_trabajadas', 'updated_at']
+
+
+class ResultadoRecalculo:
+
+    def __init__(self):
+        self.revisados = 0
+        self.cambiados = 0
+        self.segundos = 0.0
+
+    def resumen(self):
+        return (
+            f"{self.revisados} registros revisados, {self.cambiados} actualizados "
+            f"en {self.segundos:.2f}s."
+        )
+
+
+def registros_afectados(trabajadores=None, fi=None, ff=None):
+    qs = RegistroAsistencia.objects.all()
+    if trabajadores is not None:
+        qs = qs.filter(trabajador__in=trabajadores)
+    if fi is not None:
+        qs = qs.filter(fecha__gte=fi)
+    if ff is not None:
+        qs = qs.filter(fecha__lte=ff)
+    return qs
+
+
+def recalcular(trabajadores=None, fi=None, ff=None, tam_lote=None):
+    """
+    Recalcula los registros de `trabajadores` (ids, queryset o None = todos)
+    en [fi, ff]. Solo escribe los que cambian.
+    """
+    inicio = time.monotonic()
+    tam_lote = tam_lote or LOTE_POR_DEFECTO
+    resultado = ResultadoRecalculo()
+
+    qs = (
+        registros_afectados(trabajadores, fi, ff)
+        .only(
+            'id', 'trabajador_id', 'unidad_id', 'fecha', 'hora_entrada', 'hora_salida',
+            'incidencia_id', 'estatus', 'minutos_retardo', 'horas_trabajadas',
+        )
+        .order_by('id')
+    )
+
+    ultimo_id = 0
+    while True:
+        lote = list(qs.filter(id__gt=ultimo_id)[:tam_lote])
+        if not lote:
+            break
+        ultimo_id = lote[-1].id
+        resultado.revisados += len(lote)
+        resultado.cambiados += _recalcular_lote(lote)
+
+    resultado.segundos = time.monotonic() - inicio
+    return resultado
+
+
+@transaction.atomic
+def _recalcular_lote(registros):
+    fechas = [r.fecha for r in registros]
+    jornadas = JornadaTimeline.cargar(
+        {r.trabajador_id for r in registros}, min(fechas), max(fechas)
+    )
+
+    ahora = timezone.now()
+    cambiados = []
+
+    for r in registros:
+        estatus, minutos, horas = calcular_resultado(
+            r.fecha,
+            r.hora_entrada,
+            r.hora_salida,
+            tiene_incidencia=bool(r.incidencia_id),
+            inhabil=calendario.es_inhabil(r.fecha),
+            jornada=jornadas.jornada(r.trabajador_id, r.fecha),
+        )
+        horas = Decimal(str(horas)).quantize(Decimal('0.01'))
+
+        if (r.estatus, r.minutos_retardo, r.horas_trabajadas) != (estatus, minutos, horas):
+            r.estatus = estatus
+            r.minutos_retardo = minutos
+            r.horas_trabajadas = horas
+            r.updated_at = ahora
+            cambiados.append(r)
+
+    if cambiados:
+        RegistroAsistencia.objects.bulk_update(cambiados, CAMPOS)
+        notificar_cambios((r.trabajador_id, r.unidad_id, r.fecha) for r in cambiados)
+
+    return len(cambiados)
+
+
+# ============================================================
+# PROGRAMACIÓN (síncrona o en cola)
+# ============================================================
+
+def programar_recalculo(motivo, trabajador=None, fi=None, ff=None, trabajadores=None):
+    """
+    Recalcula al confirmar la transacción si el volumen es chico; si no,
+    deja un RecalculoPendiente para `recalcular_asistencias`.
+    `trabajadores` (ids) reemplaza a `trabajador` para varios a la vez.
+    """
+    if trabajadores is None and trabajador is not None:
+        trabajadores = [trabajador.pk]
+
+    # La cola guarda un trabajador o ninguno (todos): con varios se encola el
+    # rango para todos, que de todos modos solo escribe los registros que cambian
+    en_cola = trabajadores[0] if trabajadores and len(trabajadores) == 1 else None
+
+    def ejecutar():
+        if registros_afectados(trabajadores, fi, ff).count() > MAX_SINCRONO:
+            RecalculoPendiente.objects.create(
+                trabajador_id=en_cola,
+                fecha_inicio=fi,
+                fecha_fin=ff,
+                motivo=motivo,
+            )
+        else:
+            recalcular(trabajadores, fi, ff)
+
+    transaction.on_commit(ejecutar)
+
+
+def procesar_pendientes():
+    """Ejecuta los recálculos encolados, del más antiguo al más reciente."""
+    procesados = []
+    for pendiente in RecalculoPendiente.objects.filter(procesado_en__isnull=True).order_by('id'):
+        trabajadores = [pendiente.trabajador_id] if pendiente.trabajador_id else None
+        resultado = recalcular(trabajadores, pendiente.fecha_inicio, pendiente.fecha_fin)
+
+        pendiente.procesado_en = timezone.now()
+        pendiente.registros_cambiados = resultado.cambiados
+        pendiente.save(update_fields=['procesado_en', 'registros_cambiados'])
+        procesados.append((pendiente, resultado))
+    return procesados
@@ -0,0 +1,117 @@
+# attendance/resumen.py
+# Mantenimiento de la tabla ResumenDiario
+#
+# Los conteos se recalculan por (unidad, fecha): al confirmar una transacción
+# se vuelven a agregar solo los registros de los días y unidades que tocó, así
+# el costo no crece con el historial (attendance/derivadas.py).
+#
+# Las claves se bloquean antes de borrar y volver a agregar (core/bloqueos.py)
+# para que dos transacciones concurrentes del mismo día y unidad no inserten
+# las mismas filas. Incluye las de unidad NULL, que la restricción única no cubre.
+
+import operator
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .derivadas import reemplazar
+from .models import RegistroAsistencia, ResumenDiario
+
+
+def _filtro_unidades(campo, unidades):
+    unidades = set(unidades)
+    filtro = Q(**{f"{campo}__in": [u for u in unidades if u is not None]})
+    if None in unidades:
+        filtro |= Q(**{f"{campo}__isnull": True})
+    return filtro
+
+
+def _agregados(registros):
+    return (
+        registros
+        .values('unidad', 'fecha', 'estatus')
+        .annotate(
+            total=Count('id'),
+            minutos=Sum('minutos_retardo'),
+            horas=Sum('horas_trabajadas'),
+        )
+        .order_by()
+    )
+
+
+def _nuevos_resumenes(agregados):
+    for fila in agregados:
+        yield ResumenDiario(
+            unidad_id=fila['unidad'],
+            fecha=fila['fecha'],
+            estatus=fila['estatus'],
+            total=fila['total'],
+            minutos_retardo=fila['minutos'] or 0,
+            horas_trabajadas=fila['horas'] or 0,
+        )
+
+
+def _filtro_claves(claves):
+    """
+    Q de exactamente las claves (unidad_id, fecha). Las fechas con el mismo
+    conjunto de unidades van en un solo término (ej. una importación).
+    """
+    unidades_por_fecha = {}
+    for unidad_id, fecha in claves:
+        unidades_por_fecha.setdefault(fecha, set()).add(unidad_id)
+
+    fechas_por_unidades = {}
+    for fecha, unidades in unidades_por_fecha.items():
+        fechas_por_unidades.setdefault(frozenset(unidades), []).append(fecha)
+
+    return reduce(operator.or_, (
+        _filtro_unidades('unidad', unidades) & Q(fecha__in=fechas)
+        for unidades, fechas in fechas_por_unidades.items()
+    ))
+
+
+@transaction.atomic
+def actualizar_resumen(claves):
+    """Recalcula los resúmenes de las claves (unidad_id, fecha), una vez cada una."""
+    claves = set(claves)
+    if not claves:
+        return
+
+    filtro = _filtro_claves(claves)
+    reemplazar(
+        ResumenDiario,
+        ResumenDiario.objects.filter(filtro),
+        _nuevos_resumenes(_agregados(RegistroAsistencia.objects.filter(filtro))),
+        espacio='resumen',
+        claves=claves,
+    )
+
+
+@transaction.atomic
+def reconstruir_resumen(fi=None, ff=None):
+    """Reconstruye el resumen completo, o solo el rango [fi, ff]. Regresa las filas creadas."""
+    resumenes = ResumenDiario.objects.all()
+    registros = RegistroAsistencia.objects.all()
+
+    if fi:
+        resumenes = resumenes.filter(fecha__gte=fi)
+        registros = registros.filter(fecha__gte=fi)
+    if ff:
+        resumenes = resumenes.filter(fecha__lte=ff)
+        registros = registros.filter(fecha__lte=ff)
+
+    return reemplazar(
+        ResumenDiario, resumenes, _nuevos_resumenes(_agregados(registros)), batch_size=5000
+    )
+
+
+def conteos_por_estatus(resumenes):
+    """{estatus: total} sumando sobre un queryset de ResumenDiario."""
+    return dict(
+        resumenes
+        .values('estatus')
+        .annotate(suma=Sum('total'))
+        .order_by()
+        .values_list('estatus', 'suma')
+    )
@@ -0,0 +1,213 @@
+# attendance/signals.py
+# Notificación de cambios en RegistroAsistencia
+#
+# `asistencias_modificadas` es el punto único de extensión para lo que se
+# deriva de la asistencia (resúmenes, cachés, etc.). Se envía desde las
+# señales del modelo y desde los procesos masivos que usan bulk_create /
+# bulk_update (y por lo tanto no disparan post_save).
+
+import contextvars
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from core.lotes import al_confirmar
+from core.models import CalendarioLaboral
+from workers.models import JornadaLaboral, Trabajador, TrabajadorJornada
+from .en_vivo import cambios_confirmados
+from .kardex import actualizar_kardex, inicio_mes
+from .models import RegistroAsistencia
+from .resumen import actualizar_resumen
+
+
+# registros: conjunto de (trabajador_id, unidad_id, fecha)
+asistencias_modificadas = Signal()
+
+# Conjunto donde se juntan los avisos dentro de notificacion_agrupada()
+_agrupados = contextvars.ContextVar('asistencias_agrupadas', default=None)
+
+
+def notificar_cambios(registros):
+    """
+    Envía `asistencias_modificadas` para los (trabajador_id, unidad_id, fecha)
+    tocados. La unidad es la guardada en el registro, no la actual del trabajador.
+    """
+    registros = set(registros)
+    if not registros:
+        return
+
+    pendientes = _agrupados.get()
+    if pendientes is not None:
+        pendientes.update(registros)
+        return
+
+    asistencias_modificadas.send(sender=RegistroAsistencia, registros=registros)
+
+
+@contextmanager
+def notificacion_agrupada():
+    """
+    Junta los avisos del bloque y envía uno solo al salir. Para borrados con
+    queryset.delete(), que disparan post_delete (y un aviso) por cada fila.
+    """
+    if _agrupados.get() is not None:
+        yield
+        return
+
+    pendientes = set()
+    token = _agrupados.set(pendientes)
+    try:
+        yield
+    finally:
+        _agrupados.reset(token)
+    notificar_cambios(pendientes)
+
+
+@receiver(post_save, sender=RegistroAsistencia)
+@receiver(post_delete, sender=RegistroAsistencia)
+def registro_modificado(sender, instance, **kwargs):
+    registros = {(instance.trabajador_id, instance.unidad_id, instance.fecha)}
+
+    # Clave con que se leyó, para el resumen del día anterior si cambió
+    original = (instance.previous('trabajador'), instance.previous('unidad'), instance.previous('fecha'))
+    if original[0] is not None:
+        registros.add(original)
+
+    notificar_cambios(registros)
+
+
+# Las tablas derivadas se recalculan al confirmar, una vez por clave aunque
+# la transacción haya guardado muchos registros (core/lotes.py)
+
+@receiver(asistencias_modificadas)
+def actualizar_resumen_diario(sender, registros, **kwargs):
+    al_confirmar(
+        'resumen_diario',
+        actualizar_resumen,
+        {(unidad_id, fecha) for _, unidad_id, fecha in registros},
+    )
+
+
+@receiver(asistencias_modificadas)
+def actualizar_kardex_mensual(sender, registros, **kwargs):
+    al_confirmar(
+        'kardex_mensual',
+        actualizar_kardex,
+        {(trabajador_id, inicio_mes(fecha)) for trabajador_id, _, fecha in registros},
+    )
+
+
+@receiver(asistencias_modificadas)
+def actualizar_tablero_en_vivo(sender, registros, **kwargs):
+    # Solo interesa el día de hoy; se avisa al confirmar para no mostrar
+    # cambios que luego se reviertan
+    hoy = timezone.localdate()
+    unidades = {unidad_id for _, unidad_id, fecha in registros if fecha == hoy}
+    if unidades:
+        transaction.on_commit(lambda: cambios_confirmados(unidades))
+
+
+# ============================================================
+# CAMBIO DE UNIDAD DEL TRABAJADOR
+# Los registros guardan la unidad del día en que ocurrieron: al cambiar de
+# unidad solo se mueven los de hoy en adelante (ej. faltas ya generadas o
+# checadas del día) y se recalcula el resumen de esos días en ambas unidades.
+# ============================================================
+
+@receiver(post_save, sender=Trabajador)
+def trabajador_cambio_unidad(sender, instance, created, **kwargs):
+    if created or 'unidad' not in instance.changed_fields:
+        return
+
+    anterior = instance.previous('unidad')
+    pendientes = RegistroAsistencia.objects.filter(
+        trabajador=instance, fecha__gte=timezone.localdate()
+    )
+    fechas = set(pendientes.values_list('fecha', flat=True))
+    if not fechas:
+        return
+
+    pendientes.update(unidad_id=instance.unidad_id, updated_at=timezone.now())
+    notificar_cambios(
+        {(instance.pk, anterior, f) for f in fechas}
+        | {(instance.pk, instance.unidad_id, f) for f in fechas}
+    )
+
+
+# ============================================================
+# RECÁLCULO POR CAMBIOS EN CALENDARIO O JORNADAS
+# Los registros ya guardados no se enteran de un día inhábil nuevo, de una
+# asignación de jornada con fecha retroactiva ni de un cambio de horario en
+# la jornada misma; se recalculan los afectados.
+# ============================================================
+
+# Campos de JornadaLaboral de los que dependen los registros
+CAMPOS_HORARIO_JORNADA = {'hora_entrada', 'hora_salida', 'dias_semana'}
+
+@receiver(post_save, sender=CalendarioLaboral)
+@receiver(post_delete, sender=CalendarioLaboral)
+def calendario_modificado(sender, instance, **kwargs):
+    from .recalculo import programar_recalculo
+
+    fechas = {instance.fecha, instance.previous('fecha')} - {None}
+    for fecha in fechas:
+        programar_recalculo(f"Calendario: {instance}", fi=fecha, ff=fecha)
+
+
+@receiver(post_save, sender=TrabajadorJornada)
+@receiver(post_delete, sender=TrabajadorJornada)
+def asignacion_modificada(sender, instance, **kwargs):
+    from .recalculo import programar_recalculo
+
+    actual = (instance.trabajador_id, instance.fecha_inicio, instance.fecha_fin, instance.jornada_id)
+    anterior = None
+    # Solo al modificar una asignación existente (en post_delete no hay `created`)
+    if kwargs.get('created') is False:
+        anterior = tuple(instance.previous(c) for c in ('trabajador', 'fecha_inicio', 'fecha_fin', 'jornada'))
+        if anterior == actual:
+            return
+
+    intervalos = {}
+    for trabajador_id, inicio, fin, _ in filter(None, [actual, anterior]):
+        if trabajador_id is not None and inicio is not None:
+            intervalos.setdefault(trabajador_id, []).append((inicio, fin))
+
+    for trabajador_id, lista in intervalos.items():
+        fi = min(inicio for inicio, _ in lista)
+        # Sin fecha de fin: afecta todo lo posterior a fi
+        ff = None if any(fin is None for _, fin in lista) else max(fin for _, fin in lista)
+        programar_recalculo(
+            f"Jornada: {instance}",
+            trabajador=Trabajador(pk=trabajador_id),
+            fi=fi,
+            ff=ff,
+        )
+
+
+@receiver(post_save, sender=JornadaLaboral)
+def jornada_modificada(sender, instance, created, **kwargs):
+    from .recalculo import programar_recalculo
+
+    if created or not instance.changed_fields & CAMPOS_HORARIO_JORNADA:
+        return
+
+    # Todos los periodos asignados a la jornada, incluso los ya cerrados: sus
+    # registros se calcularon con el horario anterior
+    asignaciones = list(
+        TrabajadorJornada.objects
+        .filter(jornada=instance, trabajador__isnull=False, fecha_inicio__isnull=False)
+        .values_list('trabajador_id', 'fecha_inicio', 'fecha_fin')
+    )
+    if not asignaciones:
+        return
+
+    fines = [fin for _, _, fin in asignaciones]
+    programar_recalculo(
+        f"Jornada laboral: {instance}",
+        trabajadores=sorted({trabajador_id for trabajador_id, _, _ in asignaciones}),
+        fi=min(inicio for _, inicio, _ in asignaciones),
+        ff=None if None in fines else max(fines),
+    )
@@ -1,3 +1,286 @@
+import io
+import os
+import tempfile
+from datetime import date, time, timedelta
+
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from workers.models import JornadaLaboral, Trabajador, TrabajadorJornada
+from .faltas import generar_faltas
+from .importacion import ErrorArchivo, ImportadorAsistencias, leer_filas, leer_json
+from .kardex import inicio_mes
+from .models import KardexMensual, RegistroAsistencia, ResumenDiario
+
+
+LUNES = date(2025, 3, 3)
+
+
+def crear_trabajador(numero='E1'):
+    """Trabajador con jornada de lunes a viernes, 9:00 a 17:00."""
+    trabajador = Trabajador.objects.create(nombre="Ana", numero_empleado=numero)
+    jornada = JornadaLaboral.objects.create(
+        descripcion="Matutino",
+        hora_entrada=time(9, 0),
+        hora_salida=time(17, 0),
+        dias_semana="L-V",
+    )
+    TrabajadorJornada.objects.create(
+        trabajador=trabajador, jornada=jornada, fecha_inicio=LUNES - timedelta(days=30)
+    )
+    return trabajador
+
+
+# ============================================================
+# IMPORTACIÓN: ERRORES DEL ARCHIVO
+# ============================================================
+
+class ImportacionErroresTests(TestCase):
+
+    def setUp(self):
+        self.trabajador = crear_trabajador()
+
+    def importar(self, contenido, formato):
+        stream = io.TextIOWrapper(io.BytesIO(contenido), encoding='utf-8-sig', newline='')
+        return ImportadorAsistencias().importar(leer_filas(stream, formato))
+
+    def test_elemento_que_no_es_objeto_es_error_de_fila(self):
+        resultado = self.importar(
+            b'[{"numero_empleado": "E1", "fecha": "2025-03-03", "hora_entrada": "09:00"}, 5]',
+            'json',
+        )
+
+        self.assertEqual(resultado.creados, 1)
+        self.assertEqual(resultado.omitidos, 1)
+        self.assertEqual(resultado.errores, ["Fila 2: la fila debe ser un objeto"])
+
+    def test_json_mal_formado_guarda_lo_leido_y_reporta_el_archivo(self):
+        resultado = self.importar(
+            b'[{"numero_empleado": "E1", "fecha": "2025-03-03", "hora_entrada": "09:00"}, {"fecha": ]',
+            'json',
+        )
+
+        self.assertEqual(resultado.creados, 1)
+        self.assertEqual(len(resultado.errores), 1)
+        self.assertTrue(resultado.errores[0].startswith("Archivo: JSON inválido"))
+
+    def test_objeto_mal_formado_no_carga_el_resto_del_archivo(self):
+        valido = '{"numero_empleado": "E1", "fecha": "2025-03-03"}'
+        contenido = '[' + valido + ', {"numero_empleado": "E1", "fecha": ' + (', ' + valido) * 5000 + ']'
+        stream = io.StringIO(contenido)
+        filas = leer_json(stream, tam_bloque=256, max_objeto=1024)
+
+        self.assertEqual(next(filas)['numero_empleado'], 'E1')
+        error = contenido.index('"fecha": ,') + len('"fecha": ')
+        with self.assertRaisesMessage(ErrorArchivo, f"cerca del carácter {error}"):
+            next(filas)
+        self.assertLess(stream.tell(), 2048)
+
+    def test_archivo_que_no_es_utf8(self):
+        resultado = self.importar(
+            'numero_empleado,fecha\nE1,2025-03-03\nÑ,2025-03-04\n'.encode('latin-1'),
+            'csv',
+        )
+
+        self.assertEqual(resultado.creados, 0)
+        self.assertIn("no está en UTF-8", resultado.errores[0])
+
+    def test_comando_reporta_errores_sin_traceback(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.json', delete=False) as archivo:
+            archivo.write(b'[{"numero_empleado": "E1", "fecha": "2025-03-03"}, "x", {')
+        self.addCleanup(os.remove, archivo.name)
+
+        salida, errores = io.StringIO(), io.StringIO()
+        call_command('importar_asistencias', archivo.name, stdout=salida, stderr=errores)
+
+        self.assertIn("Fila 2: la fila debe ser un objeto", errores.getvalue())
+        self.assertIn("Archivo: JSON inválido", errores.getvalue())
+        self.assertIn("1 creadas", salida.getvalue())
+
+
+# ============================================================
+# GENERACIÓN DE FALTAS
+# ============================================================
+
+class GenerarFaltasTests(TestCase):
+
+    def setUp(self):
+        self.trabajador = crear_trabajador()
+
+    def test_solo_dias_laborables_sin_registro(self):
+        RegistroAsistencia.objects.create(
+            trabajador=self.trabajador, fecha=LUNES, hora_entrada=time(9, 0)
+        )
+
+        resultado = generar_faltas(LUNES, LUNES + timedelta(days=6))
+
+        self.assertEqual(resultado.creadas, 4)
+        faltas = RegistroAsistencia.objects.filter(estatus='FALTA')
+        self.assertEqual(
+            sorted(faltas.values_list('fecha', flat=True)),
+            [LUNES + timedelta(days=i) for i in range(1, 5)],
+        )
+
+    def test_es_idempotente(self):
+        fi, ff = LUNES, LUNES + timedelta(days=13)
+        primera = generar_faltas(fi, ff)
+        segunda = generar_faltas(fi, ff)
+
+        self.assertEqual(primera.creadas, 10)
+        self.assertEqual(segunda.creadas, 0)
+        self.assertEqual(RegistroAsistencia.objects.count(), 10)
+
+
+# ============================================================
+# RESUMEN DIARIO
+# ============================================================
+
+class ResumenDiarioTests(TestCase):
+
+    def setUp(self):
+        self.trabajadores = [crear_trabajador(f'E{i}') for i in range(3)]
+
+    def conteos(self, fecha):
+        return dict(
+            ResumenDiario.objects.filter(fecha=fecha).values_list('estatus', 'total')
+        )
+
+    def test_se_recalcula_una_vez_por_transaccion(self):
+        tabla = ResumenDiario._meta.db_table
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                for trabajador, entrada in zip(self.trabajadores, [time(9), time(9, 20), None]):
+                    RegistroAsistencia.objects.create(
+                        trabajador=trabajador, fecha=LUNES, hora_entrada=entrada
+                    )
+
+        borrados = [q for q in consultas if q['sql'].startswith(f'DELETE FROM "{tabla}"')]
+        self.assertEqual(len(borrados), 1)
+        self.assertEqual(self.conteos(LUNES), {'NORMAL': 1, 'RETARDO': 1, 'FALTA': 1})
+
+    def test_mover_un_registro_actualiza_ambos_dias(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registro = RegistroAsistencia.objects.create(
+                trabajador=self.trabajadores[0], fecha=LUNES, hora_entrada=time(9)
+            )
+        registro = RegistroAsistencia.objects.get(pk=registro.pk)
+        registro.fecha = LUNES + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            registro.save()
+
+        self.assertEqual(self.conteos(LUNES), {})
+        self.assertEqual(self.conteos(LUNES + timedelta(days=1)), {'NORMAL': 1})
+
+
+# ============================================================
+# KÁRDEX MENSUAL
+# ============================================================
+
+class KardexMensualTests(TestCase):
+
+    def test_se_recalcula_una_vez_por_transaccion(self):
+        trabajador = crear_trabajador()
+        tabla = KardexMensual._meta.db_table
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                for i, entrada in enumerate([time(9), time(9, 20), None]):
+                    RegistroAsistencia.objects.create(
+                        trabajador=trabajador, fecha=LUNES + timedelta(days=i), hora_entrada=entrada
+                    )
+
+        borrados = [q for q in consultas if q['sql'].startswith(f'DELETE FROM "{tabla}"')]
+        self.assertEqual(len(borrados), 1)
+
+        kardex = KardexMensual.objects.get(trabajador=trabajador, mes=inicio_mes(LUNES))
+        self.assertEqual(
+            (kardex.dias_registrados, kardex.asistencias, kardex.retardos, kardex.faltas),
+            (3, 2, 1, 1),
+        )
+        self.assertEqual(kardex.minutos_retardo, 20)
+
+
+# ============================================================
+# RegistroAsistencia.save(): RECÁLCULO PARCIAL Y FORZADO
+# ============================================================
+
+class RegistroAsistenciaSaveTests(TestCase):
+
+    def setUp(self):
+        self.trabajador = crear_trabajador()
+        self.registro = RegistroAsistencia.objects.create(
+            trabajador=self.trabajador, fecha=LUNES, hora_entrada=time(9, 30)
+        )
+
+    def test_estatus_al_crear(self):
+        self.assertEqual(self.registro.estatus, 'RETARDO')
+        self.assertEqual(self.registro.minutos_retardo, 30)
+
+    def test_solo_salida_actualiza_horas_y_no_toca_el_estatus(self):
+        registro = RegistroAsistencia.objects.get(pk=self.registro.pk)
+        # Cambio concurrente a una columna que este save() no modificó
+        RegistroAsistencia.objects.filter(pk=registro.pk).update(minutos_retardo=99)
+
+        registro.hora_salida = time(17, 30)
+        self.assertEqual(registro.changed_fields, {'hora_salida'})
+        registro.save()
+
+        registro.refresh_from_db()
+        self.assertEqual(float(registro.horas_trabajadas), 8.0)
+        self.assertEqual(registro.minutos_retardo, 99)
+
+    def test_cambio_de_entrada_recalcula_el_estatus(self):
+        registro = RegistroAsistencia.objects.get(pk=self.registro.pk)
+        registro.hora_entrada = time(8, 55)
+        registro.save()
+
+        registro.refresh_from_db()
+        self.assertEqual(registro.estatus, 'NORMAL')
+        self.assertEqual(registro.minutos_retardo, 0)
+
+    def test_recalcular_corrige_un_estatus_desfasado(self):
+        # Ej. la jornada cambió después de guardar el registro
+        RegistroAsistencia.objects.filter(pk=self.registro.pk).update(estatus='FALTA')
+        registro = RegistroAsistencia.objects.get(pk=self.registro.pk)
+
+        registro.save()
+        self.assertEqual(RegistroAsistencia.objects.get(pk=registro.pk).estatus, 'FALTA')
+
+        registro.save(recalcular=True)
+        self.assertEqual(RegistroAsistencia.objects.get(pk=registro.pk).estatus, 'RETARDO')
+
+
+# ============================================================
+# RECÁLCULO AL CAMBIAR EL HORARIO DE UNA JORNADA
+# ============================================================
+
+class RecalculoJornadaTests(TestCase):
+
+    def setUp(self):
+        self.trabajador = crear_trabajador()
+        self.jornada = self.trabajador.jornadas.get().jornada
+        self.registro = RegistroAsistencia.objects.create(
+            trabajador=self.trabajador, fecha=LUNES, hora_entrada=time(9, 30)
+        )
+
+    def test_cambio_de_hora_de_entrada_recalcula_los_registros(self):
+        jornada = JornadaLaboral.objects.get(pk=self.jornada.pk)
+        jornada.hora_entrada = time(10, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            jornada.save()
+
+        self.registro.refresh_from_db()
+        self.assertEqual(self.registro.estatus, 'NORMAL')
+        self.assertEqual(self.registro.minutos_retardo, 0)
+
+    def test_otros_campos_no_recalculan(self):
+        RegistroAsistencia.objects.filter(pk=self.registro.pk).update(estatus='FALTA')
+
+        jornada = JornadaLaboral.objects.get(pk=self.jornada.pk)
+        jornada.descripcion = "Matutino A"
+        with self.captureOnCommitCallbacks(execute=True):
+            jornada.save()
 
-# Create your tests here.
+        self.registro.refresh_from_db()
+        self.assertEqual(self.registro.estatus, 'FALTA')
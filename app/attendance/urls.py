@@ -20,4 +20,11 @@ urlpatterns = [
     # Trabajador: registro personal y consulta
     path('marcar/', views.MiAsistenciaCreateView.as_view(), name='marcar_asistencia'),
     path('mis-asistencias/', views.MisAsistenciasListView.as_view(), name='mis_asistencias'),
+
+    # Tablero en vivo del día (server-sent events, requiere ASGI)
+    path('tablero/', views.TableroHoyView.as_view(), name='tablero_hoy'),
+    path('tablero/eventos/', views.tablero_eventos, name='tablero_eventos'),
+
+    # API para relojes checadores (token por terminal)
+    path('api/checadas/', views.ChecadasTerminalView.as_view(), name='api_checadas'),
 ]
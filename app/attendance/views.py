@@ -2,14 +2,25 @@
 # Vistas del módulo de asistencia
 # Basadas en el estilo de workers/views.py (roles, mixins, estructura limpia)
 
+import json
+
+from asgiref.sync import sync_to_async
 from pyexpat.errors import messages
 from django.contrib import messages
 from django.shortcuts import redirect
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from core.models import CalendarioLaboral
+from core.calendario import calendario
+from core.models import UnidadAdministrativa
 from django.urls import reverse_lazy
 from django.views.generic import (
-    ListView, CreateView, UpdateView, DetailView
+    ListView, CreateView, UpdateView, DetailView, TemplateView
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
 from accounts.mixins import (
@@ -19,7 +30,11 @@ from accounts.mixins import (
     SoloTrabajadorMixin,
 )
 from core.audit_views import AuditViewMixin
-from .models import RegistroAsistencia
+from core.paginacion import PaginacionKeysetMixin
+from .en_vivo import eventos_unidad
+from .checadas import MAX_CHECADAS_POR_LOTE, autenticar_terminal, registrar_checadas
+from .models import RegistroAsistencia, ResumenDiario
+from .resumen import conteos_por_estatus
 from .forms import AsistenciaAdminForm, AsistenciaTrabajadorForm
 
 
@@ -27,38 +42,51 @@ from .forms import AsistenciaAdminForm, AsistenciaTrabajadorForm
 # LISTA GENERAL (ADMIN / JEFE)
 # ============================================================
 
-class AsistenciaListView(LoginRequiredMixin, RedirigirTrabajadorAsistenciaMixin, AdminOJefeMixin, ListView):
+class AsistenciaListView(LoginRequiredMixin, RedirigirTrabajadorAsistenciaMixin, AdminOJefeMixin,
+                         PaginacionKeysetMixin, ListView):
     model = RegistroAsistencia
     template_name = 'attendance/lista_asistencias.html'
     context_object_name = 'asistencias'
     paginate_by = 20
+    orden_keyset = ('-fecha', 'apellido_orden', 'id')
 
     def get_queryset(self):
         qs = (
             RegistroAsistencia.objects
             .select_related('trabajador', 'incidencia')
-            .order_by('-fecha', 'trabajador__apellido_paterno')
+            .annotate(apellido_orden=Coalesce('trabajador__apellido_paterno', Value('')))
         )
 
         perfil = self.request.user.perfilusuario
 
+        # Las stats salen del resumen materializado, no del historial completo
+        self._resumen_for_stats = ResumenDiario.objects.all()
+
         # JEFE: solo trabajadores de su unidad
         if perfil.rol == 'JEFE':
-            qs = qs.filter(trabajador__unidad=perfil.trabajador.unidad)
-
-        self._qs_for_stats = qs   # <- Guardamos el queryset para stats
+            qs = qs.filter(unidad=perfil.trabajador.unidad)
+            self._resumen_for_stats = self._resumen_for_stats.filter(
+                unidad=perfil.trabajador.unidad
+            )
 
         return qs
 
+    def conteo_total(self, queryset):
+        # El resumen diario ya tiene el total exacto por unidad
+        self._totales = conteos_por_estatus(
+            getattr(self, '_resumen_for_stats', ResumenDiario.objects.none())
+        )
+        return sum(self._totales.values()), False
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        qs = getattr(self, '_qs_for_stats', RegistroAsistencia.objects.none())
+        totales = self._totales
 
-        context["total_puntuales"] = qs.filter(estatus="NORMAL").count()
-        context["total_retardos"] = qs.filter(estatus="RETARDO").count()
-        context["total_faltas"] = qs.filter(estatus="FALTA").count()
-        context["total_justificadas"] = qs.filter(estatus="JUSTIFICADA").count()
+        context["total_puntuales"] = totales.get("NORMAL", 0)
+        context["total_retardos"] = totales.get("RETARDO", 0)
+        context["total_faltas"] = totales.get("FALTA", 0)
+        context["total_justificadas"] = totales.get("JUSTIFICADA", 0)
 
         return context
 
@@ -92,7 +120,7 @@ class AsistenciaUpdateView(LoginRequiredMixin, AdminOJefeMixin, AuditViewMixin,
 
         # JEFE solo puede editar registros de su unidad
         if perfil.rol == 'JEFE':
-            return qs.filter(trabajador__unidad=perfil.trabajador.unidad)
+            return qs.filter(unidad=perfil.trabajador.unidad)
 
         return qs
 
@@ -122,16 +150,13 @@ class MiAsistenciaCreateView(LoginRequiredMixin, SoloTrabajadorMixin, AuditViewM
     def dispatch(self, request, *args, **kwargs):
         hoy = timezone.now().date()
 
-        dia_inhabil = CalendarioLaboral.objects.filter(
-            fecha=hoy,
-            es_inhabil=True
-        ).first()
+        motivo_inhabil = calendario.motivo(hoy)
 
-        if dia_inhabil:
+        if motivo_inhabil is not None:
             # Mostrar alerta visual en la pantalla de Mis Asistencias
             messages.error(
                 request,
-                f"Hoy es un día inhábil: {dia_inhabil.descripcion}. "
+                f"Hoy es un día inhábil: {motivo_inhabil}. "
                 "No puedes registrar asistencia."
             )
             return redirect("attendance:mis_asistencias")
@@ -194,12 +219,117 @@ class MisAsistenciasListView(LoginRequiredMixin, SoloTrabajadorMixin, ListView):
 
         qs = getattr(self, "_qs_for_stats", RegistroAsistencia.objects.none())
 
-        context["total_puntuales"]     = qs.filter(estatus="NORMAL").count()
-        context["total_retardos"]      = qs.filter(estatus="RETARDO").count()
-        context["total_faltas"]        = qs.filter(estatus="FALTA").count()
-        context["total_justificadas"]  = qs.filter(estatus="JUSTIFICADA").count()
+        # Un solo conteo agrupado por estatus
+        totales = dict(
+            qs.order_by()
+            .values('estatus')
+            .annotate(total=Count('id'))
+            .values_list('estatus', 'total')
+        )
+
+        context["total_puntuales"]     = totales.get("NORMAL", 0)
+        context["total_retardos"]      = totales.get("RETARDO", 0)
+        context["total_faltas"]        = totales.get("FALTA", 0)
+        context["total_justificadas"]  = totales.get("JUSTIFICADA", 0)
 
         # Si algún día quieres mostrar esto:
-        context["total_inhabiles"]     = qs.filter(estatus="INHABIL").count()
+        context["total_inhabiles"]     = totales.get("INHABIL", 0)
+
+        return context
+
+
+# ============================================================
+# API: CHECADAS DESDE TERMINALES
+# ============================================================
 
+@method_decorator(csrf_exempt, name='dispatch')
+class ChecadasTerminalView(View):
+    """
+    POST /attendance/api/checadas/
+    Authorization: Token <token de la terminal>
+    {"checadas": [{"clave", "numero_empleado", "marcado_en", "dispositivo"}, ...]}
+
+    Responde un resultado por checada, en el mismo orden. Reenviar una
+    checada con la misma clave no la duplica (estado "duplicada").
+    """
+    http_method_names = ['post']
+
+    def post(self, request):
+        terminal = autenticar_terminal(request)
+        if terminal is None:
+            return JsonResponse({'error': 'Token inválido o terminal inactiva.'}, status=401)
+
+        try:
+            datos = json.loads(request.body)
+            checadas = datos['checadas']
+            if not isinstance(checadas, list):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': 'Se esperaba {"checadas": [...]}.'}, status=400)
+
+        if len(checadas) > MAX_CHECADAS_POR_LOTE:
+            return JsonResponse(
+                {'error': f'Máximo {MAX_CHECADAS_POR_LOTE} checadas por solicitud.'},
+                status=413,
+            )
+
+        resultados = registrar_checadas(terminal, checadas)
+        return JsonResponse({
+            'terminal': terminal.identificador,
+            'registradas': sum(r['estado'] == 'registrada' for r in resultados),
+            'duplicadas': sum(r['estado'] == 'duplicada' for r in resultados),
+            'errores': sum(r['estado'] == 'error' for r in resultados),
+            'resultados': resultados,
+        })
+
+
+# ============================================================
+# TABLERO EN VIVO DEL DÍA (ADMIN / JEFE)
+# La página se conecta por server-sent events a tablero_eventos, que
+# requiere servir con ASGI (config/asgi.py).
+# ============================================================
+
+def unidad_del_tablero(user, unidad_id):
+    """Unidad que puede ver `user` en el tablero (JEFE: la suya) o None."""
+    perfil = getattr(user, 'perfilusuario', None)
+    if perfil is None:
+        return None
+    if perfil.rol == 'JEFE':
+        return perfil.trabajador.unidad_id
+    if perfil.rol == 'ADMIN':
+        try:
+            unidad_id = int(unidad_id)
+        except (TypeError, ValueError):
+            return None
+        return unidad_id if UnidadAdministrativa.objects.filter(pk=unidad_id).exists() else None
+    return None
+
+
+class TableroHoyView(LoginRequiredMixin, AdminOJefeMixin, TemplateView):
+    template_name = 'attendance/tablero_hoy.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        perfil = self.request.user.perfilusuario
+
+        unidad_id = unidad_del_tablero(self.request.user, self.request.GET.get('unidad'))
+        if perfil.rol == 'ADMIN':
+            context['unidades'] = UnidadAdministrativa.objects.order_by('nombre')
+        context['unidad'] = UnidadAdministrativa.objects.filter(pk=unidad_id).first() if unidad_id else None
+        context['hoy'] = timezone.localdate()
         return context
+
+
+@login_required
+async def tablero_eventos(request):
+    """Stream text/event-stream con el estado del día de la unidad y sus cambios."""
+    user = await request.auser()
+    unidad_id = await sync_to_async(unidad_del_tablero)(user, request.GET.get('unidad'))
+    if unidad_id is None:
+        return HttpResponseForbidden("No tiene acceso al tablero de esa unidad.")
+
+    response = StreamingHttpResponse(eventos_unidad(unidad_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Sin búfer en nginx para que cada evento llegue al momento
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    # config no tiene modelos; se instala solo para registrar las señales del
+    # dashboard principal
+    name = 'config'
+    label = 'dashboard'
+
+    def ready(self):
+        # Invalida las métricas del dashboard cuando cambian asistencias,
+        # incidencias o trabajadores
+        import config.metricas
@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+El tablero en vivo de asistencia (attendance/en_vivo.py) usa server-sent
+events: cada conexión es una respuesta en streaming que queda abierta, por lo
+que debe servirse con un servidor ASGI (ej. `uvicorn config.asgi:application`).
+Con WSGI cada navegador conectado ocuparía un worker completo.
 """
 
 import os
@@ -0,0 +1,134 @@
+# config/metricas.py
+# Métricas del dashboard principal
+#
+# Cada carga del dashboard contaba los trabajadores activos dos veces, las
+# asistencias de hoy, las incidencias pendientes y la serie de la semana.
+# Aquí se calculan con tres consultas (la serie y el día de hoy salen de una
+# sola consulta agrupada a ResumenDiario) y el resultado se guarda en el cache
+# de Django por alcance (todas las unidades o la unidad del JEFE), semana y día.
+#
+# Invalidación: cada alcance tiene un sello de versión que forma parte de la
+# llave. Se renueva al confirmar cambios de asistencia, incidencias o
+# trabajadores (el global con cualquier cambio, el de la unidad con los
+# suyos). El TTL corto acota lo que pueda quedar desfasado con un cache que
+# no se comparte entre procesos.
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.models import RegistroAsistencia, ResumenDiario
+from attendance.signals import asistencias_modificadas
+from incidents.models import Incidencia
+from workers.models import Trabajador
+
+
+SEGUNDOS_CACHE = getattr(settings, 'DASHBOARD_CACHE_SEGUNDOS', 60)
+
+PREFIJO = 'dashboard:metricas'
+
+DIAS_GRAFICA = 5
+
+
+def _clave_version(unidad_id):
+    return f'{PREFIJO}:version:{unidad_id or "todas"}'
+
+
+def _version(unidad_id):
+    clave = _clave_version(unidad_id)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), timeout=None)
+        version = cache.get(clave)
+    return version
+
+
+def invalidar_metricas(unidades=()):
+    """Renueva (al confirmar) el sello global y el de cada unidad de `unidades`."""
+    claves = [_clave_version(None)] + [_clave_version(u) for u in set(unidades) if u is not None]
+
+    def renovar():
+        sello = time.time_ns()
+        cache.set_many({clave: sello for clave in claves}, timeout=None)
+
+    transaction.on_commit(renovar)
+
+
+# ============================================================
+# CÁLCULO
+# ============================================================
+
+def _calcular(unidad_id, inicio_semana, hoy):
+    trabajadores = Trabajador.objects.filter(activo=True)
+    resumen = ResumenDiario.objects.filter(estatus__in=RegistroAsistencia.ESTADOS_ASISTIO)
+    incidencias = Incidencia.objects.filter(estatus='PENDIENTE')
+    if unidad_id is not None:
+        trabajadores = trabajadores.filter(unidad_id=unidad_id)
+        resumen = resumen.filter(unidad_id=unidad_id)
+        incidencias = incidencias.filter(unidad_id=unidad_id)
+
+    fin_semana = inicio_semana + timedelta(days=DIAS_GRAFICA - 1)
+
+    # La semana y el día de hoy (que puede no estar en ella) en una consulta
+    por_dia = dict(
+        resumen
+        .filter(Q(fecha__range=(inicio_semana, fin_semana)) | Q(fecha=hoy))
+        .values('fecha')
+        .annotate(suma=Sum('total'))
+        .order_by()
+        .values_list('fecha', 'suma')
+    )
+
+    return {
+        'total_trabajadores': trabajadores.count(),
+        'total_asistencias': por_dia.get(hoy, 0),
+        'total_incidencias': incidencias.count(),
+        'asistencias_semana': [
+            por_dia.get(inicio_semana + timedelta(days=i), 0) for i in range(DIAS_GRAFICA)
+        ],
+    }
+
+
+def metricas_dashboard(unidad_id, inicio_semana, hoy):
+    """
+    Totales del dashboard para una unidad (None = todas) y la semana que
+    empieza en `inicio_semana`: total_trabajadores, total_asistencias (hoy),
+    total_incidencias (pendientes) y asistencias_semana (lunes a viernes).
+    """
+    llave = (
+        f'{PREFIJO}:{unidad_id or "todas"}:{inicio_semana.isoformat()}:'
+        f'{hoy.isoformat()}:{_version(unidad_id)}'
+    )
+    metricas = cache.get(llave)
+    if metricas is None:
+        metricas = _calcular(unidad_id, inicio_semana, hoy)
+        cache.set(llave, metricas, SEGUNDOS_CACHE)
+    return metricas
+
+
+# ============================================================
+# INVALIDACIÓN
+# ============================================================
+
+@receiver(asistencias_modificadas)
+def asistencias_cambiaron(sender, registros, **kwargs):
+    invalidar_metricas({unidad_id for _, unidad_id, _ in registros})
+
+
+@receiver(post_save, sender=Incidencia)
+@receiver(post_delete, sender=Incidencia)
+def incidencia_cambio(sender, instance, **kwargs):
+    invalidar_metricas({instance.unidad_id})
+
+
+@receiver(post_save, sender=Trabajador)
+@receiver(post_delete, sender=Trabajador)
+def trabajador_cambio(sender, instance, **kwargs):
+    # Cambia el conteo de activos de su unidad (y de la anterior si se movió)
+    invalidar_metricas({instance.unidad_id, instance.previous('unidad')})
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     'attendance',
     'incidents',
     'reports',
+    'config.apps.DashboardConfig',
     'django.contrib.sites',
     'allauth',
     'allauth.account',
@@ -99,6 +100,24 @@ DATABASES = {
 }
 
 
+# Cache
+# Por defecto en memoria del proceso. Para compartir sellos de versión entre
+# procesos (gunicorn con varios workers) usar un backend compartido, ej.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+# Segundos que se conservan las métricas del dashboard (config/metricas.py)
+DASHBOARD_CACHE_SEGUNDOS = int(os.environ.get('DASHBOARD_CACHE_SEGUNDOS', 60))
+# Tablero en vivo: cada cuántos segundos revisa cada proceso los cambios hechos
+# en otros procesos (un sello por unidad en el cache; requiere un CACHE_BACKEND
+# compartido entre procesos, sin consultar la base)
+TABLERO_INTERVALO_SEGUNDOS = float(os.environ.get('TABLERO_INTERVALO_SEGUNDOS', 2))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -167,3 +186,40 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@sca-b123.local')
+
+# Asistencia: filas por lote en la importación masiva de checadas
+ASISTENCIA_IMPORTACION_LOTE = int(os.environ.get('ASISTENCIA_IMPORTACION_LOTE', 2000))
+# Asistencia: registros por INSERT al generar faltas
+ASISTENCIA_FALTAS_LOTE = int(os.environ.get('ASISTENCIA_FALTAS_LOTE', 5000))
+# Calendario laboral: cada cuántos segundos se revisa el sello de versión compartido
+CALENDARIO_REVALIDAR_SEGUNDOS = int(os.environ.get('CALENDARIO_REVALIDAR_SEGUNDOS', 5))
+# Calendario laboral: edad máxima (segundos) de un año cargado antes de releerlo de
+# la base, aunque el sello no haya cambiado (cache no compartido entre procesos)
+CALENDARIO_EDAD_MAXIMA_SEGUNDOS = int(os.environ.get('CALENDARIO_EDAD_MAXIMA_SEGUNDOS', 300))
+# Asistencia: tamaño de lote del recálculo y límite para hacerlo en línea (si no, se encola)
+ASISTENCIA_RECALCULO_LOTE = int(os.environ.get('ASISTENCIA_RECALCULO_LOTE', 2000))
+ASISTENCIA_RECALCULO_MAX_SINCRONO = int(os.environ.get('ASISTENCIA_RECALCULO_MAX_SINCRONO', 5000))
+# Asistencia: máximo de checadas por solicitud en la API de terminales
+ASISTENCIA_API_MAX_CHECADAS = int(os.environ.get('ASISTENCIA_API_MAX_CHECADAS', 1000))
+# Asistencia: particionado mensual en PostgreSQL (opcional, ver attendance/particiones.py)
+ASISTENCIA_PARTICIONADA = os.environ.get('ASISTENCIA_PARTICIONADA', 'False') == 'True'
+ASISTENCIA_PARTICIONES_ADELANTE = int(os.environ.get('ASISTENCIA_PARTICIONES_ADELANTE', 3))
+ASISTENCIA_ARCHIVO_DIR = os.environ.get('ASISTENCIA_ARCHIVO_DIR', str(BASE_DIR / 'archivo_asistencias'))
+# Reportes: filas por bloque al leer la base de datos en las exportaciones CSV
+REPORTES_CSV_LOTE = int(os.environ.get('REPORTES_CSV_LOTE', 2000))
+# Reportes en segundo plano: carpeta de archivos generados, procesos del comando
+# `procesar_reportes` y minutos tras los que un trabajo en proceso se reintenta
+REPORTES_DIR = os.environ.get('REPORTES_DIR', str(BASE_DIR / 'reportes_generados'))
+REPORTES_PROCESOS = int(os.environ.get('REPORTES_PROCESOS', 2))
+REPORTES_TRABAJO_MAX_MINUTOS = int(os.environ.get('REPORTES_TRABAJO_MAX_MINUTOS', 60))
+# Cierre de mes (`exportar_cierre`): días de cada bloque que procesa el pool
+REPORTES_CIERRE_DIAS_BLOQUE = int(os.environ.get('REPORTES_CIERRE_DIAS_BLOQUE', 7))
+# Feed de cambios para nómina: token del header `Authorization: Token ...` (vacío =
+# solo sesión de ADMIN) y segundos recientes que aún no se entregan
+REPORTES_CAMBIOS_TOKEN = os.environ.get('REPORTES_CAMBIOS_TOKEN', '')
+REPORTES_CAMBIOS_MARGEN_SEGUNDOS = int(os.environ.get('REPORTES_CAMBIOS_MARGEN_SEGUNDOS', 60))
+# Reportes: tamaño máximo (MB) del cache de resultados en memoria de cada proceso
+REPORTES_CACHE_MAX_MB = int(os.environ.get('REPORTES_CACHE_MAX_MB', 64))
+# Reportes: segundos que dura una entrada del cache de resultados (acota lo desfasado
+# si los sellos de versión no se comparten entre procesos)
+REPORTES_CACHE_SEGUNDOS = int(os.environ.get('REPORTES_CACHE_SEGUNDOS', 300))
@@ -1,11 +1,12 @@
+from datetime import timedelta
+
 from django.utils import timezone
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 
-from incidents.models import Incidencia
-from workers.models import Trabajador
-from attendance.models import RegistroAsistencia
-from core.models import CalendarioLaboral, TipoIncidencia
+from core.calendario import calendario
+from core.models import CalendarioLaboral
+from .metricas import metricas_dashboard
 
 @login_required
 def dashboard(request):
@@ -18,54 +19,15 @@ def dashboard(request):
     # ============================================
     # 0. Día inhábil (Calendario Laboral)
     # ============================================
-    dia_inhabil = CalendarioLaboral.objects.filter(
-        fecha=hoy,
-        es_inhabil=True
-    ).first()
-
-    # ============================================
-    # 1. Total de trabajadores activos
-    # ============================================
-    if perfil.rol == 'JEFE':
-        total_trabajadores = Trabajador.objects.filter(
-            activo=True,
-            unidad=perfil.trabajador.unidad
-        ).count()
-    else:  # ADMIN y otros
-        total_trabajadores = Trabajador.objects.filter(activo=True).count()
-
-    # ============================================
-    # 2. Asistencias de hoy
-    # ============================================
-    if perfil.rol == 'JEFE':
-        total_asistencias = RegistroAsistencia.objects.filter(
-            fecha=hoy,
-            trabajador__unidad=perfil.trabajador.unidad
-        ).count()
-    else:
-        total_asistencias = RegistroAsistencia.objects.filter(
-            fecha=hoy
-        ).count()
-
-    # ============================================
-    # 3. Incidencias pendientes
-    # ADMIN y JEFE deben ver solo lo correspondiente
-    # ============================================
-    if perfil.rol == 'JEFE':
-        total_incidencias = Incidencia.objects.filter(
-            estatus='PENDIENTE',                 
-            trabajador__unidad=perfil.trabajador.unidad
-        ).count()
-    else:
-        total_incidencias = Incidencia.objects.filter(
-            estatus='PENDIENTE'                
-        ).count()
+    motivo_inhabil = calendario.motivo(hoy)
+    dia_inhabil = (
+        CalendarioLaboral(fecha=hoy, es_inhabil=True, descripcion=motivo_inhabil)
+        if motivo_inhabil is not None else None
+    )
 
     # ============================================
-    # 4. Gráfica semanal de asistencia
+    # 1. Gráfica semanal de asistencia (rango)
     # ============================================
-    from datetime import timedelta
-
     semana_seleccionada = request.GET.get('semana', 'esta_semana')
 
     # Cálculo del rango semanal
@@ -83,52 +45,40 @@ def dashboard(request):
         inicio_semana = hoy - timedelta(days=hoy.weekday())
         fin_semana = inicio_semana + timedelta(days=4)
 
+    # ============================================
+    # 2. Totales y serie semanal (config/metricas.py, en cache)
+    # ADMIN y JEFE deben ver solo lo correspondiente
+    # ============================================
+    unidad_id = perfil.trabajador.unidad_id if perfil.rol == 'JEFE' else None
+    metricas = metricas_dashboard(unidad_id, inicio_semana, hoy)
+
+    total_trabajadores = metricas['total_trabajadores']
+
     # Labels y datos
     dias_semana = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie']
     chart_labels = []
     chart_data = []
 
-    # Total trabajadores activos (según el rol):
-    total_trabajadores_activos = (
-        Trabajador.objects.filter(activo=True, unidad=perfil.trabajador.unidad).count()
-        if perfil.rol == 'JEFE'
-        else Trabajador.objects.filter(activo=True).count()
-    )
+    for i, asistencias_dia in enumerate(metricas['asistencias_semana']):
+        fecha_dia = inicio_semana + timedelta(days=i)
+        chart_labels.append(f"{dias_semana[i]} {fecha_dia.day}/{fecha_dia.month}")
+
+        # Evitar división entre cero
+        if fecha_dia > hoy or total_trabajadores == 0:
+            chart_data.append(0)
+            continue
+
+        porcentaje = round((asistencias_dia / total_trabajadores) * 100, 1)
+        chart_data.append(porcentaje)
 
-    # Evitar división entre cero
-    if total_trabajadores_activos == 0:
-        chart_data = [0, 0, 0, 0, 0]
-    else:
-        for i in range(5):
-            fecha_dia = inicio_semana + timedelta(days=i)
-            chart_labels.append(f"{dias_semana[i]} {fecha_dia.day}/{fecha_dia.month}")
-
-            if fecha_dia > hoy:
-                chart_data.append(0)
-                continue
-
-            # Asistencias por rol
-            if perfil.rol == 'JEFE':
-                asistencias_dia = RegistroAsistencia.objects.filter(
-                    fecha=fecha_dia,
-                    trabajador__unidad=perfil.trabajador.unidad
-                ).count()
-            else:
-                asistencias_dia = RegistroAsistencia.objects.filter(
-                    fecha=fecha_dia
-                ).count()
-
-            porcentaje = round((asistencias_dia / total_trabajadores_activos) * 100, 1)
-            chart_data.append(porcentaje)
-        
     es_admin = perfil.rol == "ADMIN"
     es_jefe = perfil.rol == "JEFE"
     es_trabajador = perfil.rol == "TRAB"  # o el valor real que uses en choices
 
     context = {
         'total_trabajadores': total_trabajadores,
-        'total_asistencias': total_asistencias,
-        'total_incidencias': total_incidencias,
+        'total_asistencias': metricas['total_asistencias'],
+        'total_incidencias': metricas['total_incidencias'],
         'chart_labels': chart_labels,
         'chart_data': chart_data,
         'semana_seleccionada': semana_seleccionada,
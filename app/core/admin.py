@@ -1,4 +1,6 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.urls import reverse
+from django.utils.html import format_html
 from .models import (
     Puesto, TipoNombramiento,
     TipoIncidencia, UnidadAdministrativa,
@@ -9,6 +11,23 @@ from .models import (
 class UnidadAdministrativaAdmin(admin.ModelAdmin):
     list_display = ('nombre', 'unidad_padre', 'created_at', 'updated_at', 'created_by', 'updated_by')
     search_fields = ('nombre',)
+    actions = ['exportar_cierre']
+
+    @admin.action(description="Exportar cierre del mes anterior (CSV por unidad)")
+    def exportar_cierre(self, request, queryset):
+        # Se encola en ReporteJob; lo genera `procesar_reportes`
+        from reports.cierre import encolar_cierre, mes_anterior
+
+        anio, mes = mes_anterior()
+        trabajo = encolar_cierre(anio, mes, usuario=request.user, unidades=list(queryset))
+        self.message_user(
+            request,
+            format_html(
+                'Cierre {} encolado para {} unidades. Avance en <a href="{}">Trabajos de reportes</a>.',
+                f"{anio}-{mes:02d}", queryset.count(), reverse('reports:trabajos'),
+            ),
+            messages.SUCCESS,
+        )
 
 @admin.register(Puesto)
 class PuestoAdmin(admin.ModelAdmin):
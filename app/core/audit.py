@@ -6,6 +6,10 @@ class AuditMixin(models.Model):
     Auditoría básica:
     - created_at / updated_at
     - created_by / updated_by
+
+    Además recuerda los valores con que se leyó la fila (o con que se guardó
+    por última vez): `changed_fields`, `previous(campo)` y, al actualizar sin
+    update_fields, un UPDATE solo de los campos que cambiaron.
     """
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
@@ -28,3 +32,70 @@ class AuditMixin(models.Model):
 
     class Meta:
         abstract = True
+
+    # --------------------------------------------------
+    # Campos modificados
+    # --------------------------------------------------
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # field_names son attnames; los diferidos llegan como DEFERRED
+        instance._originales = {
+            nombre: valor for nombre, valor in zip(field_names, values) if valor is not models.DEFERRED
+        }
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._tomar_originales(fields)
+
+    def _tomar_originales(self, campos=None):
+        """Guarda los valores cargados (los diferidos con only()/defer() no)."""
+        originales = self.__dict__.setdefault('_originales', {})
+        for field in self._meta.concrete_fields:
+            if campos is not None and field.name not in campos and field.attname not in campos:
+                continue
+            if field.attname in self.__dict__:
+                originales[field.attname] = self.__dict__[field.attname]
+
+    @property
+    def changed_fields(self):
+        """
+        Nombres de los campos que cambiaron desde que se leyó o guardó la
+        instancia. Si nunca se ha leído ni guardado, todos los asignados.
+        """
+        originales = self.__dict__.get('_originales', {})
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and (
+                field.attname not in originales
+                or originales[field.attname] != self.__dict__[field.attname]
+            )
+        }
+
+    def previous(self, campo):
+        """
+        Valor de `campo` (nombre o attname; en llaves foráneas, el id) al
+        leerse o guardarse por última vez; None si no se conoce.
+        """
+        field = self._meta.get_field(campo)
+        return self.__dict__.get('_originales', {}).get(field.attname)
+
+    def save(self, *args, **kwargs):
+        # Al actualizar una fila leída se escriben solo los campos modificados
+        # (updated_at siempre, lo pone auto_now)
+        if (
+            kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not self._state.adding
+            and '_originales' in self.__dict__
+        ):
+            kwargs['update_fields'] = self.changed_fields | {'updated_at'}
+
+        super().save(*args, **kwargs)
+
+        # Lo guardado pasa a ser el valor original
+        self._tomar_originales(kwargs.get('update_fields'))
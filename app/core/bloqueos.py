@@ -0,0 +1,36 @@
+# core/bloqueos.py
+# Candados por clave para las tablas derivadas (resumen diario, kárdex)
+#
+# ResumenDiario y KardexMensual se recalculan borrando y volviendo a agregar
+# las filas de cada clave. Dos transacciones que tocan la misma clave a la vez
+# agregarían cada una sin ver el registro de la otra: chocarían en la
+# restricción única o, con unidad NULL (que la restricción no cubre),
+# duplicarían los conteos.
+#
+# En PostgreSQL se toma un candado asesor de transacción por clave antes de
+# agregar: la segunda transacción espera a que la primera confirme y agrega
+# ya con sus datos. SQLite serializa las transacciones de escritura, así que
+# ahí no hace falta.
+
+from django.db import connection
+
+
+def bloquear_claves(espacio, claves):
+    """
+    Toma (hasta el fin de la transacción) un candado por cada clave de
+    `claves` dentro de `espacio`. Se toman ordenados para no caer en deadlock.
+    None es una clave como cualquier otra (ej. registros sin unidad).
+    """
+    if connection.vendor != 'postgresql':
+        return
+
+    textos = sorted({f"{espacio}:" + ":".join(str(parte) for parte in clave) for clave in claves})
+    if not textos:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(clave)) "
+            "FROM unnest(%s::text[]) WITH ORDINALITY AS c(clave, orden) ORDER BY orden",
+            [textos],
+        )
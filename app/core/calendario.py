@@ -0,0 +1,122 @@
+# core/calendario.py
+# Cache en memoria del Calendario Laboral
+#
+# La tabla es pequeña y casi nunca cambia, pero se consulta en cada checada,
+# en cada guardado de asistencia y en el dashboard. Aquí se carga una vez por
+# año (fecha -> motivo, más una lista ordenada para rangos) y se responde sin
+# tocar la base de datos.
+#
+# Invalidación:
+# - En el mismo proceso: señales post_save / post_delete (core/signals.py).
+# - Entre procesos: un sello de versión en el cache de Django. Cada proceso lo
+#   revisa como máximo cada CALENDARIO_REVALIDAR_SEGUNDOS. Solo funciona con un
+#   CACHE_BACKEND compartido; con el LocMemCache por omisión cada proceso tiene
+#   su propio sello y no se entera de los cambios de los demás.
+# - Por eso, además, cada año cargado caduca a los
+#   CALENDARIO_EDAD_MAXIMA_SEGUNDOS y se vuelve a leer de la base sin importar
+#   el sello: un día inhábil editado en otro proceso (o desde un comando) se ve
+#   a más tardar en ese tiempo.
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CLAVE_VERSION = 'core:calendario_laboral:version'
+
+
+class CalendarioLaboralCache:
+
+    def __init__(self, revalidar_cada=None, edad_maxima=None):
+        self.revalidar_cada = (
+            revalidar_cada if revalidar_cada is not None
+            else getattr(settings, 'CALENDARIO_REVALIDAR_SEGUNDOS', 5)
+        )
+        self.edad_maxima = (
+            edad_maxima if edad_maxima is not None
+            else getattr(settings, 'CALENDARIO_EDAD_MAXIMA_SEGUNDOS', 300)
+        )
+        self._lock = threading.Lock()
+        # año -> (dict fecha -> motivo, lista ordenada de fechas, momento de carga)
+        self._anios = {}
+        self._version = None
+        self._revisado = 0.0
+
+    # --------------------------------------------------
+    # Consultas
+    # --------------------------------------------------
+
+    def es_inhabil(self, fecha):
+        return fecha in self._anio(fecha.year)[0]
+
+    def motivo(self, fecha):
+        """Motivo del día inhábil (ej. 'Año Nuevo') o None si es hábil."""
+        return self._anio(fecha.year)[0].get(fecha)
+
+    def inhabiles_en_rango(self, fi, ff):
+        """Lista ordenada de días inhábiles en [fi, ff]."""
+        dias = []
+        for anio in range(fi.year, ff.year + 1):
+            ordenadas = self._anio(anio)[1]
+            dias.extend(ordenadas[bisect_left(ordenadas, fi):bisect_right(ordenadas, ff)])
+        return dias
+
+    # --------------------------------------------------
+    # Carga e invalidación
+    # --------------------------------------------------
+
+    def _anio(self, anio):
+        self._revalidar()
+        datos = self._anios.get(anio)
+        if datos is None or self._caducado(datos):
+            with self._lock:
+                datos = self._anios.get(anio)
+                if datos is None or self._caducado(datos):
+                    datos = self._cargar(anio)
+                    self._anios[anio] = datos
+        return datos
+
+    def _caducado(self, datos):
+        return time.monotonic() - datos[2] >= self.edad_maxima
+
+    def _cargar(self, anio):
+        from core.models import CalendarioLaboral
+
+        motivos = dict(
+            CalendarioLaboral.objects
+            .filter(fecha__year=anio, es_inhabil=True)
+            .values_list('fecha', 'descripcion')
+        )
+        return motivos, sorted(motivos), time.monotonic()
+
+    def _revalidar(self):
+        ahora = time.monotonic()
+        if ahora - self._revisado < self.revalidar_cada:
+            return
+        self._revisado = ahora
+
+        version = cache.get(CLAVE_VERSION, 0)
+        if version != self._version:
+            self.limpiar()
+            self._version = version
+
+    def limpiar(self):
+        """Descarta lo cargado en este proceso."""
+        with self._lock:
+            self._anios = {}
+
+    def invalidar(self):
+        """Descarta lo cargado y avisa a los demás procesos."""
+        self.limpiar()
+        try:
+            self._version = cache.incr(CLAVE_VERSION)
+        except ValueError:
+            # La clave no existía (cache reiniciado o primera escritura)
+            cache.add(CLAVE_VERSION, 1, timeout=None)
+            self._version = cache.get(CLAVE_VERSION, 1)
+
+
+calendario = CalendarioLaboralCache()
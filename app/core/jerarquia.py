@@ -0,0 +1,52 @@
+# core/jerarquia.py
+# Subárboles de UnidadAdministrativa (unidad_padre)
+#
+# Un subárbol se resuelve con una sola consulta WITH RECURSIVE (misma sintaxis
+# en SQLite y PostgreSQL) en lugar de recorrer sub_unidades nivel por nivel,
+# que costaría una consulta por unidad.
+
+from django.db import connection
+
+from .models import UnidadAdministrativa
+
+
+def cte_subarbol(raiz_id=None):
+    """
+    (sql, params) de `WITH RECURSIVE arbol(id, unidad_padre_id, nombre,
+    profundidad, ruta)` con la unidad `raiz_id` y todas sus descendientes;
+    sin raíz, todas las unidades a partir de las de primer nivel. Se antepone
+    a un SELECT que use `arbol`.
+
+    `unidad_padre` se edita libremente en el admin y podría formar un ciclo:
+    cada fila lleva la ruta de ids desde la raíz (',1,5,9,') y no se baja a
+    una unidad que ya esté en ella, así que la consulta siempre termina.
+    """
+    tabla = connection.ops.quote_name(UnidadAdministrativa._meta.db_table)
+
+    if raiz_id is None:
+        condicion, params = "unidad_padre_id IS NULL", []
+    else:
+        condicion, params = "id = %s", [raiz_id]
+
+    sql = f"""
+        WITH RECURSIVE arbol(id, unidad_padre_id, nombre, profundidad, ruta) AS (
+            SELECT id, unidad_padre_id, nombre, 0, ',' || CAST(id AS VARCHAR(20)) || ','
+            FROM {tabla}
+            WHERE {condicion}
+            UNION ALL
+            SELECT u.id, u.unidad_padre_id, u.nombre, a.profundidad + 1,
+                   a.ruta || CAST(u.id AS VARCHAR(20)) || ','
+            FROM {tabla} u
+            JOIN arbol a ON u.unidad_padre_id = a.id
+            WHERE a.ruta NOT LIKE '%%,' || CAST(u.id AS VARCHAR(20)) || ',%%'
+        )
+    """
+    return sql, params
+
+
+def descendientes(unidad_id):
+    """Ids de `unidad_id` y de todas sus sub-unidades (a cualquier nivel)."""
+    cte, params = cte_subarbol(unidad_id)
+    with connection.cursor() as cursor:
+        cursor.execute(f"{cte} SELECT id FROM arbol", params)
+        return [fila[0] for fila in cursor.fetchall()]
@@ -0,0 +1,86 @@
+# core/lotes.py
+# Trabajo que se junta durante una transacción y se hace una vez al confirmarla
+#
+# Los receptores de señales que escriben algo por cada fila (tablas derivadas,
+# marcas de borrado) se vuelven N+1 en los procesos masivos y en los borrados
+# en cascada. En su lugar acumulan en el lote de la transacción en curso, que
+# se procesa una sola vez con transaction.on_commit.
+#
+# Hay un lote por savepoint: el on_commit de un savepoint que se revierte se
+# descarta junto con lo que se acumuló en él. Fuera de una transacción no hay
+# lote y el llamador procesa en el momento.
+
+import threading
+
+from django.db import transaction
+
+
+_activos = threading.local()
+
+
+class Lote:
+    """Acumulador que se procesa una sola vez, al confirmar su transacción."""
+
+    def __init__(self):
+        self.procesado = False
+
+    def procesar(self):
+        raise NotImplementedError
+
+    def confirmar(self):
+        if not self.procesado:
+            self.procesado = True
+            self.procesar()
+
+
+class LoteClaves(Lote):
+    """Junta claves y llama `funcion(claves)` una vez con todas."""
+
+    def __init__(self, funcion):
+        super().__init__()
+        self.funcion = funcion
+        self.claves = set()
+
+    def procesar(self):
+        self.funcion(self.claves)
+
+
+def lote_actual(nombre, crear):
+    """
+    Lote `nombre` de la transacción y savepoint en curso, creado con `crear()`
+    y programado para procesarse al confirmar. None fuera de una transacción.
+    """
+    conexion = transaction.get_connection()
+    if not conexion.in_atomic_block:
+        return None
+
+    # Los que ya no están en los on_commit pendientes se confirmaron o se revirtieron
+    pendientes = {entrada[1] for entrada in conexion.run_on_commit}
+    lotes = {
+        clave: lote
+        for clave, lote in getattr(_activos, 'lotes', {}).items()
+        if not lote.procesado and lote.confirmar in pendientes
+    }
+    _activos.lotes = lotes
+
+    clave = (nombre, tuple(conexion.savepoint_ids))
+    if clave not in lotes:
+        lotes[clave] = crear()
+        transaction.on_commit(lotes[clave].confirmar)
+    return lotes[clave]
+
+
+def al_confirmar(nombre, funcion, claves):
+    """
+    Llama `funcion(claves)` al confirmar la transacción, una sola vez con las
+    claves de todas las llamadas con el mismo `nombre`; sin transacción, ya.
+    """
+    claves = set(claves)
+    if not claves:
+        return
+
+    lote = lote_actual(nombre, lambda: LoteClaves(funcion))
+    if lote is None:
+        funcion(claves)
+    else:
+        lote.claves |= claves
@@ -0,0 +1,208 @@
+# core/paginacion.py
+# Paginación por llave (keyset / seek) para listas con historial grande
+#
+# La paginación por OFFSET de Django lee y descarta todas las filas
+# anteriores a la página pedida y además hace un COUNT(*) completo. Aquí la
+# página se ubica con una condición sobre la última fila vista
+# ("fecha < f OR (fecha = f AND (apellido > a OR ...))"), de modo que la
+# página 5,000 cuesta lo mismo que la primera. El cursor va firmado en la URL.
+
+import json
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+
+from django.core import signing
+from django.db import connection
+from django.db.models import Q
+
+
+SAL_CURSOR = 'core.paginacion.cursor'
+
+# Por encima de este número el conteo se reporta como "más de N"
+LIMITE_CONTEO = 10000
+
+
+def _serializar(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+class PaginaKeyset:
+    """Expone la misma interfaz básica que django.core.paginator.Page."""
+
+    def __init__(self, object_list, cursor_anterior, cursor_siguiente, conteo=None):
+        self.object_list = object_list
+        self.cursor_anterior = cursor_anterior
+        self.cursor_siguiente = cursor_siguiente
+        # conteo = (total, es_aproximado) o None si no se pidió
+        self.total, self.total_aproximado = conteo or (None, False)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class PaginadorKeyset:
+    """
+    `orden` es una lista de campos del queryset (se aceptan anotaciones) con
+    '-' para descendente. El último campo debe ser único (ej. 'id') para que
+    el orden sea total. Los campos no deben ser nulos: usar Coalesce.
+    """
+
+    def __init__(self, queryset, orden, por_pagina):
+        self.queryset = queryset
+        self.orden = [(campo.lstrip('-'), campo.startswith('-')) for campo in orden]
+        self.por_pagina = por_pagina
+
+    # --------------------------------------------------
+    # Cursor
+    # --------------------------------------------------
+
+    def _cursor(self, obj, direccion):
+        valores = [_serializar(getattr(obj, campo)) for campo, _ in self.orden]
+        return signing.dumps({'v': valores, 'd': direccion}, salt=SAL_CURSOR, compress=True)
+
+    def _leer_cursor(self, cursor):
+        if not cursor:
+            return None, 'sig'
+        try:
+            datos = signing.loads(cursor, salt=SAL_CURSOR)
+            valores, direccion = datos['v'], datos['d']
+        except (signing.BadSignature, KeyError, TypeError):
+            # Cursor alterado o de otra versión: se regresa a la primera página
+            return None, 'sig'
+        if len(valores) != len(self.orden) or direccion not in ('sig', 'ant'):
+            return None, 'sig'
+        return valores, direccion
+
+    # --------------------------------------------------
+    # Consulta
+    # --------------------------------------------------
+
+    def _despues_de(self, valores, invertir):
+        """Q para las filas posteriores a `valores` en el orden (o anteriores si `invertir`)."""
+        condiciones = []
+        for i, (campo, desc) in enumerate(self.orden):
+            iguales = {c: v for (c, _), v in zip(self.orden[:i], valores[:i])}
+            operador = 'lt' if desc != invertir else 'gt'
+            condiciones.append(Q(**iguales, **{f'{campo}__{operador}': valores[i]}))
+        return reduce(or_, condiciones)
+
+    def _ordenar(self, qs, invertir):
+        return qs.order_by(*[
+            ('-' if desc != invertir else '') + campo for campo, desc in self.orden
+        ])
+
+    def _acotar(self, qs, valores, invertir):
+        """
+        Acota el primer campo del orden al valor de la fila por_pagina + 1
+        posterior al cursor. Si el resto del orden viene de otra tabla (ej.
+        apellido) el motor tiene que ordenar en memoria; así solo ordena unas
+        cuantas fechas y no todo el historial restante.
+        """
+        campo, desc = self.orden[0]
+        hacia_atras = desc != invertir
+
+        siguientes = self.queryset.order_by(('-' if hacia_atras else '') + campo)
+        if valores is not None:
+            siguientes = siguientes.filter(**{f'{campo}__{"lt" if hacia_atras else "gt"}': valores[0]})
+
+        limite = siguientes.values_list(campo, flat=True)[self.por_pagina:self.por_pagina + 1]
+        limite = next(iter(limite), None)
+        if limite is None:
+            return qs
+        return qs.filter(**{f'{campo}__{"gte" if hacia_atras else "lte"}': limite})
+
+    def pagina(self, cursor=None, conteo=None):
+        valores, direccion = self._leer_cursor(cursor)
+        invertir = direccion == 'ant'
+
+        qs = self._ordenar(self.queryset, invertir)
+        if valores is not None:
+            qs = qs.filter(self._despues_de(valores, invertir))
+        if len(self.orden) > 1:
+            qs = self._acotar(qs, valores, invertir)
+
+        # Una fila extra indica si hay más en esa dirección
+        filas = list(qs[:self.por_pagina + 1])
+        hay_mas = len(filas) > self.por_pagina
+        filas = filas[:self.por_pagina]
+
+        if invertir:
+            filas.reverse()
+            hay_anterior, hay_siguiente = hay_mas, True
+        else:
+            hay_anterior, hay_siguiente = valores is not None, hay_mas
+
+        if not filas:
+            return PaginaKeyset([], None, None, conteo)
+
+        return PaginaKeyset(
+            filas,
+            self._cursor(filas[0], 'ant') if hay_anterior else None,
+            self._cursor(filas[-1], 'sig') if hay_siguiente else None,
+            conteo,
+        )
+
+
+def conteo_aproximado(queryset, limite=LIMITE_CONTEO):
+    """
+    Conteo barato para mostrar junto a la paginación. En PostgreSQL usa la
+    estimación del planificador; en otros motores cuenta hasta `limite`.
+    Regresa (número, es_aproximado).
+    """
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows']), True
+
+    total = queryset.order_by()[:limite + 1].count()
+    return min(total, limite), total > limite
+
+
+class PaginacionKeysetMixin:
+    """
+    Para ListView: reemplaza la paginación por OFFSET. Definir `orden_keyset`
+    (mismos campos que el order_by deseado, terminando en un campo único).
+    En la plantilla: page_obj.has_next / page_obj.cursor_siguiente, etc.
+    """
+
+    orden_keyset = ()
+    parametro_cursor = 'cursor'
+
+    def conteo_total(self, queryset):
+        """(total, es_aproximado). Sobrescribir para dar uno más barato; None lo omite."""
+        return conteo_aproximado(queryset)
+
+    def paginate_queryset(self, queryset, page_size):
+        pagina = PaginadorKeyset(queryset, self.orden_keyset, page_size).pagina(
+            self.request.GET.get(self.parametro_cursor),
+            conteo=self.conteo_total(queryset),
+        )
+        return None, pagina, pagina.object_list, pagina.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        # Query string sin el cursor para conservar filtros en los enlaces
+        params = self.request.GET.copy()
+        params.pop(self.parametro_cursor, None)
+        context['querystring_sin_cursor'] = params.urlencode()
+        return context
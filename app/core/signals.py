@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .calendario import calendario
+from .models import CalendarioLaboral
+
+
+@receiver(post_save, sender=CalendarioLaboral)
+@receiver(post_delete, sender=CalendarioLaboral)
+def invalidar_calendario(sender, instance, **kwargs):
+    """
+    Cualquier cambio al calendario invalida el cache en memoria.
+    Se limpia de inmediato en este proceso y el sello de versión se
+    incrementa al confirmar la transacción, para que otro proceso no
+    vuelva a cargar los datos anteriores.
+    """
+    calendario.limpiar()
+    transaction.on_commit(calendario.invalidar)
@@ -1,3 +1,51 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import UnidadAdministrativa
+
+
+class AuditMixinCamposModificadosTests(TestCase):
+
+    def setUp(self):
+        self.unidad = UnidadAdministrativa.objects.create(nombre="Dirección", descripcion="Original")
+
+    def test_sin_cambios_despues_de_leer_o_guardar(self):
+        self.assertEqual(self.unidad.changed_fields, set())
+        self.assertEqual(UnidadAdministrativa.objects.get(pk=self.unidad.pk).changed_fields, set())
+
+    def test_instancia_nueva_reporta_los_campos_asignados(self):
+        unidad = UnidadAdministrativa(nombre="Nueva")
+        self.assertIn('nombre', unidad.changed_fields)
+
+    def test_changed_fields_y_previous(self):
+        unidad = UnidadAdministrativa.objects.get(pk=self.unidad.pk)
+        unidad.nombre = "Subdirección"
+
+        self.assertEqual(unidad.changed_fields, {'nombre'})
+        self.assertEqual(unidad.previous('nombre'), "Dirección")
+
+        unidad.save()
+        self.assertEqual(unidad.changed_fields, set())
+        self.assertEqual(unidad.previous('nombre'), "Subdirección")
+
+    def test_save_escribe_solo_los_campos_modificados(self):
+        # Dos copias de la misma fila: cada save() no pisa el cambio de la otra
+        a = UnidadAdministrativa.objects.get(pk=self.unidad.pk)
+        b = UnidadAdministrativa.objects.get(pk=self.unidad.pk)
+        a.nombre = "Subdirección"
+        b.descripcion = "Actualizada"
+        a.save()
+        b.save()
+
+        unidad = UnidadAdministrativa.objects.get(pk=self.unidad.pk)
+        self.assertEqual(unidad.nombre, "Subdirección")
+        self.assertEqual(unidad.descripcion, "Actualizada")
+
+    def test_update_fields_explicito_se_respeta(self):
+        unidad = UnidadAdministrativa.objects.get(pk=self.unidad.pk)
+        unidad.nombre = "Subdirección"
+        unidad.descripcion = "No se guarda"
+        unidad.save(update_fields=['nombre'])
+
+        unidad.refresh_from_db()
+        self.assertEqual(unidad.nombre, "Subdirección")
+        self.assertEqual(unidad.descripcion, "Original")
@@ -16,7 +16,7 @@ class IncidenciaAdmin(admin.ModelAdmin):
         'aprobada_por',
     )
 
-    list_filter = ('estatus', 'tipo', 'fecha_inicio', 'trabajador__unidad')
+    list_filter = ('estatus', 'tipo', 'fecha_inicio', 'unidad')
 
     search_fields = (
         'trabajador__nombre',
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class IncidentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'incidents'
+
+    def ready(self):
+        # Registra las señales de incidencias
+        import incidents.signals
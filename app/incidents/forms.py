@@ -4,6 +4,15 @@
 from django import forms
 from core.forms import ColoredFormMixin
 from .models import Incidencia
+from .traslapes import traslapes
+
+
+def describir_traslapes(incidencias):
+    return "; ".join(
+        f"{i.tipo.descripcion} del {i.fecha_inicio:%d/%m/%Y} al {i.fecha_fin:%d/%m/%Y} "
+        f"({i.get_estatus_display().lower()})"
+        for i in incidencias
+    )
 
 
 class IncidenciaTrabajadorForm(ColoredFormMixin, forms.ModelForm):
@@ -33,6 +42,11 @@ class IncidenciaTrabajadorForm(ColoredFormMixin, forms.ModelForm):
 
         if fi and ff and ff < fi:
             self.add_error('fecha_fin', 'La fecha final no puede ser menor a la fecha de inicio.')
+        elif fi and ff and self.instance.trabajador_id:
+            # La vista asigna el trabajador en la instancia antes de validar
+            cruzadas = list(traslapes(self.instance.trabajador_id, fi, ff, excluir=self.instance.pk))
+            if cruzadas:
+                self.add_error(None, f"Ya tiene incidencias en esas fechas: {describir_traslapes(cruzadas)}.")
 
         return data
 
@@ -40,7 +54,8 @@ class IncidenciaTrabajadorForm(ColoredFormMixin, forms.ModelForm):
 class IncidenciaAdminForm(ColoredFormMixin, forms.ModelForm):
     """
     Formulario para Admin / Jefe.
-    Permite elegir trabajador y estatus.
+    Permite elegir trabajador y estatus. Los traslapes con otras incidencias
+    del trabajador no impiden guardar: quedan en `traslapes` para avisar.
     """
     class Meta:
         color_scheme = 'rose'
@@ -59,6 +74,18 @@ class IncidenciaAdminForm(ColoredFormMixin, forms.ModelForm):
             'motivo': forms.Textarea(attrs={'rows': 3}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Al abrir una incidencia existente se muestran sus traslapes actuales
+        self.traslapes = []
+        if not self.is_bound and self.instance.pk:
+            self.traslapes = list(traslapes(
+                self.instance.trabajador_id,
+                self.instance.fecha_inicio,
+                self.instance.fecha_fin,
+                excluir=self.instance.pk,
+            ))
+
     def clean(self):
         data = super().clean()
         fi = data.get('fecha_inicio')
@@ -66,5 +93,9 @@ class IncidenciaAdminForm(ColoredFormMixin, forms.ModelForm):
 
         if fi and ff and ff < fi:
             self.add_error('fecha_fin', 'La fecha final no puede ser menor a la fecha de inicio.')
+        elif fi and ff and data.get('trabajador'):
+            self.traslapes = list(
+                traslapes(data['trabajador'].pk, fi, ff, excluir=self.instance.pk)
+            )
 
         return data
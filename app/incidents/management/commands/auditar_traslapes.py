@@ -0,0 +1,50 @@
+# incidents/management/commands/auditar_traslapes.py
+# Lista las incidencias vigentes que se traslapan con otras del mismo trabajador
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from incidents.models import Incidencia
+from incidents.traslapes import pares_en_tabla
+
+
+LOTE_DETALLE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Recorre las incidencias pendientes y aprobadas ordenadas por trabajador y "
+        "fecha de inicio, y escribe una línea por cada par que comparte días."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--unidad', type=int, help="Solo incidencias de esta unidad (id)")
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+
+        qs = Incidencia.objects.all()
+        if options['unidad']:
+            qs = qs.filter(unidad_id=options['unidad'])
+        pares = list(pares_en_tabla(qs))
+
+        # Detalle de las incidencias involucradas, por lotes
+        ids = sorted({pk for par in pares for pk in par})
+        detalle = {}
+        for i in range(0, len(ids), LOTE_DETALLE):
+            detalle.update(
+                Incidencia.objects.select_related('trabajador', 'tipo').in_bulk(ids[i:i + LOTE_DETALLE])
+            )
+
+        for a, b in pares:
+            uno, otro = detalle[a], detalle[b]
+            self.stdout.write(
+                f"{uno.trabajador}\t"
+                f"#{uno.pk} {uno.tipo.descripcion} {uno.fecha_inicio}..{uno.fecha_fin} ({uno.estatus})\t"
+                f"#{otro.pk} {otro.tipo.descripcion} {otro.fecha_inicio}..{otro.fecha_fin} ({otro.estatus})"
+            )
+
+        self.stderr.write(
+            f"{len(pares)} traslapes entre {len(ids)} incidencias en {time.monotonic() - inicio:.2f}s."
+        )
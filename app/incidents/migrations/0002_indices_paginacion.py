@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('incidents', '0001_initial'),
+        ('workers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=models.Index(fields=['-fecha_inicio', 'id'], name='incidencia_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+LOTE_TRABAJADORES = 500
+
+
+def asignar_unidad(apps, schema_editor):
+    """
+    Copia la unidad actual del trabajador, por lotes de trabajadores de una
+    misma unidad: un UPDATE por lote y cada lote se confirma por separado.
+    """
+    Trabajador = apps.get_model('workers', 'Trabajador')
+    Incidencia = apps.get_model('incidents', 'Incidencia')
+
+    por_unidad = {}
+    for trabajador_id, unidad_id in Trabajador.objects.exclude(unidad=None).values_list('id', 'unidad_id'):
+        por_unidad.setdefault(unidad_id, []).append(trabajador_id)
+
+    for unidad_id, trabajadores in por_unidad.items():
+        for i in range(0, len(trabajadores), LOTE_TRABAJADORES):
+            Incidencia.objects.filter(
+                trabajador_id__in=trabajadores[i:i + LOTE_TRABAJADORES],
+                unidad__isnull=True,
+            ).update(unidad_id=unidad_id)
+
+
+class Migration(migrations.Migration):
+
+    # El llenado se confirma por lotes para no bloquear la tabla completa
+    atomic = False
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('incidents', '0002_indices_paginacion'),
+        ('workers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidencia',
+            name='unidad',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incidencias', to='core.unidadadministrativa'),
+        ),
+        migrations.RunPython(asignar_unidad, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=models.Index(fields=['unidad', 'fecha_inicio'], name='incidencia_unidad_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=models.Index(fields=['unidad', 'estatus'], name='incidencia_unidad_estat_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('incidents', '0003_unidad_denormalizada'),
+        ('workers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=models.Index(fields=['updated_at', 'id'], name='incidencia_updated_id_idx'),
+        ),
+    ]
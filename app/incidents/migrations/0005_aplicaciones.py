@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+LOTE = 2000
+
+
+def registrar_aplicadas(apps, schema_editor):
+    """
+    Las incidencias aprobadas antes de existir AplicacionIncidencia no dejaron
+    constancia de lo que marcaron. Se registran los días cuyo registro tiene
+    su tipo; al revertirlas esos registros quedan sin incidencia.
+    """
+    Incidencia = apps.get_model('incidents', 'Incidencia')
+    RegistroAsistencia = apps.get_model('attendance', 'RegistroAsistencia')
+    AplicacionIncidencia = apps.get_model('incidents', 'AplicacionIncidencia')
+
+    pendientes = []
+    aprobadas = (
+        Incidencia.objects.filter(estatus='APROBADA')
+        .values_list('id', 'trabajador_id', 'tipo_id', 'fecha_inicio', 'fecha_fin')
+        .order_by('id')
+    )
+    for incidencia_id, trabajador_id, tipo_id, fi, ff in aprobadas.iterator():
+        fechas = RegistroAsistencia.objects.filter(
+            trabajador_id=trabajador_id, fecha__range=(fi, ff), incidencia_id=tipo_id
+        ).values_list('fecha', flat=True)
+        pendientes.extend(
+            AplicacionIncidencia(incidencia_id=incidencia_id, trabajador_id=trabajador_id, fecha=fecha)
+            for fecha in fechas
+        )
+        if len(pendientes) >= LOTE:
+            AplicacionIncidencia.objects.bulk_create(pendientes)
+            pendientes = []
+    AplicacionIncidencia.objects.bulk_create(pendientes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0009_indice_cambios'),
+        ('core', '0001_initial'),
+        ('incidents', '0004_indice_cambios'),
+        ('workers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AplicacionIncidencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('creado', models.BooleanField(default=False)),
+                ('incidencia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aplicaciones', to='incidents.incidencia')),
+                ('incidencia_anterior', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.tipoincidencia')),
+                ('trabajador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workers.trabajador')),
+            ],
+            options={
+                'verbose_name': 'Aplicación de incidencia',
+                'verbose_name_plural': 'Aplicaciones de incidencias',
+                'indexes': [models.Index(fields=['trabajador', 'fecha'], name='aplicacion_trab_fecha_idx')],
+                'unique_together': {('incidencia', 'fecha')},
+            },
+        ),
+        migrations.RunPython(registrar_aplicadas, migrations.RunPython.noop),
+    ]
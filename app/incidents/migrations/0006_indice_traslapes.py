@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+INDICE_GIST = 'incidencia_trab_rango_gist'
+
+
+def crear_indice_rango(apps, schema_editor):
+    """Solo PostgreSQL: GiST por (trabajador, rango de fechas) para el operador &&."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDICE_GIST} ON incidents_incidencia "
+        f"USING gist (trabajador_id, daterange(fecha_inicio, fecha_fin, '[]'))"
+    )
+
+
+def borrar_indice_rango(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDICE_GIST}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('incidents', '0005_aplicaciones'),
+        ('workers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=models.Index(fields=['trabajador', 'fecha_inicio'], name='incidencia_trab_inicio_idx'),
+        ),
+        migrations.RunPython(crear_indice_rango, borrar_indice_rango),
+    ]
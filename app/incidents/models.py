@@ -2,15 +2,33 @@
 # Modelo de incidencias del trabajador (gestión completa)
 
 from datetime import timedelta, date
+from decimal import Decimal
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 from core.audit import AuditMixin
+from workers.jornadas import JornadaTimeline
 from workers.models import Trabajador
-from core.models import TipoIncidencia, CalendarioLaboral
-from attendance.models import RegistroAsistencia
+from core.calendario import calendario
+from core.models import TipoIncidencia, UnidadAdministrativa
+from attendance.models import RegistroAsistencia, calcular_resultado
+from attendance.signals import notificacion_agrupada, notificar_cambios
+
+
+# Campos que escriben aplicar_a_asistencia() y revertir_asistencia() en los
+# registros existentes, y los que se leen para recalcularlos
+CAMPOS_INCIDENCIA = [
+    'unidad', 'incidencia', 'estatus', 'minutos_retardo', 'horas_trabajadas', 'updated_at',
+]
+CAMPOS_CALCULO = [
+    'id', 'trabajador_id', 'unidad_id', 'fecha', 'hora_entrada', 'hora_salida',
+    'incidencia_id', 'estatus', 'minutos_retardo', 'horas_trabajadas',
+]
+
+# Campos de la incidencia que deciden qué se aplica (ver sincronizar_asistencia)
+CAMPOS_SINCRONIZACION = ['estatus', 'trabajador', 'tipo', 'fecha_inicio', 'fecha_fin']
 
 
 class Incidencia(AuditMixin, models.Model):
@@ -32,6 +50,17 @@ class Incidencia(AuditMixin, models.Model):
         related_name='incidencias'
     )
 
+    # Unidad del trabajador al registrar la incidencia (consultas por unidad
+    # sin JOIN con Trabajador)
+    unidad = models.ForeignKey(
+        UnidadAdministrativa,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name='incidencias'
+    )
+
     tipo = models.ForeignKey(
         TipoIncidencia,
         on_delete=models.PROTECT,
@@ -70,6 +99,18 @@ class Incidencia(AuditMixin, models.Model):
         verbose_name = "Incidencia"
         verbose_name_plural = "Incidencias"
         ordering = ['-fecha_inicio', 'trabajador']
+        indexes = [
+            # Paginación por llave de la lista general: (fecha_inicio desc, id)
+            models.Index(fields=['-fecha_inicio', 'id'], name='incidencia_fecha_id_idx'),
+            # Consultas de JEFE por unidad
+            models.Index(fields=['unidad', 'fecha_inicio'], name='incidencia_unidad_fecha_idx'),
+            models.Index(fields=['unidad', 'estatus'], name='incidencia_unidad_estat_idx'),
+            # Feed de cambios para nómina: (updated_at, id) > cursor
+            models.Index(fields=['updated_at', 'id'], name='incidencia_updated_id_idx'),
+            # Traslapes por trabajador (incidents/traslapes.py); en PostgreSQL
+            # además hay un índice GiST por rango (migración 0006)
+            models.Index(fields=['trabajador', 'fecha_inicio'], name='incidencia_trab_inicio_idx'),
+        ]
 
     def __str__(self):
         return f"{self.trabajador} - {self.tipo} ({self.fecha_inicio} a {self.fecha_fin})"
@@ -86,58 +127,284 @@ class Incidencia(AuditMixin, models.Model):
             actual += timedelta(days=1)
 
     def es_dia_inhabil(self, fecha: date) -> bool:
-        return CalendarioLaboral.objects.filter(
-            fecha=fecha,
-            es_inhabil=True
-        ).exists()
+        return calendario.es_inhabil(fecha)
 
     # --------------------------------------------------
     # Integración con RegistroAsistencia
+    # Cada día que la incidencia marca queda en AplicacionIncidencia, para
+    # poder deshacerlo si deja de estar aprobada, cambia de rango o se borra.
     # --------------------------------------------------
 
     def aplicar_a_asistencia(self):
         """
-        Para incidencias APROBADAS:
-        - Crea o actualiza registros de asistencia en el rango de fechas.
-        - Marca la incidencia en RegistroAsistencia (campo incidencia/tipo).
+        Para incidencias APROBADAS marca la incidencia en los registros de
+        asistencia del rango que aún no tenga aplicados, creando los que
+        falten solo en días laborables de su jornada que no sean inhábiles.
+
+        El rango se resuelve por lote: una consulta de registros existentes,
+        una de jornadas y el calendario en memoria, luego bulk_create /
+        bulk_update. El costo no depende de cuántos días abarque.
         """
         if self.estatus != 'APROBADA':
             return
 
+        fi, ff = self.fecha_inicio, self.fecha_fin
+        aplicados = set(
+            self.aplicaciones.filter(fecha__range=(fi, ff)).values_list('fecha', flat=True)
+        )
+        existentes = {
+            r.fecha: r
+            for r in RegistroAsistencia.objects
+            .filter(trabajador_id=self.trabajador_id, fecha__range=(fi, ff))
+            .only(*CAMPOS_CALCULO)
+        }
+        inhabiles = set(calendario.inhabiles_en_rango(fi, ff))
+        jornadas = JornadaTimeline.cargar([self.trabajador_id], fi, ff)
+
+        dias_por_jornada = {}   # jornada_id -> días de la semana laborables
+
+        def es_laborable(dia):
+            # Igual que attendance/faltas.py: sin jornada no se espera asistencia
+            jornada = jornadas.jornada(self.trabajador_id, dia)
+            if jornada is None:
+                return False
+            if jornada.pk not in dias_por_jornada:
+                dias_por_jornada[jornada.pk] = jornada.dias_laborables()
+            return dia.weekday() in dias_por_jornada[jornada.pk]
+
+        unidad_id = self.trabajador.unidad_id
+        crear, actualizar, aplicaciones = [], [], []
+
         for dia in self.dias():
-            # Opcional: puedes omitir días inhábiles
-            # if self.es_dia_inhabil(dia):
-            #     continue
+            if dia in aplicados:
+                continue
+
+            registro = existentes.get(dia)
+            if registro is None:
+                # Solo se generan registros en días que se esperaba trabajar
+                if dia in inhabiles or not es_laborable(dia):
+                    continue
+                registro = RegistroAsistencia(
+                    trabajador_id=self.trabajador_id, unidad_id=unidad_id, fecha=dia
+                )
+                crear.append(registro)
+            else:
+                if registro.unidad_id is None:
+                    registro.unidad_id = unidad_id
+                actualizar.append(registro)
 
-            asistencia, created = RegistroAsistencia.objects.get_or_create(
-                trabajador=self.trabajador,
+            aplicaciones.append(AplicacionIncidencia(
+                incidencia=self,
+                trabajador_id=self.trabajador_id,
                 fecha=dia,
-                defaults={
-                    # sin horas, pero con incidencia
-                    'hora_entrada': None,
-                    'hora_salida': None,
-                    'incidencia': self.tipo,
-                },
+                creado=registro.pk is None,
+                incidencia_anterior_id=registro.incidencia_id,
+            ))
+            registro.incidencia_id = self.tipo_id
+
+        if not aplicaciones:
+            return
+
+        recalcular_registros(crear + actualizar, inhabiles, jornadas)
+
+        with transaction.atomic():
+            RegistroAsistencia.objects.bulk_create(crear)
+            RegistroAsistencia.objects.bulk_update(actualizar, CAMPOS_INCIDENCIA)
+            AplicacionIncidencia.objects.bulk_create(aplicaciones)
+            notificar_cambios(
+                (self.trabajador_id, r.unidad_id, r.fecha) for r in crear + actualizar
             )
 
-            # Si ya existía, solo aseguramos que tenga la incidencia
-            asistencia.incidencia = self.tipo
-            asistencia.save()
+    def revertir_asistencia(self, conservar=None):
+        """
+        Deshace lo aplicado por la incidencia. Con `conservar=(fi, ff)` solo
+        los días fuera de ese rango (la incidencia se acortó o se movió).
+
+        Si otra incidencia aplicada cubre el mismo día, el registro queda con
+        la más reciente de ellas; si no, vuelve a la incidencia que tenía
+        antes de la primera, y los registros que se crearon solo por
+        incidencias y no tienen checadas se eliminan.
+        """
+        propias = AplicacionIncidencia.objects.filter(incidencia=self)
+        if conservar is not None:
+            propias = propias.exclude(fecha__range=conservar)
+        propias = {(a.trabajador_id, a.fecha): a for a in propias}
+        if not propias:
+            return
+
+        trabajadores = {t for t, _ in propias}
+        fechas = [f for _, f in propias]
+        fi, ff = min(fechas), max(fechas)
+
+        # Lo que otras incidencias aplicaron en esos mismos días, en el orden
+        # en que se aplicó
+        otras = {}
+        for aplicacion in (
+            AplicacionIncidencia.objects
+            .filter(trabajador_id__in=trabajadores, fecha__range=(fi, ff))
+            .exclude(incidencia=self)
+            .select_related('incidencia')
+            .only('id', 'trabajador_id', 'fecha', 'creado', 'incidencia_anterior_id', 'incidencia__tipo_id')
+            .order_by('id')
+        ):
+            clave = (aplicacion.trabajador_id, aplicacion.fecha)
+            if clave in propias:
+                otras.setdefault(clave, []).append(aplicacion)
+
+        registros = {
+            (r.trabajador_id, r.fecha): r
+            for r in RegistroAsistencia.objects
+            .filter(trabajador_id__in=trabajadores, fecha__range=(fi, ff))
+            .only(*CAMPOS_CALCULO)
+        }
+
+        actualizar, borrar, heredan = [], [], []
+        for clave, propia in propias.items():
+            restantes = otras.get(clave)
+            if restantes:
+                # Si esta era la primera en aplicarse, la siguiente hereda el
+                # estado original del registro
+                if propia.pk < restantes[0].pk:
+                    restantes[0].creado = propia.creado
+                    restantes[0].incidencia_anterior_id = propia.incidencia_anterior_id
+                    heredan.append(restantes[0])
+
+            registro = registros.get(clave)
+            if registro is None:
+                continue
+
+            if restantes:
+                registro.incidencia_id = restantes[-1].incidencia.tipo_id
+            elif propia.creado and registro.hora_entrada is None and registro.hora_salida is None:
+                borrar.append(registro.pk)
+                continue
+            else:
+                registro.incidencia_id = propia.incidencia_anterior_id
+            actualizar.append(registro)
+
+        recalcular_registros(actualizar, set(calendario.inhabiles_en_rango(fi, ff)))
+
+        with transaction.atomic(), notificacion_agrupada():
+            RegistroAsistencia.objects.bulk_update(actualizar, CAMPOS_INCIDENCIA)
+            AplicacionIncidencia.objects.bulk_update(heredan, ['creado', 'incidencia_anterior'])
+            AplicacionIncidencia.objects.filter(pk__in=[a.pk for a in propias.values()]).delete()
+            if borrar:
+                RegistroAsistencia.objects.filter(pk__in=borrar).delete()
+            notificar_cambios((r.trabajador_id, r.unidad_id, r.fecha) for r in actualizar)
+
+    def sincronizar_asistencia(self, anterior=None):
+        """
+        Lleva la asistencia al estado actual de la incidencia. `anterior` es
+        (estatus, trabajador_id, tipo_id, fecha_inicio, fecha_fin) antes de
+        guardar, o None si es nueva.
+        """
+        if anterior is None:
+            self.aplicar_a_asistencia()
+            return
+
+        estatus, trabajador_id, tipo_id, fi, ff = anterior
+        if self.estatus != 'APROBADA':
+            if estatus == 'APROBADA':
+                self.revertir_asistencia()
+            return
+
+        if (trabajador_id, tipo_id) != (self.trabajador_id, self.tipo_id):
+            self.revertir_asistencia()
+        elif (fi, ff) != (self.fecha_inicio, self.fecha_fin):
+            # Solo cambian los días que salen y los que entran al rango
+            self.revertir_asistencia(conservar=(self.fecha_inicio, self.fecha_fin))
+        elif estatus == 'APROBADA':
+            return
+        self.aplicar_a_asistencia()
 
     def save(self, *args, **kwargs):
         # Normalizar: fecha_fin >= fecha_inicio
         if self.fecha_fin < self.fecha_inicio:
             self.fecha_fin = self.fecha_inicio
 
-        es_nueva = self.pk is None
-        estatus_anterior = None
-        if not es_nueva:
-            estatus_anterior = Incidencia.objects.get(pk=self.pk).estatus
+        anterior = None
+        if not self._state.adding:
+            anterior = tuple(self.previous(campo) for campo in CAMPOS_SINCRONIZACION)
 
-        super().save(*args, **kwargs)
+        # Unidad vigente del trabajador al crear o al reasignar la incidencia
+        if self.unidad_id is None or 'trabajador' in self.changed_fields:
+            self.unidad_id = self.trabajador.unidad_id
 
-        # Aplicar integración solo si está aprobada y:
-        # – es nueva, o
-        # – cambió de estatus y ahora es APROBADA
-        if self.estatus == 'APROBADA' and (es_nueva or estatus_anterior != 'APROBADA'):
-            self.aplicar_a_asistencia()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sincronizar_asistencia(anterior)
+
+
+class AplicacionIncidencia(models.Model):
+    """
+    Día de asistencia marcado por una incidencia aprobada y lo que el
+    registro tenía antes, para poder revertirlo. Se identifica por
+    (trabajador, fecha) y no por el registro: este puede borrarse o
+    recrearse sin que se pierda lo que hay que restaurar.
+    """
+
+    incidencia = models.ForeignKey(
+        Incidencia,
+        on_delete=models.CASCADE,
+        related_name='aplicaciones'
+    )
+    trabajador = models.ForeignKey(
+        Trabajador,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    fecha = models.DateField()
+
+    # El registro no existía y lo creó la incidencia
+    creado = models.BooleanField(default=False)
+    # Incidencia que tenía el registro antes de aplicar esta
+    incidencia_anterior = models.ForeignKey(
+        TipoIncidencia,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+
+    class Meta:
+        verbose_name = "Aplicación de incidencia"
+        verbose_name_plural = "Aplicaciones de incidencias"
+        unique_together = ('incidencia', 'fecha')
+        indexes = [
+            models.Index(fields=['trabajador', 'fecha'], name='aplicacion_trab_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.incidencia_id} → {self.trabajador_id} {self.fecha}"
+
+
+def recalcular_registros(registros, inhabiles, jornadas=None):
+    """
+    Recalcula estatus, retardo y horas de registros en memoria con las
+    jornadas cargadas de una vez (o las de `jornadas`, un JornadaTimeline ya
+    cargado). `inhabiles` cubre las fechas de los registros.
+    """
+    if not registros:
+        return
+
+    if jornadas is None:
+        jornadas = JornadaTimeline.cargar(
+            {r.trabajador_id for r in registros},
+            min(r.fecha for r in registros),
+            max(r.fecha for r in registros),
+        )
+    ahora = timezone.now()
+    for registro in registros:
+        estatus, minutos, horas = calcular_resultado(
+            registro.fecha,
+            registro.hora_entrada,
+            registro.hora_salida,
+            tiene_incidencia=bool(registro.incidencia_id),
+            inhabil=registro.fecha in inhabiles,
+            jornada=jornadas.jornada(registro.trabajador_id, registro.fecha),
+        )
+        registro.estatus = estatus
+        registro.minutos_retardo = minutos
+        registro.horas_trabajadas = Decimal(str(horas))
+        # bulk_update no aplica auto_now
+        registro.updated_at = ahora
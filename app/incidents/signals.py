@@ -0,0 +1,40 @@
+# incidents/signals.py
+# Señales del módulo de incidencias
+
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from workers.models import Trabajador
+from .models import Incidencia
+
+
+# ============================================================
+# CAMBIO DE UNIDAD DEL TRABAJADOR
+# Igual que en asistencia: las incidencias ya ocurridas conservan su unidad,
+# las que empiezan hoy o después pasan a la unidad nueva.
+# ============================================================
+
+@receiver(post_save, sender=Trabajador)
+def mover_incidencias_de_unidad(sender, instance, created, **kwargs):
+    if created or 'unidad' not in instance.changed_fields:
+        return
+
+    Incidencia.objects.filter(
+        trabajador=instance, fecha_inicio__gte=timezone.localdate()
+    ).update(unidad_id=instance.unidad_id, updated_at=timezone.now())
+
+
+# ============================================================
+# BORRADO DE INCIDENCIAS
+# Antes de borrar se deshace lo que aplicó en la asistencia (las
+# AplicacionIncidencia se van en cascada después).
+# ============================================================
+
+@receiver(pre_delete, sender=Incidencia)
+def revertir_incidencia_borrada(sender, instance, origin=None, **kwargs):
+    # Si se borra el trabajador, sus registros de asistencia se van con él
+    modelo = getattr(origin, 'model', type(origin))
+    if modelo is Trabajador:
+        return
+    instance.revertir_asistencia()
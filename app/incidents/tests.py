@@ -1,3 +1,159 @@
+from datetime import date, time, timedelta
+
 from django.test import TestCase
 
-# Create your tests here.
+from attendance.models import RegistroAsistencia
+from core.models import TipoIncidencia
+from workers.models import JornadaLaboral, Trabajador, TrabajadorJornada
+from .models import AplicacionIncidencia, Incidencia
+from .traslapes import pares_en_tabla, pares_traslapados
+
+
+LUNES = date(2025, 3, 3)
+DOMINGO = LUNES + timedelta(days=6)
+
+
+def dia(n):
+    return LUNES + timedelta(days=n)
+
+
+# ============================================================
+# APLICAR Y REVERTIR EN LA ASISTENCIA
+# ============================================================
+
+class AplicacionIncidenciaTests(TestCase):
+
+    def setUp(self):
+        self.trabajador = Trabajador.objects.create(nombre="Ana", numero_empleado="E1")
+        jornada = JornadaLaboral.objects.create(
+            descripcion="Matutino",
+            hora_entrada=time(9, 0),
+            hora_salida=time(17, 0),
+            dias_semana="L-V",
+        )
+        TrabajadorJornada.objects.create(
+            trabajador=self.trabajador, jornada=jornada, fecha_inicio=dia(-30)
+        )
+        self.permiso = TipoIncidencia.objects.create(descripcion="Permiso")
+        self.incapacidad = TipoIncidencia.objects.create(descripcion="Incapacidad")
+
+        # El martes checó tarde
+        self.checada = RegistroAsistencia.objects.create(
+            trabajador=self.trabajador, fecha=dia(1), hora_entrada=time(9, 30)
+        )
+
+    def incidencia(self, tipo, fi=LUNES, ff=DOMINGO, estatus='APROBADA'):
+        return Incidencia.objects.create(
+            trabajador=self.trabajador, tipo=tipo, fecha_inicio=fi, fecha_fin=ff, estatus=estatus,
+        )
+
+    def registros(self):
+        return {
+            r.fecha: r
+            for r in RegistroAsistencia.objects.filter(trabajador=self.trabajador)
+        }
+
+    def assertEstadoOriginal(self):
+        self.assertEqual(list(self.registros()), [dia(1)])
+        self.checada.refresh_from_db()
+        self.assertIsNone(self.checada.incidencia_id)
+        self.assertEqual(self.checada.estatus, 'RETARDO')
+        self.assertFalse(AplicacionIncidencia.objects.exists())
+
+    def test_aplicar_solo_en_dias_laborables(self):
+        self.incidencia(self.permiso)
+
+        registros = self.registros()
+        self.assertEqual(sorted(registros), [dia(i) for i in range(5)])
+        for registro in registros.values():
+            self.assertEqual(registro.incidencia_id, self.permiso.pk)
+            self.assertEqual(registro.estatus, 'JUSTIFICADA')
+        self.assertEqual(registros[dia(1)].hora_entrada, time(9, 30))
+
+    def test_pendiente_no_se_aplica(self):
+        self.incidencia(self.permiso, estatus='PENDIENTE')
+        self.assertEstadoOriginal()
+
+    def test_eliminar_revierte(self):
+        incidencia = self.incidencia(self.permiso)
+        incidencia.delete()
+        self.assertEstadoOriginal()
+
+    def test_rechazar_revierte(self):
+        incidencia = self.incidencia(self.permiso)
+        incidencia.estatus = 'RECHAZADA'
+        incidencia.save()
+        self.assertEstadoOriginal()
+
+    def test_acortar_revierte_solo_los_dias_que_salen(self):
+        incidencia = self.incidencia(self.permiso)
+        incidencia.fecha_fin = dia(1)
+        incidencia.save()
+
+        registros = self.registros()
+        self.assertEqual(sorted(registros), [dia(0), dia(1)])
+        self.assertEqual(registros[dia(1)].incidencia_id, self.permiso.pk)
+
+    def test_dos_incidencias_en_los_mismos_dias(self):
+        primera = self.incidencia(self.permiso)
+        segunda = self.incidencia(self.incapacidad, fi=dia(1), ff=dia(2))
+
+        self.assertEqual(self.registros()[dia(1)].incidencia_id, self.incapacidad.pk)
+
+        # Al quitar la primera, los días de la segunda la conservan
+        primera.delete()
+        registros = self.registros()
+        self.assertEqual(sorted(registros), [dia(1), dia(2)])
+        for registro in registros.values():
+            self.assertEqual(registro.incidencia_id, self.incapacidad.pk)
+
+        # Y al quitar la segunda se vuelve al estado anterior a ambas
+        segunda.delete()
+        self.assertEstadoOriginal()
+
+
+# ============================================================
+# TRASLAPES
+# ============================================================
+
+class ParesTraslapadosTests(TestCase):
+
+    def pares(self, intervalos):
+        ordenados = sorted(intervalos, key=lambda i: (i[0], i[1]))
+        return {frozenset(par) for par in pares_traslapados(ordenados)}
+
+    def test_rangos_cerrados(self):
+        # 1 y 2 comparten el día 2; 3 empieza después de que 2 termina
+        pares = self.pares([
+            (1, dia(0), dia(2), 1),
+            (1, dia(2), dia(4), 2),
+            (1, dia(5), dia(6), 3),
+        ])
+        self.assertEqual(pares, {frozenset({1, 2})})
+
+    def test_rango_contenido_en_otro(self):
+        pares = self.pares([
+            (1, dia(0), dia(10), 1),
+            (1, dia(1), dia(2), 2),
+            (1, dia(5), dia(6), 3),
+        ])
+        self.assertEqual(pares, {frozenset({1, 2}), frozenset({1, 3})})
+
+    def test_solo_del_mismo_trabajador(self):
+        pares = self.pares([
+            (1, dia(0), dia(3), 1),
+            (2, dia(0), dia(3), 2),
+        ])
+        self.assertEqual(pares, set())
+
+    def test_pares_en_tabla_ignora_rechazadas(self):
+        trabajador = Trabajador.objects.create(nombre="Ana")
+        tipo = TipoIncidencia.objects.create(descripcion="Permiso")
+        a, b, _ = (
+            Incidencia.objects.create(
+                trabajador=trabajador, tipo=tipo, fecha_inicio=dia(0), fecha_fin=dia(3), estatus=estatus,
+            )
+            for estatus in ('PENDIENTE', 'PENDIENTE', 'RECHAZADA')
+        )
+
+        self.assertEqual({frozenset(par) for par in pares_en_tabla()}, {frozenset({a.pk, b.pk})})
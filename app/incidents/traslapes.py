@@ -0,0 +1,122 @@
+# incidents/traslapes.py
+# Incidencias traslapadas del mismo trabajador
+#
+# Dos incidencias se traslapan si son del mismo trabajador, ninguna está
+# RECHAZADA y sus rangos [fecha_inicio, fecha_fin] comparten al menos un día.
+#
+# - PostgreSQL: índice GiST sobre (trabajador_id, daterange(fecha_inicio,
+#   fecha_fin, '[]')) (migración 0006, requiere btree_gist); la consulta usa
+#   la misma expresión con el operador && para aprovecharlo.
+# - Otros motores: índice (trabajador, fecha_inicio); se leen las incidencias
+#   del trabajador que empiezan antes del fin del rango y se descartan las que
+#   terminan antes de su inicio.
+#
+# Para muchas incidencias a la vez (lista, auditoría) se ordenan por
+# (trabajador, fecha_inicio) y se barren con un heap de fechas de fin:
+# O(n log n) más el número de pares encontrados.
+
+import heapq
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Incidencia
+
+
+ESTATUS_VIGENTES = ('PENDIENTE', 'APROBADA')
+
+TABLA = Incidencia._meta.db_table
+
+SQL_TRASLAPE = f"daterange({TABLA}.fecha_inicio, {TABLA}.fecha_fin, '[]') && daterange(%s, %s, '[]')"
+
+
+def traslapes(trabajador_id, fi, ff, excluir=None):
+    """Queryset de incidencias vigentes del trabajador que se cruzan con [fi, ff]."""
+    qs = Incidencia.objects.filter(trabajador_id=trabajador_id, estatus__in=ESTATUS_VIGENTES)
+    if excluir is not None:
+        qs = qs.exclude(pk=excluir)
+
+    if connection.vendor == 'postgresql':
+        qs = qs.filter(RawSQL(SQL_TRASLAPE, (fi, ff), output_field=BooleanField()))
+    else:
+        qs = qs.filter(fecha_inicio__lte=ff, fecha_fin__gte=fi)
+    return qs.select_related('tipo').order_by('fecha_inicio', 'id')
+
+
+def pares_traslapados(intervalos):
+    """
+    Genera (id_a, id_b) por cada par que se traslapa. `intervalos` son
+    (trabajador_id, fecha_inicio, fecha_fin, id) ya ordenados por
+    (trabajador_id, fecha_inicio).
+    """
+    trabajador_actual = None
+    activos = []   # heap de (fecha_fin, id) de las que siguen abiertas
+
+    for trabajador_id, fi, ff, pk in intervalos:
+        if trabajador_id != trabajador_actual:
+            trabajador_actual = trabajador_id
+            activos = []
+
+        # Las que terminaron antes de este inicio ya no traslapan con nada más
+        while activos and activos[0][0] < fi:
+            heapq.heappop(activos)
+
+        for _, otro in activos:
+            yield otro, pk
+        heapq.heappush(activos, (ff, pk))
+
+
+def pares_en_tabla(queryset=None):
+    """
+    Pares (id_a, id_b) traslapados en toda la tabla (o en `queryset`) con un
+    solo recorrido ordenado por (trabajador, fecha_inicio).
+    """
+    qs = Incidencia.objects.all() if queryset is None else queryset
+    filas = (
+        qs.filter(estatus__in=ESTATUS_VIGENTES)
+        .order_by('trabajador_id', 'fecha_inicio', 'id')
+        .values_list('trabajador_id', 'fecha_inicio', 'fecha_fin', 'id')
+    )
+    return pares_traslapados(filas.iterator(chunk_size=5000))
+
+
+def traslapes_de(incidencias):
+    """
+    {id: [Incidencia, ...]} con las incidencias vigentes que se cruzan con
+    cada una de `incidencias` (ej. la página de la lista). Una consulta.
+    """
+    incidencias = [i for i in incidencias if i.estatus in ESTATUS_VIGENTES]
+    if not incidencias:
+        return {}
+
+    por_trabajador = defaultdict(list)
+    for incidencia in incidencias:
+        por_trabajador[incidencia.trabajador_id].append(incidencia)
+
+    filtro = Q()
+    for trabajador_id, grupo in por_trabajador.items():
+        filtro |= Q(
+            trabajador_id=trabajador_id,
+            fecha_inicio__lte=max(i.fecha_fin for i in grupo),
+            fecha_fin__gte=min(i.fecha_inicio for i in grupo),
+        )
+    candidatas = {
+        i.pk: i
+        for i in Incidencia.objects
+        .filter(filtro, estatus__in=ESTATUS_VIGENTES)
+        .select_related('tipo')
+    }
+    candidatas.update({i.pk: i for i in incidencias})
+
+    ordenadas = sorted(candidatas.values(), key=lambda i: (i.trabajador_id, i.fecha_inicio, i.pk))
+    buscadas = {i.pk for i in incidencias}
+    resultado = defaultdict(list)
+    for a, b in pares_traslapados((i.trabajador_id, i.fecha_inicio, i.fecha_fin, i.pk) for i in ordenadas):
+        if a in buscadas:
+            resultado[a].append(candidatas[b])
+        if b in buscadas:
+            resultado[b].append(candidatas[a])
+    return dict(resultado)
+
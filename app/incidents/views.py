@@ -1,6 +1,9 @@
 # incidents/views.py
 # Vistas para incidencias de trabajadores
 
+from django.contrib import messages
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views.generic import (
@@ -16,8 +19,10 @@ from accounts.mixins import (
 )
 from accounts.utils import get_perfil, es_jefe
 from core.audit_views import AuditViewMixin
+from core.paginacion import PaginacionKeysetMixin
 from .models import Incidencia
-from .forms import IncidenciaTrabajadorForm, IncidenciaAdminForm
+from .forms import IncidenciaTrabajadorForm, IncidenciaAdminForm, describir_traslapes
+from .traslapes import traslapes_de
 
 
 # ============================================================
@@ -28,25 +33,27 @@ class IncidenciaListView(
     LoginRequiredMixin,
     RedirigirTrabajadorIncidenciasMixin,
     AdminOJefeMixin,
+    PaginacionKeysetMixin,
     ListView
 ):
     model = Incidencia
     template_name = 'incidents/incidencia_list.html'
     context_object_name = 'incidencias'
     paginate_by = 20
+    orden_keyset = ('-fecha_inicio', 'apellido_orden', 'id')
 
     def get_queryset(self):
         qs = (
             Incidencia.objects
             .select_related('trabajador', 'tipo')
-            .order_by('-fecha_inicio', 'trabajador__apellido_paterno')
+            .annotate(apellido_orden=Coalesce('trabajador__apellido_paterno', Value('')))
         )
 
         perfil = get_perfil(self.request.user)
 
         # JEFE: solo incidencias de su unidad
         if es_jefe(self.request.user):
-            qs = qs.filter(trabajador__unidad=perfil.trabajador.unidad)
+            qs = qs.filter(unidad=perfil.trabajador.unidad)
 
         # Guardamos queryset base para estadísticas
         self.qs_base = qs
@@ -58,19 +65,38 @@ class IncidenciaListView(
 
         return qs
 
+    def conteo_total(self, queryset):
+        base_qs = getattr(self, 'qs_base', Incidencia.objects.none())
+
+        # Un solo conteo agrupado sirve para las tarjetas y para el total
+        self._totales = dict(
+            base_qs.order_by()
+            .values('estatus')
+            .annotate(total=Count('id'))
+            .values_list('estatus', 'total')
+        )
+
+        estatus = self.request.GET.get('estatus')
+        if estatus:
+            return self._totales.get(estatus, 0), False
+        return sum(self._totales.values()), False
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        base_qs = getattr(self, 'qs_base', Incidencia.objects.none())
-
         # Estadísticas por estatus según modelo
-        context['total_pendientes'] = base_qs.filter(estatus='PENDIENTE').count()
-        context['total_aprobadas'] = base_qs.filter(estatus='APROBADA').count()
-        context['total_rechazadas'] = base_qs.filter(estatus='RECHAZADA').count()
+        context['total_pendientes'] = self._totales.get('PENDIENTE', 0)
+        context['total_aprobadas'] = self._totales.get('APROBADA', 0)
+        context['total_rechazadas'] = self._totales.get('RECHAZADA', 0)
 
         # Para resaltar filtros en UI (opcional)
         context['estatus_seleccionado'] = self.request.GET.get('estatus')
 
+        # Traslapes de las incidencias de la página (una consulta)
+        cruzadas = traslapes_de(context['incidencias'])
+        for incidencia in context['incidencias']:
+            incidencia.traslapes = describir_traslapes(cruzadas.get(incidencia.pk, []))
+
         return context
 
 
@@ -78,6 +104,14 @@ class IncidenciaListView(
 # CREAR / EDITAR (ADMIN / JEFE)
 # ============================================================
 
+def avisar_traslapes(request, form):
+    if form.traslapes:
+        messages.warning(
+            request,
+            f"La incidencia se traslapa con otras del trabajador: {describir_traslapes(form.traslapes)}.",
+        )
+
+
 class IncidenciaCreateView(LoginRequiredMixin, AdminOJefeMixin, AuditViewMixin, CreateView):
     model = Incidencia
     form_class = IncidenciaAdminForm
@@ -88,6 +122,7 @@ class IncidenciaCreateView(LoginRequiredMixin, AdminOJefeMixin, AuditViewMixin,
         incidencia = form.save(commit=False)
         if incidencia.estatus == 'APROBADA' and incidencia.aprobada_por is None:
             incidencia.aprobada_por = self.request.user        
+        avisar_traslapes(self.request, form)
         return super().form_valid(form)
 
 
@@ -102,6 +137,7 @@ class IncidenciaUpdateView(LoginRequiredMixin, AdminOJefeMixin, AuditViewMixin,
         # Si la están aprobando en este momento, registra quién la aprueba
         if incidencia.estatus == 'APROBADA' and incidencia.aprobada_por is None:
             incidencia.aprobada_por = self.request.user
+        avisar_traslapes(self.request, form)
         return super().form_valid(form)
 
     def get_queryset(self):
@@ -109,7 +145,7 @@ class IncidenciaUpdateView(LoginRequiredMixin, AdminOJefeMixin, AuditViewMixin,
         perfil = get_perfil(self.request.user)
 
         if es_jefe(self.request.user):
-            return qs.filter(trabajador__unidad=perfil.trabajador.unidad)
+            return qs.filter(unidad=perfil.trabajador.unidad)
 
         return qs
 
@@ -178,6 +214,12 @@ class NuevaIncidenciaTrabajadorView(LoginRequiredMixin, SoloTrabajadorMixin, Aud
     template_name = 'incidents/incidencia_trabajador_form.html'
     success_url = reverse_lazy('incidents:mis_incidencias')
 
+    def get_form_kwargs(self):
+        # El formulario revisa traslapes contra las incidencias del trabajador
+        kwargs = super().get_form_kwargs()
+        kwargs['instance'] = Incidencia(trabajador=get_perfil(self.request.user).trabajador)
+        return kwargs
+
     def form_valid(self, form):
         perfil = get_perfil(self.request.user)
 
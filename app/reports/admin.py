@@ -0,0 +1,27 @@
+from django.contrib import admin
+from .models import RegistroEliminado, ReporteJob
+
+
+@admin.register(ReporteJob)
+class ReporteJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'estatus', 'progreso', 'solicitado_por', 'creado_en', 'terminado_en')
+    list_filter = ('estatus', 'tipo')
+    readonly_fields = (
+        'progreso', 'total_filas', 'filas_procesadas', 'archivo', 'error',
+        'creado_en', 'iniciado_en', 'terminado_en',
+    )
+    actions = ['reintentar']
+
+    @admin.action(description="Volver a encolar los reportes seleccionados")
+    def reintentar(self, request, queryset):
+        queryset.exclude(estatus='EN_PROCESO').update(
+            estatus='PENDIENTE', progreso=0, filas_procesadas=0, error='',
+            iniciado_en=None, terminado_en=None,
+        )
+
+
+@admin.register(RegistroEliminado)
+class RegistroEliminadoAdmin(admin.ModelAdmin):
+    list_display = ('modelo', 'objeto_id', 'numero_empleado', 'fecha', 'eliminado_en')
+    list_filter = ('modelo',)
+    search_fields = ('numero_empleado',)
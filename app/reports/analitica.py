@@ -0,0 +1,223 @@
+# reports/analitica.py
+# Estadísticas de puntualidad de una unidad en un periodo
+#
+# En lugar de exportar el CSV y procesarlo aparte, las columnas necesarias de
+# RegistroAsistencia se leen en una sola consulta a arreglos de NumPy y todo se
+# calcula vectorizado, sin ciclos de Python por registro: con un año de una
+# unidad de 2,000 trabajadores (~500k registros) casi todo el tiempo es la
+# lectura. La vista guarda el resultado en el cache de reportes.
+
+import numpy as np
+from django.db import connection
+from django.db.models import Case, CharField, FloatField, IntegerField, Value, When
+from django.db.models.functions import Cast
+
+from attendance.models import RegistroAsistencia
+from workers.models import Trabajador
+
+
+# Código numérico de cada estatus (posición en RegistroAsistencia.ESTADOS)
+ESTADOS = [clave for clave, _ in RegistroAsistencia.ESTADOS]
+CODIGO = {clave: i for i, clave in enumerate(ESTADOS)}
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+# Límite inferior (minutos) de cada rango del histograma de retardos
+RANGOS_RETARDO = np.array([1, 6, 11, 16, 31, 61])
+ETIQUETAS_RANGO = ["1 a 5", "6 a 10", "11 a 15", "16 a 30", "31 a 60", "Más de 60"]
+
+PERCENTILES_HORAS = (10, 25, 50, 75, 90)
+
+# Trabajadores en la lista de mayor impuntualidad
+PEORES = 10
+
+
+# ============================================================
+# LECTURA
+# ============================================================
+
+def _columnas(unidad_id, fi, ff):
+    """
+    Arreglo estructurado con una fila por registro del periodo:
+    trabajador, fecha, código de estatus, minutos de retardo y horas.
+
+    La consulta se arma con el ORM (portátil entre motores) pero se ejecuta
+    con el cursor directo: todas las columnas llegan como números o texto, sin
+    las conversiones de Django por valor (en SQLite convertir cada fecha a
+    `date` costaría más que la consulta). Por lo mismo el día de la semana se
+    calcula después en NumPy y no con ExtractIsoWeekDay, que en SQLite es una
+    función de Python llamada por registro.
+    """
+    consulta = (
+        RegistroAsistencia.objects
+        .filter(unidad_id=unidad_id, fecha__range=(fi, ff))
+        .annotate(
+            dia_texto=Cast('fecha', CharField(max_length=10)),
+            codigo=Case(
+                *[When(estatus=clave, then=Value(i)) for clave, i in CODIGO.items()],
+                default=Value(-1),
+                output_field=IntegerField(),
+            ),
+            horas=Cast('horas_trabajadas', FloatField()),
+        )
+        .values_list('trabajador_id', 'dia_texto', 'codigo', 'minutos_retardo', 'horas')
+        .order_by()
+    )
+    sql, params = consulta.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        filas = cursor.fetchall()
+
+    return np.array(filas, dtype=[
+        ('trabajador', np.int64),
+        ('fecha', 'U10'),
+        ('codigo', np.int8),
+        ('minutos', np.int32),
+        ('horas', np.float64),
+    ])
+
+
+def _dia_semana(fechas):
+    """0 = lunes ... 6 = domingo, a partir de fechas 'YYYY-MM-DD'."""
+    # Hay pocas fechas distintas: se convierte cada una una sola vez
+    unicas, indice = np.unique(fechas, return_inverse=True)
+    dias = unicas.astype('datetime64[D]').astype(np.int64)
+    # El 1970-01-01 (día 0) fue jueves
+    return ((dias + 3) % 7)[indice]
+
+
+# ============================================================
+# CÁLCULO
+# ============================================================
+
+def _proporcion(parte, total):
+    """parte / total elemento a elemento; 0 donde total es 0."""
+    return np.divide(parte, total, out=np.zeros(len(total)), where=total > 0)
+
+
+def analizar_unidad(unidad_id, fi, ff):
+    """
+    Estadísticas del periodo como diccionario de tipos de Python (se puede
+    guardar en el cache de reportes y usar directo en la plantilla).
+    Regresa None si no hay registros.
+    """
+    datos = _columnas(unidad_id, fi, ff)
+    if not len(datos):
+        return None
+
+    codigo = datos['codigo']
+    minutos = datos['minutos']
+    horas = datos['horas']
+
+    retardo = codigo == CODIGO['RETARDO']
+    asistio = (codigo == CODIGO['NORMAL']) | retardo
+    falta = codigo == CODIGO['FALTA']
+
+    total_asistencias = int(asistio.sum())
+    total_retardos = int(retardo.sum())
+
+    # --- Distribución de minutos de retardo ---
+    minutos_retardo = minutos[retardo]
+    rango = np.clip(np.searchsorted(RANGOS_RETARDO, minutos_retardo, side='right') - 1, 0, None)
+    por_rango = np.bincount(rango, minlength=len(RANGOS_RETARDO))
+    maximo_rango = max(int(por_rango.max()), 1)
+
+    distribucion = [
+        {
+            "rango": etiqueta,
+            "retardos": int(n),
+            "porcentaje": round(100 * int(n) / total_retardos, 1) if total_retardos else 0,
+            "ancho": round(100 * int(n) / maximo_rango),
+        }
+        for etiqueta, n in zip(ETIQUETAS_RANGO, por_rango)
+    ]
+
+    if total_retardos:
+        p50, p90 = np.percentile(minutos_retardo, (50, 90))
+        minutos_stats = {
+            "promedio": round(float(minutos_retardo.mean()), 1),
+            "mediana": round(float(p50), 1),
+            "p90": round(float(p90), 1),
+            "maximo": int(minutos_retardo.max()),
+        }
+    else:
+        minutos_stats = None
+
+    # --- Retardos por día de la semana ---
+    dia = _dia_semana(datos['fecha'])
+    registros_dia = np.bincount(dia, minlength=7)
+    asistencias_dia = np.bincount(dia, weights=asistio, minlength=7)
+    retardos_dia = np.bincount(dia, weights=retardo, minlength=7)
+    faltas_dia = np.bincount(dia, weights=falta, minlength=7)
+    tasa_dia = _proporcion(retardos_dia, asistencias_dia)
+    maxima_tasa = float(tasa_dia.max()) or 1
+
+    por_dia = [
+        {
+            "dia": DIAS_SEMANA[i],
+            "asistencias": int(asistencias_dia[i]),
+            "retardos": int(retardos_dia[i]),
+            "faltas": int(faltas_dia[i]),
+            "tasa": round(100 * float(tasa_dia[i]), 1),
+            "ancho": round(100 * float(tasa_dia[i]) / maxima_tasa),
+        }
+        for i in range(7)
+        # Sábado y domingo solo si hubo registros
+        if registros_dia[i]
+    ]
+
+    # --- Percentiles de horas trabajadas (días con asistencia y horas) ---
+    horas_validas = horas[asistio & (horas > 0)]
+    if len(horas_validas):
+        valores = np.percentile(horas_validas, PERCENTILES_HORAS)
+        percentiles_horas = [
+            {"percentil": p, "horas": round(float(v), 2)}
+            for p, v in zip(PERCENTILES_HORAS, valores)
+        ]
+        promedio_horas = round(float(horas_validas.mean()), 2)
+    else:
+        percentiles_horas, promedio_horas = [], None
+
+    # --- Trabajadores con más retardos ---
+    ids, indice = np.unique(datos['trabajador'], return_inverse=True)
+    retardos_t = np.bincount(indice, weights=retardo, minlength=len(ids))
+    minutos_t = np.bincount(indice, weights=np.where(retardo, minutos, 0), minlength=len(ids))
+    faltas_t = np.bincount(indice, weights=falta, minlength=len(ids))
+    asistencias_t = np.bincount(indice, weights=asistio, minlength=len(ids))
+
+    # Más retardos primero; en empate, más minutos acumulados
+    orden = np.lexsort((-minutos_t, -retardos_t))
+    orden = orden[retardos_t[orden] > 0][:PEORES]
+
+    tasa_t = _proporcion(retardos_t[orden], asistencias_t[orden])
+
+    nombres = {
+        t.pk: str(t)
+        for t in Trabajador.objects.filter(pk__in=[int(i) for i in ids[orden]])
+    }
+    peores = [
+        {
+            "trabajador": nombres.get(int(ids[i]), ""),
+            "retardos": int(retardos_t[i]),
+            "minutos": int(minutos_t[i]),
+            "faltas": int(faltas_t[i]),
+            "tasa": round(100 * float(tasa), 1),
+        }
+        for i, tasa in zip(orden, tasa_t)
+    ]
+
+    return {
+        "registros": len(datos),
+        "trabajadores": len(ids),
+        "asistencias": total_asistencias,
+        "retardos": total_retardos,
+        "faltas": int(falta.sum()),
+        "tasa_retardo": round(100 * total_retardos / total_asistencias, 1) if total_asistencias else 0,
+        "minutos": minutos_stats,
+        "distribucion": distribucion,
+        "por_dia": por_dia,
+        "percentiles_horas": percentiles_horas,
+        "promedio_horas": promedio_horas,
+        "peores": peores,
+    }
@@ -0,0 +1,211 @@
+# reports/cache.py
+# Cache de resultados de reportes
+#
+# A fin de mes muchos JEFES generan el mismo reporte por unidad para el mismo
+# periodo. El resultado (filas para la pantalla o el CSV ya armado) se guarda
+# en memoria del proceso con la llave (tipo, unidad o trabajador, fi, ff).
+#
+# Invalidación:
+# - Cada unidad y cada trabajador tienen un sello de versión en el cache de
+#   Django. Se renueva al confirmar cualquier cambio de asistencias o
+#   incidencias de esa unidad / ese trabajador (reports/signals.py).
+# - Una entrada guarda los sellos con que se calculó; si ya no coinciden se
+#   descarta al leerla.
+# - Los sellos solo se comparten entre procesos con un CACHE_BACKEND
+#   compartido (ej. Redis). Con el LocMemCache por omisión, los cambios hechos
+#   en otro proceso (otro worker, generar_faltas, importar_asistencias,
+#   recalcular_asistencias) no renuevan los sellos de este. Por eso cada
+#   entrada además caduca a los REPORTES_CACHE_SEGUNDOS de calculada.
+# - El espacio se limita por tamaño (REPORTES_CACHE_MAX_MB) y se libera la
+#   entrada usada hace más tiempo (LRU).
+
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+MAX_BYTES = getattr(settings, 'REPORTES_CACHE_MAX_MB', 64) * 1024 * 1024
+
+SEGUNDOS_CACHE = getattr(settings, 'REPORTES_CACHE_SEGUNDOS', 300)
+
+# Una entrada no puede ocupar más que esta fracción del total
+FRACCION_MAX_ENTRADA = 4
+
+PREFIJO = 'reports:version'
+CLAVE_GLOBAL = f'{PREFIJO}:global'
+
+
+def _clave_unidad(unidad_id):
+    return f'{PREFIJO}:unidad:{unidad_id}'
+
+
+def _clave_trabajador(trabajador_id):
+    return f'{PREFIJO}:trabajador:{trabajador_id}'
+
+
+# ============================================================
+# SELLOS DE VERSIÓN
+# ============================================================
+
+def _nuevo_sello():
+    # Basta con que sea distinto del anterior; no hace falta leerlo para
+    # incrementarlo, así que se pueden renovar muchos con un solo set_many.
+    return time.time_ns()
+
+
+def versiones(claves):
+    """Sellos actuales de `claves`; los que no existen se crean."""
+    actuales = cache.get_many(claves)
+    for clave in claves:
+        if clave not in actuales:
+            # Si el sello se perdió (cache reiniciado) se crea uno nuevo y no
+            # se reutiliza un valor viejo que pudiera seguir en memoria.
+            cache.add(clave, _nuevo_sello(), timeout=None)
+            actuales[clave] = cache.get(clave)
+    return tuple(actuales[clave] for clave in claves)
+
+
+def claves_version(unidad_id=None, trabajador_id=None):
+    claves = [CLAVE_GLOBAL]
+    if unidad_id is not None:
+        claves.append(_clave_unidad(unidad_id))
+    if trabajador_id is not None:
+        claves.append(_clave_trabajador(trabajador_id))
+    return claves
+
+
+def invalidar(unidades=(), trabajadores=(), todo=False):
+    """
+    Renueva los sellos al confirmar la transacción: si se hiciera antes, otro
+    proceso podría guardar con el sello nuevo datos leídos antes del commit.
+    """
+    sellos = {_clave_unidad(u): None for u in unidades}
+    sellos.update({_clave_trabajador(t): None for t in trabajadores})
+    if todo:
+        sellos[CLAVE_GLOBAL] = None
+    if not sellos:
+        return
+
+    def renovar():
+        sello = _nuevo_sello()
+        cache.set_many({clave: sello for clave in sellos}, timeout=None)
+
+    transaction.on_commit(renovar)
+
+
+# ============================================================
+# LRU EN MEMORIA
+# ============================================================
+
+class CacheReportes:
+
+    def __init__(self, max_bytes=MAX_BYTES, segundos=SEGUNDOS_CACHE):
+        self.max_bytes = max_bytes
+        self.segundos = segundos
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()   # llave -> (versiones, valor, tamaño, vence)
+        self._ocupado = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, llave, versiones_actuales):
+        with self._lock:
+            entrada = self._entradas.get(llave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            if entrada[0] != versiones_actuales or time.monotonic() >= entrada[3]:
+                self._quitar(llave)
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(llave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, llave, versiones_actuales, valor, tam):
+        if tam > self.max_bytes // FRACCION_MAX_ENTRADA:
+            return False
+        with self._lock:
+            if llave in self._entradas:
+                self._quitar(llave)
+            self._entradas[llave] = (versiones_actuales, valor, tam, time.monotonic() + self.segundos)
+            self._ocupado += tam
+            while self._ocupado > self.max_bytes:
+                self._quitar(next(iter(self._entradas)))
+        return True
+
+    def _quitar(self, llave):
+        tam = self._entradas.pop(llave)[2]
+        self._ocupado -= tam
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._ocupado = 0
+
+    def estadisticas(self):
+        return {
+            'entradas': len(self._entradas),
+            'bytes': self._ocupado,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+        }
+
+
+cache_reportes = CacheReportes()
+
+
+# ============================================================
+# USO DESDE LAS VISTAS
+# ============================================================
+
+def valor_en_cache(llave, calcular, unidad_id=None, trabajador_id=None):
+    """
+    Regresa `calcular()` (ej. la tabla de la pantalla ya generada), guardado
+    bajo `llave` mientras no cambien los datos de la unidad / trabajador.
+    """
+    actuales = versiones(claves_version(unidad_id, trabajador_id))
+    guardado = cache_reportes.obtener(llave, actuales)
+    if guardado is not None:
+        return pickle.loads(zlib.decompress(guardado))
+
+    valor = calcular()
+    # El HTML de una tabla grande es muy repetitivo: comprimido ocupa
+    # una fracción y descomprimirlo cuesta mucho menos que generarlo.
+    guardado = zlib.compress(pickle.dumps(valor, pickle.HIGHEST_PROTOCOL), 1)
+    cache_reportes.guardar(llave, actuales, guardado, len(guardado))
+    return valor
+
+
+def bloques_en_cache(llave, generar, unidad_id=None, trabajador_id=None):
+    """
+    Para CSV: si `llave` está en cache regresa sus bloques de bytes; si no,
+    regresa `generar()` envuelto para guardar el contenido al terminar de
+    enviarlo (la primera descarga sigue siendo en streaming).
+    """
+    actuales = versiones(claves_version(unidad_id, trabajador_id))
+    bloques = cache_reportes.obtener(llave, actuales)
+    if bloques is not None:
+        return iter(bloques)
+    return _guardar_al_terminar(llave, actuales, generar())
+
+
+def _guardar_al_terminar(llave, actuales, bloques):
+    limite = cache_reportes.max_bytes // FRACCION_MAX_ENTRADA
+    copia, tam = [], 0
+    for bloque in bloques:
+        yield bloque
+        if copia is not None:
+            copia.append(bloque)
+            tam += len(bloque)
+            if tam > limite:
+                # Demasiado grande para el cache: se deja de copiar
+                copia = None
+    if copia is not None:
+        cache_reportes.guardar(llave, actuales, copia, tam)
@@ -0,0 +1,196 @@
+# reports/cambios.py
+# Feed incremental de cambios para nómina
+#
+# En lugar de volver a bajar el CSV completo del mes cada noche, nómina pide
+# solo lo creado, modificado o borrado desde su último cursor. Las altas y
+# cambios se leen con el índice (updated_at, id) de cada tabla; las bajas, de
+# RegistroEliminado (marcas que dejan las señales post_delete).
+#
+# - Los procesos masivos (importación, checadas, recálculo, cambio de unidad)
+#   ya escriben updated_at a mano porque bulk_update / update() no aplican
+#   auto_now, así que también aparecen en el feed.
+# - Un registro con updated_at anterior puede confirmarse después de que otro
+#   más nuevo ya se leyó. Para no saltarlo, el feed solo entrega hasta
+#   `ahora - MARGEN_SEGUNDOS`; lo más reciente sale en la siguiente consulta.
+# - Las filas sin updated_at (anteriores a la auditoría) y las que se mueven
+#   al archivo histórico (`archivar_asistencias`) no aparecen: para la carga
+#   inicial se usa la exportación mensual.
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import F, Q
+from django.utils import timezone
+
+from attendance.models import RegistroAsistencia
+from incidents.models import Incidencia
+from .models import RegistroEliminado
+
+
+SAL_CURSOR = 'reports.cambios.cursor'
+
+MARGEN_SEGUNDOS = getattr(settings, 'REPORTES_CAMBIOS_MARGEN_SEGUNDOS', 60)
+
+LIMITE_POR_DEFECTO = 1000
+LIMITE_MAXIMO = 10000
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+# tipo -> (modelo de RegistroEliminado, queryset, columnas)
+FUENTES = {
+    'asistencias': (
+        'ASISTENCIA',
+        lambda: RegistroAsistencia.objects.all(),
+        {
+            'id': 'id',
+            'trabajador_id': 'trabajador_id',
+            'numero_empleado': 'trabajador__numero_empleado',
+            'unidad_id': 'unidad_id',
+            'fecha': 'fecha',
+            'hora_entrada': 'hora_entrada',
+            'hora_salida': 'hora_salida',
+            'estatus': 'estatus',
+            'minutos_retardo': 'minutos_retardo',
+            'horas_trabajadas': 'horas_trabajadas',
+            'tipo_incidencia': 'incidencia__descripcion',
+            'updated_at': 'updated_at',
+        },
+    ),
+    'incidencias': (
+        'INCIDENCIA',
+        lambda: Incidencia.objects.all(),
+        {
+            'id': 'id',
+            'trabajador_id': 'trabajador_id',
+            'numero_empleado': 'trabajador__numero_empleado',
+            'unidad_id': 'unidad_id',
+            'tipo_incidencia': 'tipo__descripcion',
+            'fecha_inicio': 'fecha_inicio',
+            'fecha_fin': 'fecha_fin',
+            'estatus': 'estatus',
+            'updated_at': 'updated_at',
+        },
+    ),
+}
+
+TIPOS = tuple(FUENTES)
+
+CAMPOS_ELIMINADO = (
+    'id', 'objeto_id', 'trabajador_id', 'numero_empleado', 'unidad_id', 'fecha', 'eliminado_en',
+)
+
+
+# ============================================================
+# CURSOR
+# Dos posiciones (cambios y bajas), cada una (momento, id), firmadas.
+# ============================================================
+
+def _posicion(posicion):
+    if posicion is None:
+        return None
+    momento, pk = posicion
+    return [momento.isoformat(), pk]
+
+
+def _leer_posicion(valor):
+    if valor is None:
+        return None
+    momento, pk = valor
+    momento = datetime.fromisoformat(momento)
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento, int(pk)
+
+
+def crear_cursor(tipo, cambios, eliminados):
+    return signing.dumps(
+        {'t': tipo, 'c': _posicion(cambios), 'e': _posicion(eliminados)},
+        salt=SAL_CURSOR, compress=True,
+    )
+
+
+def leer_cursor(tipo, cursor):
+    """((momento, id) de cambios, (momento, id) de bajas) del cursor; None = desde el inicio."""
+    try:
+        datos = signing.loads(cursor, salt=SAL_CURSOR)
+        cursor_tipo = datos['t']
+        posiciones = _leer_posicion(datos['c']), _leer_posicion(datos['e'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as e:
+        raise CursorInvalido("Cursor inválido.") from e
+
+    if cursor_tipo != tipo:
+        raise CursorInvalido("El cursor es de otro tipo de cambios.")
+    return posiciones
+
+
+def _despues_de(campo, posicion):
+    """Filas posteriores a (momento, id) en el orden (campo, id)."""
+    if posicion is None:
+        return Q()
+    momento, pk = posicion
+    return Q(**{f'{campo}__gt': momento}) | Q(**{campo: momento, 'id__gt': pk})
+
+
+# ============================================================
+# CONSULTA
+# ============================================================
+
+def pagina_cambios(tipo, cursor=None, desde=None, limite=None):
+    """
+    Siguiente página del feed `tipo` ('asistencias' o 'incidencias').
+    Sin cursor empieza en `desde` (datetime aware); sin ninguno de los dos,
+    desde el principio. Regresa un diccionario listo para JSON: `registros`
+    (altas y cambios; aplicar por id), `eliminados`, `cursor` para la
+    siguiente consulta y `hay_mas`.
+    """
+    if tipo not in FUENTES:
+        raise ValueError(f"Tipo de cambios desconocido: {tipo}")
+    modelo, queryset, columnas = FUENTES[tipo]
+    limite = max(1, min(limite or LIMITE_POR_DEFECTO, LIMITE_MAXIMO))
+
+    if cursor:
+        pos_cambios, pos_eliminados = leer_cursor(tipo, cursor)
+    else:
+        pos_cambios = pos_eliminados = (desde, 0) if desde else None
+
+    hasta = timezone.now() - timedelta(seconds=MARGEN_SEGUNDOS)
+
+    registros = list(
+        queryset()
+        .filter(_despues_de('updated_at', pos_cambios), updated_at__lte=hasta)
+        .order_by('updated_at', 'id')
+        .values(
+            *[campo for nombre, campo in columnas.items() if nombre == campo],
+            **{nombre: F(campo) for nombre, campo in columnas.items() if nombre != campo},
+        )[:limite + 1]
+    )
+    eliminados = list(
+        RegistroEliminado.objects
+        .filter(_despues_de('eliminado_en', pos_eliminados), modelo=modelo, eliminado_en__lte=hasta)
+        .order_by('eliminado_en', 'id')
+        .values(*CAMPOS_ELIMINADO)[:limite + 1]
+    )
+
+    hay_mas = len(registros) > limite or len(eliminados) > limite
+    registros, eliminados = registros[:limite], eliminados[:limite]
+
+    if registros:
+        pos_cambios = (registros[-1]['updated_at'], registros[-1]['id'])
+    if eliminados:
+        pos_eliminados = (eliminados[-1]['eliminado_en'], eliminados[-1]['id'])
+        # Hacia nómina el id es el del registro borrado, no el de la marca
+        for e in eliminados:
+            e['id'] = e.pop('objeto_id')
+
+    return {
+        'tipo': tipo,
+        'hasta': hasta,
+        'registros': registros,
+        'eliminados': eliminados,
+        'cursor': crear_cursor(tipo, pos_cambios, pos_eliminados),
+        'hay_mas': hay_mas,
+    }
@@ -0,0 +1,258 @@
+# reports/cierre.py
+# Exportación de cierre de mes: un CSV comprimido por unidad para nómina
+#
+# En lugar de descargar el reporte de cada unidad una por una, el mes de cada
+# unidad se parte en bloques de días y todos los bloques se reparten en un
+# pool de procesos (mismo esquema que reports/trabajos.py). Cada bloque se
+# escribe como un miembro gzip independiente; al terminar, los de cada unidad
+# se concatenan en orden (un .gz con varios miembros es un .gz válido) y se
+# calcula su sha256 al copiarlos. Un manifiesto JSON lista archivos, filas y
+# sumas de verificación.
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from datetime import date, timedelta
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from attendance.models import RegistroAsistencia
+from core.models import UnidadAdministrativa
+from .exportacion import ENCABEZADOS_UNIDAD, contenido_csv, filas_unidad
+from . import proceso
+from .models import ReporteJob
+from .trabajos import DIRECTORIO, PROCESOS_POR_DEFECTO
+
+
+DIAS_POR_BLOQUE = getattr(settings, 'REPORTES_CIERRE_DIAS_BLOQUE', 7)
+
+NOMBRE_MANIFIESTO = 'manifiesto.json'
+
+
+def rango_mes(anio, mes):
+    fi = date(anio, mes, 1)
+    siguiente = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+    return fi, siguiente - timedelta(days=1)
+
+
+def mes_anterior(hoy=None):
+    hoy = hoy or timezone.localdate()
+    fin = date(hoy.year, hoy.month, 1) - timedelta(days=1)
+    return fin.year, fin.month
+
+
+def directorio_cierre(anio, mes):
+    return os.path.join(DIRECTORIO, f"cierre_{anio}_{mes:02d}")
+
+
+def _bloques(fi, ff, dias):
+    inicio = fi
+    while inicio <= ff:
+        fin = min(inicio + timedelta(days=dias - 1), ff)
+        yield inicio, fin
+        inicio = fin + timedelta(days=1)
+
+
+# ============================================================
+# BLOQUE (dentro de cada proceso del pool, vía reports/proceso.py)
+# ============================================================
+
+def exportar_bloque(unidad_id, fi, ff, ruta, con_encabezado):
+    """
+    Escribe en `ruta` un miembro gzip con los registros de la unidad en
+    [fi, ff], ordenados por fecha y trabajador. Regresa el número de filas.
+    """
+    asistencias = RegistroAsistencia.objects.filter(
+        unidad_id=unidad_id, fecha__range=(fi, ff)
+    ).order_by("fecha", "trabajador__apellido_paterno", "trabajador_id")
+
+    filas = 0
+
+    def contar(iterable):
+        nonlocal filas
+        for fila in iterable:
+            filas += 1
+            yield fila
+
+    try:
+        contenido = contenido_csv(
+            ENCABEZADOS_UNIDAD if con_encabezado else None,
+            contar(filas_unidad(asistencias)),
+            comprimir=True,
+        )
+        with open(ruta, 'wb') as destino:
+            for bloque in contenido:
+                destino.write(bloque)
+        return filas
+    finally:
+        connections.close_all()
+
+
+# ============================================================
+# CIERRE COMPLETO
+# ============================================================
+
+class ResultadoCierre:
+
+    def __init__(self, anio, mes):
+        self.anio = anio
+        self.mes = mes
+        self.archivos = []
+        self.filas = 0
+        self.bytes = 0
+        self.segundos = 0.0
+        self.manifiesto = None
+
+    @property
+    def filas_por_segundo(self):
+        return self.filas / self.segundos if self.segundos else 0
+
+    def resumen(self):
+        return (
+            f"Cierre {self.anio}-{self.mes:02d}: {len(self.archivos)} archivos, "
+            f"{self.filas} filas, {self.bytes / 1024 / 1024:.1f} MB en {self.segundos:.2f}s "
+            f"({self.filas_por_segundo:,.0f} filas/s)."
+        )
+
+
+def _ensamblar(partes, destino):
+    """Concatena los miembros gzip en `destino`. Regresa (bytes, sha256)."""
+    suma = hashlib.sha256()
+    tam = 0
+    with open(destino, 'wb') as salida:
+        for parte in partes:
+            with open(parte, 'rb') as entrada:
+                while True:
+                    bloque = entrada.read(1024 * 1024)
+                    if not bloque:
+                        break
+                    salida.write(bloque)
+                    suma.update(bloque)
+                    tam += len(bloque)
+    return tam, suma.hexdigest()
+
+
+def exportar_cierre(anio, mes, procesos=None, unidades=None, dias_por_bloque=None, al_avanzar=None):
+    """
+    Genera en REPORTES_DIR/cierre_AAAA_MM/ un .csv.gz por unidad (todas, o los
+    ids de `unidades`) y el manifiesto. `al_avanzar(hechos, total)` se llama
+    cada vez que termina un bloque.
+    """
+    inicio = time.monotonic()
+    resultado = ResultadoCierre(anio, mes)
+    procesos = procesos or PROCESOS_POR_DEFECTO
+    dias_por_bloque = dias_por_bloque or DIAS_POR_BLOQUE
+    fi, ff = rango_mes(anio, mes)
+
+    qs = UnidadAdministrativa.objects.order_by('nombre', 'pk')
+    if unidades:
+        qs = qs.filter(pk__in=unidades)
+    unidades = list(qs)
+
+    directorio = directorio_cierre(anio, mes)
+    temporal = os.path.join(directorio, '.partes')
+    os.makedirs(temporal, exist_ok=True)
+
+    rangos = list(_bloques(fi, ff, dias_por_bloque))
+    partes = {
+        unidad.pk: [os.path.join(temporal, f"{unidad.pk}_{i}.gz") for i in range(len(rangos))]
+        for unidad in unidades
+    }
+    filas = {}
+
+    try:
+        # 'spawn': los procesos no heredan las conexiones abiertas del padre
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            mp_context=get_context('spawn'),
+            initializer=proceso.inicializar,
+        ) as pool:
+            pendientes = {
+                pool.submit(
+                    proceso.exportar_bloque,
+                    unidad.pk, bfi, bff, partes[unidad.pk][i], i == 0,
+                ): (unidad.pk, i)
+                for unidad in unidades
+                for i, (bfi, bff) in enumerate(rangos)
+            }
+            total = len(pendientes)
+
+            while pendientes:
+                terminados, _ = wait(pendientes, return_when=FIRST_EXCEPTION)
+                for futuro in terminados:
+                    clave = pendientes.pop(futuro)
+                    try:
+                        filas[clave] = futuro.result()
+                    except BaseException:
+                        for otro in pendientes:
+                            otro.cancel()
+                        raise
+                if al_avanzar:
+                    al_avanzar(total - len(pendientes), total)
+
+        for unidad in unidades:
+            nombre = get_valid_filename(f"{unidad.pk}_{unidad.nombre}.csv.gz")
+            tam, sha256 = _ensamblar(partes[unidad.pk], os.path.join(directorio, nombre))
+            filas_unidad_total = sum(filas[(unidad.pk, i)] for i in range(len(rangos)))
+
+            resultado.archivos.append({
+                "unidad_id": unidad.pk,
+                "unidad": unidad.nombre,
+                "archivo": nombre,
+                "filas": filas_unidad_total,
+                "bytes": tam,
+                "sha256": sha256,
+            })
+            resultado.filas += filas_unidad_total
+            resultado.bytes += tam
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    resultado.segundos = time.monotonic() - inicio
+    resultado.manifiesto = os.path.join(directorio, NOMBRE_MANIFIESTO)
+
+    with open(resultado.manifiesto, 'w', encoding='utf-8') as salida:
+        json.dump({
+            "anio": anio,
+            "mes": mes,
+            "fecha_inicio": fi.isoformat(),
+            "fecha_fin": ff.isoformat(),
+            "generado_en": timezone.now().isoformat(),
+            "procesos": procesos,
+            "dias_por_bloque": dias_por_bloque,
+            "archivos": resultado.archivos,
+            "total_filas": resultado.filas,
+            "total_bytes": resultado.bytes,
+            "segundos": round(resultado.segundos, 3),
+            "filas_por_segundo": round(resultado.filas_por_segundo),
+        }, salida, ensure_ascii=False, indent=2)
+
+    return resultado
+
+
+# ============================================================
+# DESDE EL ADMIN (cola de reportes)
+# ============================================================
+
+def encolar_cierre(anio, mes, usuario=None, unidades=None):
+    """
+    Crea el ReporteJob del cierre; lo ejecuta `procesar_reportes` como
+    cualquier otro reporte. Sin `unidades`, todas.
+    """
+    fi, ff = rango_mes(anio, mes)
+    trabajo = ReporteJob.objects.create(
+        tipo='CIERRE',
+        fecha_inicio=fi,
+        fecha_fin=ff,
+        solicitado_por=usuario,
+    )
+    if unidades:
+        trabajo.unidades.set(unidades)
+    return trabajo
@@ -0,0 +1,140 @@
+# reports/consolidado.py
+# Reporte consolidado por jerarquía de unidades
+#
+# Una sola consulta resuelve el subárbol (core/jerarquia.py) y suma
+# ResumenDiario de cada unidad en el periodo. Los totales de cada rama se
+# acumulan después en memoria, de las hojas hacia la raíz, sin más consultas:
+# el costo no depende de la profundidad del árbol.
+
+from django.db import connection
+
+from attendance.models import RegistroAsistencia, ResumenDiario
+from core.jerarquia import cte_subarbol
+
+
+class Totales:
+
+    def __init__(self):
+        self.por_estatus = dict.fromkeys((e for e, _ in RegistroAsistencia.ESTADOS), 0)
+        self.minutos_retardo = 0
+        self.horas_trabajadas = 0
+
+    def sumar(self, otro):
+        for estatus, total in otro.por_estatus.items():
+            self.por_estatus[estatus] = self.por_estatus.get(estatus, 0) + total
+        self.minutos_retardo += otro.minutos_retardo
+        self.horas_trabajadas += otro.horas_trabajadas
+
+    @property
+    def registros(self):
+        return sum(self.por_estatus.values())
+
+    @property
+    def asistencias(self):
+        return sum(self.por_estatus[e] for e in RegistroAsistencia.ESTADOS_ASISTIO)
+
+    @property
+    def retardos(self):
+        return self.por_estatus['RETARDO']
+
+    @property
+    def faltas(self):
+        return self.por_estatus['FALTA']
+
+    @property
+    def justificadas(self):
+        return self.por_estatus['JUSTIFICADA']
+
+    @property
+    def inhabiles(self):
+        return self.por_estatus['INHABIL']
+
+
+class NodoUnidad:
+
+    def __init__(self, unidad_id, padre_id, nombre, profundidad):
+        self.id = unidad_id
+        self.padre_id = padre_id
+        self.nombre = nombre
+        self.profundidad = profundidad
+        self.hijos = []
+        # Registros de la propia unidad y de toda su rama (ella incluida)
+        self.propios = Totales()
+        self.rama = Totales()
+
+
+def _filas(raiz_id, fi, ff):
+    cte, params = cte_subarbol(raiz_id)
+    ops = connection.ops
+    resumen = ops.quote_name(ResumenDiario._meta.db_table)
+
+    sql = f"""
+        {cte}
+        SELECT a.id, a.unidad_padre_id, a.nombre, a.profundidad, r.estatus,
+               SUM(r.total), SUM(r.minutos_retardo), SUM(r.horas_trabajadas)
+        FROM arbol a
+        LEFT JOIN {resumen} r
+               ON r.unidad_id = a.id AND r.fecha >= %s AND r.fecha <= %s
+        GROUP BY a.id, a.unidad_padre_id, a.nombre, a.profundidad, r.estatus
+    """
+    params += [ops.adapt_datefield_value(fi), ops.adapt_datefield_value(ff)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def arbol_consolidado(raiz_id, fi, ff):
+    """
+    Raíces del árbol (NodoUnidad) con sus totales propios y de rama.
+    Con `raiz_id=None` regresa todas las unidades de primer nivel.
+    """
+    nodos = {}
+    for unidad_id, padre_id, nombre, nivel, estatus, total, minutos, horas in _filas(raiz_id, fi, ff):
+        nodo = nodos.get(unidad_id)
+        if nodo is None:
+            nodo = nodos[unidad_id] = NodoUnidad(unidad_id, padre_id, nombre, nivel)
+
+        if estatus is not None:
+            nodo.propios.por_estatus[estatus] = nodo.propios.por_estatus.get(estatus, 0) + total
+            nodo.propios.minutos_retardo += minutos or 0
+            nodo.propios.horas_trabajadas += horas or 0
+
+    raices = []
+    for nodo in sorted(nodos.values(), key=lambda n: n.nombre):
+        padre = nodos.get(nodo.padre_id) if nodo.profundidad else None
+        if padre is not None and padre.profundidad < nodo.profundidad:
+            padre.hijos.append(nodo)
+        else:
+            raices.append(nodo)
+
+    # De lo más profundo hacia la raíz: cada rama ya está completa cuando
+    # se suma a la de su padre.
+    for nodo in sorted(nodos.values(), key=lambda n: n.profundidad, reverse=True):
+        nodo.rama.sumar(nodo.propios)
+        padre = nodos.get(nodo.padre_id) if nodo.profundidad else None
+        if padre is not None and padre.profundidad < nodo.profundidad:
+            padre.rama.sumar(nodo.rama)
+
+    return raices
+
+
+def recorrido(raices):
+    """
+    Lista plana en preorden para la plantilla: (nodo, cierres), donde
+    `cierres` es cuántas ramas desplegables terminan después del nodo.
+    Se arma con una pila para no depender de la profundidad (un {% include %}
+    recursivo por nivel podría agotar la recursión de Python).
+    """
+    filas = []
+    pila = [(nodo, 0) for nodo in reversed(raices)]
+    while pila:
+        nodo, cierres = pila.pop()
+        if nodo.hijos:
+            filas.append((nodo, range(0)))
+            # El último hijo carga el cierre de esta rama y los pendientes
+            pila.append((nodo.hijos[-1], cierres + 1))
+            pila.extend((hijo, 0) for hijo in reversed(nodo.hijos[:-1]))
+        else:
+            filas.append((nodo, range(cierres)))
+    return filas
@@ -0,0 +1,153 @@
+# reports/exportacion.py
+# Exportación de CSV en streaming
+#
+# Las filas se leen por bloques con .iterator() (cursor del lado del servidor
+# en PostgreSQL) y solo con las columnas necesarias (values_list); el CSV se
+# va escribiendo y enviando conforme se lee, opcionalmente comprimido con
+# gzip. La memoria del worker no depende del rango de fechas.
+
+import csv
+import zlib
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+
+LOTE_POR_DEFECTO = getattr(settings, 'REPORTES_CSV_LOTE', 2000)
+
+# Tamaño aproximado de cada bloque enviado al cliente
+TAM_BLOQUE = 64 * 1024
+
+
+class _Eco:
+    """Pseudo-archivo: csv.writer regresa la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def lineas_csv(encabezados, filas):
+    """Genera el CSV como bloques de bytes UTF-8 (sin encabezado si `encabezados` es None)."""
+    escritor = csv.writer(_Eco())
+    bloque = [escritor.writerow(encabezados)] if encabezados else []
+    tam = 0
+
+    for fila in filas:
+        linea = escritor.writerow(fila)
+        bloque.append(linea)
+        tam += len(linea)
+        if tam >= TAM_BLOQUE:
+            yield ''.join(bloque).encode('utf-8')
+            bloque, tam = [], 0
+
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+def gzip_en_linea(bloques):
+    """Comprime con gzip los bloques conforme llegan."""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for bloque in bloques:
+        comprimido = compresor.compress(bloque)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+def contenido_csv(encabezados, filas, comprimir=False):
+    """Bloques de bytes del CSV, comprimidos con gzip si `comprimir`."""
+    contenido = lineas_csv(encabezados, filas)
+    return gzip_en_linea(contenido) if comprimir else contenido
+
+
+def respuesta_bloques(nombre, bloques, comprimir=False):
+    """StreamingHttpResponse de descarga para bloques ya generados (ej. desde el cache)."""
+    if comprimir:
+        response = StreamingHttpResponse(bloques, content_type='application/gzip')
+        nombre = f"{nombre}.csv.gz"
+    else:
+        response = StreamingHttpResponse(bloques, content_type='text/csv; charset=utf-8')
+        nombre = f"{nombre}.csv"
+
+    response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    return response
+
+
+def respuesta_csv(nombre, encabezados, filas, comprimir=False):
+    """
+    StreamingHttpResponse con el CSV de `filas` (iterable de tuplas).
+    Con `comprimir=True` se descarga como .csv.gz.
+    """
+    return respuesta_bloques(nombre, contenido_csv(encabezados, filas, comprimir), comprimir)
+
+
+def pide_gzip(request):
+    return request.GET.get('gzip') in ('1', 'true', 'si')
+
+
+# ============================================================
+# CONSULTAS DE EXPORTACIÓN
+# ============================================================
+
+ENCABEZADOS_TRABAJADOR = [
+    "Fecha", "Entrada", "Salida",
+    "Estatus", "Minutos Retardo", "Horas Trabajadas",
+    "Tipo Incidencia"
+]
+
+ENCABEZADOS_UNIDAD = ["Trabajador"] + ENCABEZADOS_TRABAJADOR
+
+
+def nombre_trabajador(nombre, apellido, numero):
+    """Mismo formato que Trabajador.__str__."""
+    return f"{nombre or ''} {apellido or ''} ({numero or 'S/E'})"
+
+
+def filas_trabajador(asistencias, tam_lote=None):
+    columnas = asistencias.values_list(
+        'fecha', 'hora_entrada', 'hora_salida', 'estatus',
+        'minutos_retardo', 'horas_trabajadas', 'incidencia__descripcion',
+    )
+    for fecha, entrada, salida, estatus, minutos, horas, incidencia in columnas.iterator(
+        chunk_size=tam_lote or LOTE_POR_DEFECTO
+    ):
+        yield (fecha, entrada, salida, estatus, minutos, horas, incidencia or "")
+
+
+def filas_unidad(asistencias, tam_lote=None):
+    columnas = asistencias.values_list(
+        'trabajador__nombre', 'trabajador__apellido_paterno', 'trabajador__numero_empleado',
+        'fecha', 'hora_entrada', 'hora_salida', 'estatus',
+        'minutos_retardo', 'horas_trabajadas', 'incidencia__descripcion',
+    )
+    for (nombre, apellido, numero, fecha, entrada, salida, estatus,
+         minutos, horas, incidencia) in columnas.iterator(chunk_size=tam_lote or LOTE_POR_DEFECTO):
+        yield (
+            nombre_trabajador(nombre, apellido, numero),
+            fecha, entrada, salida, estatus, minutos, horas, incidencia or "",
+        )
+
+
+ENCABEZADOS_KARDEX = [
+    "Número de Empleado", "Trabajador", "Unidad", "Mes",
+    "Días Registrados", "Asistencias", "Retardos", "Faltas",
+    "Días Justificados", "Días Inhábiles", "Minutos Retardo", "Horas Trabajadas",
+]
+
+
+def filas_kardex(kardex, tam_lote=None):
+    columnas = kardex.values_list(
+        'trabajador__numero_empleado', 'trabajador__nombre', 'trabajador__apellido_paterno',
+        'unidad__nombre', 'mes', 'dias_registrados', 'asistencias', 'retardos', 'faltas',
+        'justificados', 'inhabiles', 'minutos_retardo', 'horas_trabajadas',
+    )
+    for (numero, nombre, apellido, unidad, mes, *totales) in columnas.iterator(
+        chunk_size=tam_lote or LOTE_POR_DEFECTO
+    ):
+        yield (
+            numero or "",
+            nombre_trabajador(nombre, apellido, numero),
+            unidad or "",
+            mes.strftime("%Y-%m"),
+            *totales,
+        )
@@ -3,6 +3,7 @@
 from django import forms
 from workers.models import Trabajador
 from core.models import UnidadAdministrativa
+from core.jerarquia import descendientes
 
 
 class ReporteTrabajadorForm(forms.Form):
@@ -57,3 +58,84 @@ class ReporteUnidadForm(forms.Form):
                 self.fields["unidad"].initial = perfil.trabajador.unidad
 
         self.fields["unidad"].queryset = qs
+
+
+MESES = [
+    (1, "Enero"), (2, "Febrero"), (3, "Marzo"), (4, "Abril"),
+    (5, "Mayo"), (6, "Junio"), (7, "Julio"), (8, "Agosto"),
+    (9, "Septiembre"), (10, "Octubre"), (11, "Noviembre"), (12, "Diciembre"),
+]
+
+
+class ReporteKardexForm(forms.Form):
+    unidad = forms.ModelChoiceField(
+        queryset=UnidadAdministrativa.objects.none(),
+        label="Unidad Administrativa",
+        required=False,
+        empty_label="Todas las unidades"
+    )
+    anio = forms.IntegerField(label="Año", min_value=2000, max_value=2100)
+    mes_inicio = forms.TypedChoiceField(label="Del mes", choices=MESES, coerce=int, initial=1)
+    mes_fin = forms.TypedChoiceField(label="Al mes", choices=MESES, coerce=int, initial=12)
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        qs = UnidadAdministrativa.objects.all()
+
+        if user is not None:
+            perfil = user.perfilusuario
+            if perfil.rol == "JEFE":
+                qs = UnidadAdministrativa.objects.filter(
+                    pk=perfil.trabajador.unidad_id
+                )
+                self.fields["unidad"].initial = perfil.trabajador.unidad
+                self.fields["unidad"].empty_label = None
+
+        self.fields["unidad"].queryset = qs
+
+    def clean(self):
+        cleaned_data = super().clean()
+        inicio = cleaned_data.get("mes_inicio")
+        fin = cleaned_data.get("mes_fin")
+        if inicio and fin and inicio > fin:
+            raise forms.ValidationError("El mes inicial no puede ser posterior al mes final.")
+        return cleaned_data
+
+
+class ReporteConsolidadoForm(forms.Form):
+    unidad = forms.ModelChoiceField(
+        queryset=UnidadAdministrativa.objects.none(),
+        label="Unidad raíz",
+        required=False,
+        empty_label="Todas las unidades"
+    )
+    fecha_inicio = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    fecha_fin = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        qs = UnidadAdministrativa.objects.all()
+
+        if user is not None:
+            perfil = user.perfilusuario
+            if perfil.rol == "JEFE":
+                # Su unidad y cualquiera de sus sub-unidades
+                qs = qs.filter(pk__in=descendientes(perfil.trabajador.unidad_id))
+                self.fields["unidad"].initial = perfil.trabajador.unidad
+                self.fields["unidad"].empty_label = None
+
+        self.fields["unidad"].queryset = qs.select_related("unidad_padre").order_by("nombre")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        fi = cleaned_data.get("fecha_inicio")
+        ff = cleaned_data.get("fecha_fin")
+        if fi and ff and fi > ff:
+            raise forms.ValidationError("La fecha final no puede ser anterior a la inicial.")
+        return cleaned_data
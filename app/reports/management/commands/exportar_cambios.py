@@ -0,0 +1,84 @@
+# reports/management/commands/exportar_cambios.py
+# Exporta a JSON Lines los cambios de asistencias e incidencias desde el último cursor
+
+import json
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from reports.cambios import TIPOS, CursorInvalido, LIMITE_MAXIMO, pagina_cambios
+
+
+class Command(BaseCommand):
+    help = (
+        "Escribe una línea JSON por registro creado, modificado (operacion=CAMBIO) o "
+        "borrado (operacion=BAJA) desde el cursor guardado en --estado, y guarda el "
+        "cursor nuevo al terminar. Pensado para la sincronización nocturna con nómina."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', choices=TIPOS, action='append', dest='tipos',
+                            help="Se puede repetir; sin él, todos")
+        parser.add_argument('--estado', help="Archivo JSON con el cursor de cada tipo")
+        parser.add_argument('--desde', help="Fecha y hora ISO para los tipos sin cursor guardado")
+        parser.add_argument('--salida', help="Archivo .jsonl (por omisión, la salida estándar)")
+        parser.add_argument('--limite', type=int, default=LIMITE_MAXIMO, help="Filas por consulta")
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                desde = parse_datetime(options['desde'])
+            except ValueError:
+                desde = None
+            if desde is None:
+                raise CommandError("--desde debe ser una fecha y hora ISO (ej. 2025-03-01T00:00).")
+            if is_naive(desde):
+                desde = make_aware(desde)
+
+        cursores = {}
+        if options['estado'] and os.path.exists(options['estado']):
+            with open(options['estado'], encoding='utf-8') as archivo:
+                cursores = json.load(archivo)
+
+        salida = open(options['salida'], 'w', encoding='utf-8') if options['salida'] else sys.stdout
+        totales = {}
+        try:
+            for tipo in options['tipos'] or TIPOS:
+                cursor = cursores.get(tipo)
+                cambios = bajas = 0
+                while True:
+                    try:
+                        pagina = pagina_cambios(tipo, cursor=cursor, desde=desde, limite=options['limite'])
+                    except CursorInvalido as e:
+                        raise CommandError(f"{tipo}: {e} Borre su entrada de --estado y use --desde.")
+
+                    for fila in pagina['registros']:
+                        salida.write(json.dumps({'tipo': tipo, 'operacion': 'CAMBIO', **fila}, cls=DjangoJSONEncoder) + '\n')
+                    for fila in pagina['eliminados']:
+                        salida.write(json.dumps({'tipo': tipo, 'operacion': 'BAJA', **fila}, cls=DjangoJSONEncoder) + '\n')
+                    cambios += len(pagina['registros'])
+                    bajas += len(pagina['eliminados'])
+                    cursor = pagina['cursor']
+                    if not pagina['hay_mas']:
+                        break
+
+                cursores[tipo] = cursor
+                totales[tipo] = (cambios, bajas)
+        finally:
+            if salida is not sys.stdout:
+                salida.close()
+
+        # El cursor se guarda solo cuando la salida ya quedó completa
+        if options['estado']:
+            temporal = f"{options['estado']}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(cursores, archivo, indent=2)
+            os.replace(temporal, options['estado'])
+
+        for tipo, (cambios, bajas) in totales.items():
+            self.stderr.write(f"{tipo}: {cambios} cambios, {bajas} bajas")
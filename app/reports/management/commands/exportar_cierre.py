@@ -0,0 +1,58 @@
+# reports/management/commands/exportar_cierre.py
+# Exporta el cierre de mes: un .csv.gz por unidad y su manifiesto
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.cierre import DIAS_POR_BLOQUE, exportar_cierre, mes_anterior
+from reports.trabajos import PROCESOS_POR_DEFECTO
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera en REPORTES_DIR/cierre_AAAA_MM/ un CSV comprimido por unidad con la "
+        "asistencia del mes y un manifiesto (filas y sha256 de cada archivo). "
+        "Sin --anio/--mes exporta el mes anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--anio', type=int)
+        parser.add_argument('--mes', type=int)
+        parser.add_argument('--procesos', type=int, default=PROCESOS_POR_DEFECTO)
+        parser.add_argument('--dias-por-bloque', type=int, default=DIAS_POR_BLOQUE,
+                            help="Días de cada bloque que se reparte en el pool")
+        parser.add_argument('--unidad', type=int, action='append', dest='unidades',
+                            help="Id de unidad (se puede repetir); sin él, todas")
+
+    def handle(self, *args, **options):
+        anio, mes = mes_anterior()
+        anio = options['anio'] or anio
+        mes = options['mes'] or mes
+
+        if not 1 <= mes <= 12:
+            raise CommandError("--mes debe estar entre 1 y 12.")
+        if options['procesos'] < 1:
+            raise CommandError("--procesos debe ser al menos 1.")
+        if options['dias_por_bloque'] < 1:
+            raise CommandError("--dias-por-bloque debe ser al menos 1.")
+
+        self.stdout.write(
+            f"Exportando cierre {anio}-{mes:02d} con {options['procesos']} procesos "
+            f"(bloques de {options['dias_por_bloque']} días)..."
+        )
+
+        def al_avanzar(hechos, total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {hechos}/{total} bloques")
+
+        resultado = exportar_cierre(
+            anio, mes,
+            procesos=options['procesos'],
+            unidades=options['unidades'],
+            dias_por_bloque=options['dias_por_bloque'],
+            al_avanzar=al_avanzar,
+        )
+
+        for archivo in resultado.archivos:
+            self.stdout.write(f"  {archivo['archivo']}: {archivo['filas']} filas, {archivo['bytes']} bytes")
+        self.stdout.write(f"Manifiesto: {resultado.manifiesto}")
+        self.stdout.write(self.style.SUCCESS(resultado.resumen()))
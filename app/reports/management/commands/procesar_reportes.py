@@ -0,0 +1,44 @@
+# reports/management/commands/procesar_reportes.py
+# Procesa los reportes solicitados en segundo plano (ReporteJob)
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.models import ReporteJob
+from reports.trabajos import PROCESOS_POR_DEFECTO, atender
+
+
+class Command(BaseCommand):
+    help = (
+        "Atiende la cola de reportes en segundo plano con un pool de procesos. "
+        "Con --una-vez procesa los pendientes y termina (útil desde cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=PROCESOS_POR_DEFECTO)
+        parser.add_argument('--intervalo', type=float, default=5,
+                            help="Segundos entre revisiones de la cola")
+        parser.add_argument('--una-vez', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 1:
+            raise CommandError("--procesos debe ser al menos 1.")
+
+        def al_terminar(trabajo_id, ok):
+            trabajo = ReporteJob.objects.get(pk=trabajo_id)
+            if ok:
+                self.stdout.write(f"{trabajo}: {trabajo.filas_procesadas} filas -> {trabajo.archivo}")
+            else:
+                self.stderr.write(f"{trabajo}: {trabajo.error}")
+
+        self.stdout.write(f"Procesando reportes con {options['procesos']} procesos...")
+        try:
+            atender(
+                procesos=options['procesos'],
+                intervalo=options['intervalo'],
+                una_vez=options['una_vez'],
+                al_terminar=al_terminar,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Detenido.")
+            return
+        self.stdout.write(self.style.SUCCESS("Sin reportes pendientes."))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('reports', '0001_reporte_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportejob',
+            name='unidades',
+            field=models.ManyToManyField(blank=True, related_name='cierres', to='core.unidadadministrativa'),
+        ),
+        migrations.AlterField(
+            model_name='reportejob',
+            name='tipo',
+            field=models.CharField(choices=[('UNIDAD', 'Asistencia por unidad'), ('TRABAJADOR', 'Asistencia por trabajador'), ('CIERRE', 'Cierre de mes por unidad')], max_length=20),
+        ),
+    ]
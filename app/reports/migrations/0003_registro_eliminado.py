@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_reportejob_cierre'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('ASISTENCIA', 'Registro de asistencia'), ('INCIDENCIA', 'Incidencia')], max_length=20)),
+                ('objeto_id', models.BigIntegerField()),
+                ('trabajador_id', models.BigIntegerField(blank=True, null=True)),
+                ('numero_empleado', models.CharField(blank=True, max_length=20)),
+                ('unidad_id', models.BigIntegerField(blank=True, null=True)),
+                ('fecha', models.DateField(blank=True, null=True)),
+                ('eliminado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Registro Eliminado',
+                'verbose_name_plural': 'Registros Eliminados',
+                'ordering': ['eliminado_en', 'id'],
+                'indexes': [models.Index(fields=['modelo', 'eliminado_en', 'id'], name='eliminado_modelo_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,135 @@
+# reports/models.py
+# Trabajos de reportes en segundo plano
+
+import os
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from core.models import UnidadAdministrativa
+from workers.models import Trabajador
+
+
+class ReporteJob(models.Model):
+    """
+    Reporte CSV que se genera fuera de la petición web (reports/trabajos.py).
+    Lo procesa el comando `procesar_reportes`; el archivo queda en
+    REPORTES_DIR y se descarga desde la página de trabajos.
+    """
+
+    TIPO_CHOICES = [
+        ('UNIDAD', 'Asistencia por unidad'),
+        ('TRABAJADOR', 'Asistencia por trabajador'),
+        ('CIERRE', 'Cierre de mes por unidad'),
+    ]
+
+    ESTATUS_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En proceso'),
+        ('TERMINADO', 'Terminado'),
+        ('ERROR', 'Error'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+
+    # Siempre se guarda la unidad (en reportes por trabajador, la de él):
+    # es la que determina qué JEFE puede ver el trabajo.
+    unidad = models.ForeignKey(
+        UnidadAdministrativa,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="reportes",
+    )
+    trabajador = models.ForeignKey(
+        Trabajador,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="reportes",
+    )
+    # Cierre de mes (reports/cierre.py): unidades a exportar; vacío = todas
+    unidades = models.ManyToManyField(
+        UnidadAdministrativa,
+        blank=True,
+        related_name="cierres",
+    )
+    fecha_inicio = models.DateField()
+    fecha_fin = models.DateField()
+    comprimir = models.BooleanField(default=False)
+
+    estatus = models.CharField(max_length=20, choices=ESTATUS_CHOICES, default='PENDIENTE')
+    progreso = models.PositiveSmallIntegerField(default=0, help_text="Porcentaje (0-100)")
+    total_filas = models.PositiveIntegerField(null=True, blank=True)
+    filas_procesadas = models.PositiveIntegerField(default=0)
+
+    # Ruta relativa a REPORTES_DIR
+    archivo = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="reportes_solicitados",
+    )
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    terminado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Trabajo de Reporte"
+        verbose_name_plural = "Trabajos de Reportes"
+        ordering = ['-creado_en']
+        indexes = [
+            models.Index(fields=['estatus', 'creado_en'], name='reportejob_estatus_idx'),
+        ]
+
+    def __str__(self):
+        if self.tipo == 'CIERRE':
+            return f"{self.get_tipo_display()} ({self.fecha_inicio:%m/%Y})"
+        sujeto = self.trabajador or self.unidad
+        return f"{self.get_tipo_display()} - {sujeto} ({self.fecha_inicio} a {self.fecha_fin})"
+
+    @property
+    def activo(self):
+        return self.estatus in ('PENDIENTE', 'EN_PROCESO')
+
+    @property
+    def nombre_descarga(self):
+        return os.path.basename(self.archivo)
+
+
+class RegistroEliminado(models.Model):
+    """
+    Marca (tombstone) de una asistencia o incidencia borrada, para que el
+    feed de cambios (reports/cambios.py) también informe las bajas. Guarda
+    los datos con que nómina identifica el registro, sin llaves foráneas:
+    el trabajador también pudo haberse borrado.
+    """
+
+    MODELO_CHOICES = [
+        ('ASISTENCIA', 'Registro de asistencia'),
+        ('INCIDENCIA', 'Incidencia'),
+    ]
+
+    modelo = models.CharField(max_length=20, choices=MODELO_CHOICES)
+    objeto_id = models.BigIntegerField()
+    trabajador_id = models.BigIntegerField(null=True, blank=True)
+    numero_empleado = models.CharField(max_length=20, blank=True)
+    unidad_id = models.BigIntegerField(null=True, blank=True)
+    # fecha de la asistencia o fecha_inicio de la incidencia
+    fecha = models.DateField(null=True, blank=True)
+    eliminado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Registro Eliminado"
+        verbose_name_plural = "Registros Eliminados"
+        ordering = ['eliminado_en', 'id']
+        indexes = [
+            models.Index(fields=['modelo', 'eliminado_en', 'id'], name='eliminado_modelo_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_modelo_display()} {self.objeto_id} ({self.eliminado_en:%d/%m/%Y %H:%M})"
@@ -0,0 +1,20 @@
+# reports/proceso.py
+# Punto de entrada de los procesos del pool de `procesar_reportes`
+#
+# Con 'spawn' este módulo se importa en el proceso nuevo antes de que Django
+# esté configurado, así que no importa modelos a nivel de módulo.
+
+
+def inicializar():
+    import django
+    django.setup()
+
+
+def ejecutar(trabajo_id):
+    from .trabajos import ejecutar as ejecutar_trabajo
+    return ejecutar_trabajo(trabajo_id)
+
+
+def exportar_bloque(*args):
+    from .cierre import exportar_bloque as exportar
+    return exportar(*args)
@@ -0,0 +1,115 @@
+# reports/signals.py
+# Invalidación del cache de reportes (reports/cache.py) y marcas de
+# registros borrados para el feed de cambios (reports/cambios.py)
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from attendance.models import RegistroAsistencia
+from attendance.signals import asistencias_modificadas
+from core.lotes import Lote, lote_actual
+from core.models import TipoIncidencia
+from incidents.models import Incidencia
+from workers.models import Trabajador
+from .cache import invalidar
+from .models import RegistroEliminado
+
+
+@receiver(asistencias_modificadas)
+def asistencias_cambiaron(sender, registros, **kwargs):
+    invalidar(
+        unidades={unidad_id for _, unidad_id, _ in registros},
+        trabajadores={trabajador_id for trabajador_id, _, _ in registros},
+    )
+
+
+@receiver(post_save, sender=Incidencia)
+@receiver(post_delete, sender=Incidencia)
+def incidencia_cambio(sender, instance, **kwargs):
+    invalidar(unidades={instance.unidad_id}, trabajadores={instance.trabajador_id})
+
+
+@receiver(post_save, sender=Trabajador)
+def trabajador_cambio(sender, instance, created, **kwargs):
+    # El nombre del trabajador aparece en los reportes de su unidad
+    if not created:
+        unidades = {instance.unidad_id, instance.previous('unidad')}
+        invalidar(unidades=unidades - {None}, trabajadores={instance.pk})
+
+
+@receiver(post_save, sender=TipoIncidencia)
+@receiver(post_delete, sender=TipoIncidencia)
+def tipo_incidencia_cambio(sender, instance, **kwargs):
+    invalidar(todo=True)
+
+
+# ============================================================
+# BAJAS PARA EL FEED DE CAMBIOS
+# Las marcas se juntan por transacción y se insertan con un solo bulk_create
+# al confirmarla (core/lotes.py): borrar un trabajador (en cascada) o revertir
+# una incidencia borra muchas filas a la vez. El número de empleado se lee con
+# una consulta por lote; el de un trabajador que se borra en la misma
+# transacción se toma en su pre_delete, antes de que desaparezca.
+# ============================================================
+
+class _LoteMarcas(Lote):
+
+    def __init__(self):
+        super().__init__()
+        self.marcas = []
+        self.numeros = {}   # trabajador_id -> numero_empleado ya conocido
+
+    def procesar(self):
+        faltantes = {m.trabajador_id for m in self.marcas} - set(self.numeros) - {None}
+        if faltantes:
+            self.numeros.update(
+                Trabajador.objects.filter(pk__in=faltantes).values_list('id', 'numero_empleado')
+            )
+
+        # Hora de la inserción, no la del borrado: el feed ya pudo entregar
+        # marcas posteriores al borrado mientras la transacción seguía abierta
+        ahora = timezone.now()
+        for marca in self.marcas:
+            marca.numero_empleado = self.numeros.get(marca.trabajador_id) or ''
+            marca.eliminado_en = ahora
+        RegistroEliminado.objects.bulk_create(self.marcas, batch_size=1000)
+
+
+def _marcar(instance, **campos):
+    lote = lote_actual('registros_eliminados', _LoteMarcas)
+    inmediato = lote is None
+    if inmediato:
+        lote = _LoteMarcas()
+
+    trabajador = instance._state.fields_cache.get('trabajador')
+    if trabajador is not None:
+        lote.numeros[trabajador.pk] = trabajador.numero_empleado
+    lote.marcas.append(RegistroEliminado(
+        objeto_id=instance.pk,
+        trabajador_id=instance.trabajador_id,
+        unidad_id=instance.unidad_id,
+        **campos,
+    ))
+
+    if inmediato:
+        lote.confirmar()
+
+
+@receiver(pre_delete, sender=Trabajador)
+def trabajador_por_eliminar(sender, instance, **kwargs):
+    # Sus asistencias e incidencias se borran en cascada y al procesar el
+    # lote ya no estará en la base
+    lote = lote_actual('registros_eliminados', _LoteMarcas)
+    if lote is not None:
+        lote.numeros[instance.pk] = instance.numero_empleado
+
+
+@receiver(post_delete, sender=RegistroAsistencia)
+def asistencia_eliminada(sender, instance, **kwargs):
+    _marcar(instance, modelo='ASISTENCIA', fecha=instance.fecha)
+
+
+@receiver(post_delete, sender=Incidencia)
+def incidencia_eliminada(sender, instance, **kwargs):
+    _marcar(instance, modelo='INCIDENCIA', fecha=instance.fecha_inicio)
@@ -1,3 +1,105 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from attendance.models import RegistroAsistencia
+from core.models import TipoIncidencia
+from incidents.models import Incidencia
+from workers.models import Trabajador
+from .cambios import pagina_cambios
+from .models import RegistroEliminado
+
+
+# ============================================================
+# FEED DE CAMBIOS PARA NÓMINA
+# ============================================================
+
+@mock.patch('reports.views.TOKEN_CAMBIOS', 'secreto')
+class ApiCambiosLimiteTests(TestCase):
+
+    def consultar(self, **params):
+        return self.client.get(
+            reverse('reports:api_cambios', args=['asistencias']),
+            params,
+            HTTP_AUTHORIZATION='Token secreto',
+        )
+
+    def test_limite_negativo_es_400(self):
+        for limite in ('-5', '-1'):
+            respuesta = self.consultar(limite=limite)
+            self.assertEqual(respuesta.status_code, 400)
+            self.assertIn('mayor a cero', respuesta.json()['error'])
+
+    def test_limite_no_numerico_es_400(self):
+        self.assertEqual(self.consultar(limite='diez').status_code, 400)
+
+    def test_limite_valido(self):
+        respuesta = self.consultar(limite='5')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['registros'], [])
+
+    def test_pagina_cambios_acota_el_limite(self):
+        pagina = pagina_cambios('asistencias', limite=-5)
+        self.assertEqual(pagina['registros'], [])
+        self.assertFalse(pagina['hay_mas'])
+
+
+# ============================================================
+# MARCAS DE REGISTROS BORRADOS
+# ============================================================
+
+class RegistroEliminadoTests(TestCase):
+
+    def setUp(self):
+        self.trabajador = Trabajador.objects.create(nombre="Ana", numero_empleado="E1")
+        self.registros = [
+            RegistroAsistencia.objects.create(
+                trabajador=self.trabajador, fecha=date(2025, 3, 3) + timedelta(days=i)
+            )
+            for i in range(3)
+        ]
+        self.incidencia = Incidencia.objects.create(
+            trabajador=self.trabajador,
+            tipo=TipoIncidencia.objects.create(descripcion="Permiso"),
+            fecha_inicio=date(2025, 3, 10),
+            fecha_fin=date(2025, 3, 10),
+        )
+
+    def test_borrado_en_cascada_inserta_las_marcas_juntas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.trabajador.delete()
+
+        tabla = RegistroEliminado._meta.db_table
+        inserciones = [q for q in consultas if q['sql'].startswith(f'INSERT INTO "{tabla}"')]
+        self.assertEqual(len(inserciones), 1)
+
+        marcas = RegistroEliminado.objects.all()
+        self.assertEqual(
+            sorted((m.modelo, m.objeto_id) for m in marcas),
+            sorted(
+                [('ASISTENCIA', r.pk) for r in self.registros]
+                + [('INCIDENCIA', self.incidencia.pk)]
+            ),
+        )
+        self.assertEqual({m.numero_empleado for m in marcas}, {'E1'})
+
+    def test_no_hay_marcas_de_lo_que_se_revierte(self):
+        primero, segundo, _ = self.registros
+        with self.captureOnCommitCallbacks(execute=True):
+            RegistroAsistencia.objects.get(pk=primero.pk).delete()
+            try:
+                with transaction.atomic():
+                    RegistroAsistencia.objects.get(pk=segundo.pk).delete()
+                    raise ValueError
+            except ValueError:
+                pass
 
-# Create your tests here.
+        self.assertEqual(
+            list(RegistroEliminado.objects.values_list('objeto_id', flat=True)), [primero.pk]
+        )
+        self.assertEqual(RegistroEliminado.objects.get().numero_empleado, 'E1')
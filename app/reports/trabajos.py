@@ -0,0 +1,262 @@
+# reports/trabajos.py
+# Reportes CSV en segundo plano (sin broker externo)
+#
+# La cola es la tabla ReporteJob. El comando `procesar_reportes` toma los
+# trabajos pendientes con un UPDATE condicional (estatus = PENDIENTE), de modo
+# que varios comandos en paralelo nunca procesan el mismo trabajo, y los
+# ejecuta en un pool de procesos. Cada proceso escribe el CSV en REPORTES_DIR
+# por bloques (reports/exportacion.py) y va guardando el porcentaje de avance.
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from attendance.models import RegistroAsistencia
+from .exportacion import (
+    LOTE_POR_DEFECTO,
+    ENCABEZADOS_TRABAJADOR,
+    ENCABEZADOS_UNIDAD,
+    contenido_csv,
+    filas_trabajador,
+    filas_unidad,
+)
+from . import proceso
+from .models import ReporteJob
+
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO = getattr(
+    settings, 'REPORTES_DIR', os.path.join(settings.BASE_DIR, 'reportes_generados')
+)
+
+PROCESOS_POR_DEFECTO = getattr(settings, 'REPORTES_PROCESOS', 2)
+
+# Un trabajo EN_PROCESO más viejo que esto se considera abandonado
+# (el comando se detuvo a la mitad) y vuelve a la cola.
+MAX_MINUTOS = getattr(settings, 'REPORTES_TRABAJO_MAX_MINUTOS', 60)
+
+def ruta_archivo(trabajo):
+    return os.path.join(DIRECTORIO, trabajo.archivo)
+
+
+# ============================================================
+# CONSULTAS
+# ============================================================
+
+def _contenido(trabajo):
+    """(nombre base, encabezados, queryset, generador de filas) del trabajo."""
+    fi, ff = trabajo.fecha_inicio, trabajo.fecha_fin
+
+    if trabajo.tipo == 'TRABAJADOR':
+        asistencias = RegistroAsistencia.objects.filter(
+            trabajador_id=trabajo.trabajador_id,
+            fecha__range=(fi, ff)
+        ).order_by("fecha")
+        nombre = f"reporte_{trabajo.trabajador}_{fi.isoformat()}_a_{ff.isoformat()}"
+        return nombre, ENCABEZADOS_TRABAJADOR, asistencias, filas_trabajador
+
+    asistencias = RegistroAsistencia.objects.filter(
+        unidad_id=trabajo.unidad_id,
+        fecha__range=(fi, ff)
+    ).order_by("trabajador__apellido_paterno", "fecha")
+    nombre = f"reporte_unidad_{trabajo.unidad}_{fi.isoformat()}_a_{ff.isoformat()}"
+    return nombre, ENCABEZADOS_UNIDAD, asistencias, filas_unidad
+
+
+def _por_bloques(trabajo_id, asistencias, filas, tam_lote):
+    """
+    Genera las filas de `asistencias` leyendo un bloque de ids a la vez y
+    guarda el avance después de cada bloque.
+
+    No se usa un solo cursor abierto durante todo el reporte: en SQLite esa
+    lectura larga impediría guardar el avance (y cualquier otra escritura).
+    Primero se leen los ids en el orden del reporte; cada bloque conserva ese
+    orden, así que el archivo queda igual que el de la exportación directa.
+    """
+    ids = list(asistencias.values_list('id', flat=True))
+    total = len(ids)
+    ReporteJob.objects.filter(pk=trabajo_id).update(total_filas=total)
+
+    for inicio in range(0, total, tam_lote):
+        bloque = ids[inicio:inicio + tam_lote]
+        yield from filas(asistencias.filter(id__in=bloque), tam_lote)
+
+        procesadas = inicio + len(bloque)
+        ReporteJob.objects.filter(pk=trabajo_id).update(
+            filas_procesadas=procesadas, progreso=min(99, procesadas * 100 // total)
+        )
+
+
+# ============================================================
+# EJECUCIÓN (dentro de cada proceso del pool, vía reports/proceso.py)
+# ============================================================
+
+def ejecutar(trabajo_id):
+    """Genera el archivo de un trabajo ya reclamado. Regresa True si terminó bien."""
+    trabajo = ReporteJob.objects.select_related('unidad', 'trabajador').get(pk=trabajo_id)
+    if trabajo.tipo == 'CIERRE':
+        return _ejecutar_cierre(trabajo)
+    temporal = None
+
+    try:
+        nombre, encabezados, asistencias, filas = _contenido(trabajo)
+
+        extension = ".csv.gz" if trabajo.comprimir else ".csv"
+        relativo = get_valid_filename(f"{trabajo.pk}_{nombre}{extension}")
+        ruta = os.path.join(DIRECTORIO, relativo)
+        temporal = f"{ruta}.tmp"
+        os.makedirs(DIRECTORIO, exist_ok=True)
+
+        contenido = contenido_csv(
+            encabezados,
+            _por_bloques(trabajo.pk, asistencias, filas, LOTE_POR_DEFECTO),
+            comprimir=trabajo.comprimir,
+        )
+
+        with open(temporal, 'wb') as destino:
+            for bloque in contenido:
+                destino.write(bloque)
+        os.replace(temporal, ruta)
+
+        ReporteJob.objects.filter(pk=trabajo.pk).update(
+            estatus='TERMINADO',
+            progreso=100,
+            archivo=relativo,
+            terminado_en=timezone.now(),
+        )
+        return True
+
+    except Exception as e:
+        logger.exception("Error al generar el reporte %s", trabajo.pk)
+        if temporal and os.path.exists(temporal):
+            os.remove(temporal)
+        marcar_error(trabajo.pk, str(e))
+        return False
+
+    finally:
+        connections.close_all()
+
+
+def _ejecutar_cierre(trabajo):
+    """
+    Cierre de mes (reports/cierre.py). Este proceso reparte los bloques en
+    su propio pool; el archivo del trabajo es el manifiesto.
+    """
+    from .cierre import exportar_cierre
+
+    def al_avanzar(hechos, total):
+        ReporteJob.objects.filter(pk=trabajo.pk).update(progreso=min(99, hechos * 100 // total))
+
+    try:
+        resultado = exportar_cierre(
+            trabajo.fecha_inicio.year,
+            trabajo.fecha_inicio.month,
+            unidades=list(trabajo.unidades.values_list('pk', flat=True)),
+            al_avanzar=al_avanzar,
+        )
+        ReporteJob.objects.filter(pk=trabajo.pk).update(
+            estatus='TERMINADO',
+            progreso=100,
+            total_filas=resultado.filas,
+            filas_procesadas=resultado.filas,
+            archivo=os.path.relpath(resultado.manifiesto, DIRECTORIO),
+            terminado_en=timezone.now(),
+        )
+        return True
+
+    except Exception as e:
+        logger.exception("Error al generar el cierre %s", trabajo.pk)
+        marcar_error(trabajo.pk, str(e))
+        return False
+
+    finally:
+        connections.close_all()
+
+
+def marcar_error(trabajo_id, mensaje):
+    ReporteJob.objects.filter(pk=trabajo_id).update(
+        estatus='ERROR', error=mensaje[:2000], terminado_en=timezone.now()
+    )
+
+
+# ============================================================
+# COLA
+# ============================================================
+
+def reclamar(limite):
+    """Pasa hasta `limite` trabajos de PENDIENTE a EN_PROCESO. Regresa sus ids."""
+    candidatos = (
+        ReporteJob.objects
+        .filter(estatus='PENDIENTE')
+        .order_by('creado_en')
+        .values_list('id', flat=True)[:limite * 2]
+    )
+
+    reclamados = []
+    for trabajo_id in candidatos:
+        if len(reclamados) >= limite:
+            break
+        # Solo uno de los comandos que compitan por el trabajo actualiza la fila
+        if ReporteJob.objects.filter(pk=trabajo_id, estatus='PENDIENTE').update(
+            estatus='EN_PROCESO', iniciado_en=timezone.now(), progreso=0, filas_procesadas=0, error=''
+        ):
+            reclamados.append(trabajo_id)
+    return reclamados
+
+
+def liberar_abandonados():
+    """Regresa a la cola los trabajos EN_PROCESO que llevan demasiado tiempo."""
+    limite = timezone.now() - timedelta(minutes=MAX_MINUTOS)
+    return ReporteJob.objects.filter(
+        estatus='EN_PROCESO', iniciado_en__lt=limite
+    ).update(estatus='PENDIENTE', iniciado_en=None, progreso=0, filas_procesadas=0)
+
+
+def atender(procesos=None, intervalo=5, una_vez=False, al_terminar=None):
+    """
+    Ciclo del comando `procesar_reportes`: reclama trabajos mientras haya
+    procesos libres y espera a que terminen. Con `una_vez=True` sale cuando
+    ya no hay pendientes. `al_terminar(trabajo_id, ok)` se llama por trabajo.
+    """
+    procesos = procesos or PROCESOS_POR_DEFECTO
+    liberar_abandonados()
+
+    # 'spawn': los procesos no heredan las conexiones abiertas del padre
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        mp_context=get_context('spawn'),
+        initializer=proceso.inicializar,
+    ) as pool:
+        en_curso = {}
+        while True:
+            libres = procesos - len(en_curso)
+            if libres:
+                for trabajo_id in reclamar(libres):
+                    en_curso[pool.submit(proceso.ejecutar, trabajo_id)] = trabajo_id
+
+            if not en_curso:
+                if una_vez:
+                    break
+                time.sleep(intervalo)
+                continue
+
+            terminados, _ = wait(en_curso, timeout=intervalo, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                trabajo_id = en_curso.pop(futuro)
+                try:
+                    ok = futuro.result()
+                except Exception as e:
+                    # El proceso murió sin poder registrar el error
+                    marcar_error(trabajo_id, f"El proceso del reporte terminó inesperadamente: {e}")
+                    ok = False
+                if al_terminar:
+                    al_terminar(trabajo_id, ok)
@@ -6,8 +6,17 @@ from .views import (
     ReportePorTrabajadorView,
     ReportePorUnidadView,
     ReportePersonalView,
+    ReportePersonalDatosView,
     exportar_csv_trabajador,
-    exportar_csv_unidad
+    exportar_csv_unidad,
+    SolicitarReporteView,
+    ReporteJobListView,
+    descargar_reporte,
+    ReporteKardexView,
+    exportar_csv_kardex,
+    ReporteAnaliticaView,
+    ReporteConsolidadoView,
+    api_cambios,
 )
 
 app_name = "reports"
@@ -17,9 +26,22 @@ urlpatterns = [
     path("trabajador/", ReportePorTrabajadorView.as_view(), name="rep_trabajador"),
     path("unidad/", ReportePorUnidadView.as_view(), name="rep_unidad"),
     path("personal/", ReportePersonalView.as_view(), name="rep_personal"),
+    path("personal/datos/", ReportePersonalDatosView.as_view(), name="rep_personal_datos"),
+    path("kardex/", ReporteKardexView.as_view(), name="rep_kardex"),
+    path("analitica/", ReporteAnaliticaView.as_view(), name="rep_analitica"),
+    path("consolidado/", ReporteConsolidadoView.as_view(), name="rep_consolidado"),
 
     # Exportar CSV
     path("csv/trabajador/", exportar_csv_trabajador, name="csv_trabajador"),
     path("csv/unidad/", exportar_csv_unidad, name="csv_unidad"),
+    path("csv/kardex/", exportar_csv_kardex, name="csv_kardex"),
+
+    # Reportes en segundo plano
+    path("trabajos/", ReporteJobListView.as_view(), name="trabajos"),
+    path("trabajos/solicitar/", SolicitarReporteView.as_view(), name="solicitar_reporte"),
+    path("trabajos/<int:pk>/descargar/", descargar_reporte, name="descargar_reporte"),
+
+    # Feed de cambios para nómina
+    path("api/cambios/<str:tipo>/", api_cambios, name="api_cambios"),
 ]
     
\ No newline at end of file
@@ -6,6 +6,7 @@
 from django.contrib.auth.decorators import login_required
 from django.views.generic import FormView, TemplateView
 from django.http import HttpResponse
+from django.template.loader import render_to_string
 from django.utils.timezone import now
 from django.utils.dateparse import parse_date
 
@@ -20,12 +21,29 @@ from attendance.models import RegistroAsistencia
 from core.models import UnidadAdministrativa
 from django.http import HttpResponseForbidden
 
+from .cache import bloques_en_cache, valor_en_cache
+from .exportacion import (
+    ENCABEZADOS_TRABAJADOR,
+    ENCABEZADOS_UNIDAD,
+    contenido_csv,
+    filas_trabajador,
+    filas_unidad,
+    pide_gzip,
+    respuesta_bloques,
+    respuesta_csv,
+)
 from .forms import (
     ReporteTrabajadorForm,
     ReporteUnidadForm
 )
 
-import csv
+
+def tabla_asistencias(plantilla, asistencias):
+    """HTML de la tabla de resultados; vacío si no hay registros."""
+    asistencias = list(asistencias)
+    if not asistencias:
+        return ""
+    return render_to_string(plantilla, {"asistencias": asistencias})
 
 
 # ============================================================
@@ -67,10 +85,17 @@ class ReportePorTrabajadorView(AdminOJefeMixin, FormView):
             .order_by("fecha")
         )
 
+        # La tabla ya generada se reutiliza mientras no cambien los datos
+        tabla = valor_en_cache(
+            ("tabla_trabajador", trabajador.pk, fi, ff),
+            lambda: tabla_asistencias("reports/tabla_trabajador.html", asistencias),
+            trabajador_id=trabajador.pk,
+        )
+
         return self.render_to_response({
             "form": form,
             "trabajador": trabajador,
-            "asistencias": asistencias,
+            "tabla_asistencias": tabla,
             "fi": fi,
             "ff": ff,
         })
@@ -111,30 +136,15 @@ def exportar_csv_trabajador(request):
         fecha__range=(fi, ff)
     ).order_by("fecha")
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = (
-        f'attachment; filename=\"reporte_{trabajador}_{fi.isoformat()}_a_{ff.isoformat()}.csv\"'
+    comprimir = pide_gzip(request)
+    bloques = bloques_en_cache(
+        ("csv_trabajador", trabajador.pk, fi, ff, comprimir),
+        lambda: contenido_csv(ENCABEZADOS_TRABAJADOR, filas_trabajador(asistencias), comprimir),
+        trabajador_id=trabajador.pk,
+    )
+    return respuesta_bloques(
+        f"reporte_{trabajador}_{fi.isoformat()}_a_{ff.isoformat()}", bloques, comprimir
     )
-
-    writer = csv.writer(response)
-    writer.writerow([
-        "Fecha", "Entrada", "Salida",
-        "Estatus", "Minutos Retardo", "Horas Trabajadas",
-        "Tipo Incidencia"
-    ])
-
-    for a in asistencias:
-        writer.writerow([
-            a.fecha,
-            a.hora_entrada,
-            a.hora_salida,
-            a.estatus,
-            a.minutos_retardo,
-            a.horas_trabajadas,
-            a.incidencia.descripcion if a.incidencia else ""
-        ])
-
-    return response
 
 # ============================================================
 # 2. REPORTE POR UNIDAD (ADMIN / JEFE)
@@ -173,17 +183,23 @@ class ReportePorUnidadView(LoginRequiredMixin, AdminOJefeMixin, FormView):
         asistencias = (
             RegistroAsistencia.objects
             .filter(
-                trabajador__unidad=unidad,
+                unidad=unidad,
                 fecha__range=(fi, ff)
             )
             .select_related("trabajador", "incidencia")
             .order_by("trabajador__apellido_paterno", "fecha")
         )
 
+        tabla = valor_en_cache(
+            ("tabla_unidad", unidad.pk, fi, ff),
+            lambda: tabla_asistencias("reports/tabla_unidad.html", asistencias),
+            unidad_id=unidad.pk,
+        )
+
         return self.render_to_response({
             "form": form,
             "unidad": unidad,
-            "asistencias": asistencias,
+            "tabla_asistencias": tabla,
             "fi": fi,
             "ff": ff,
         })
@@ -219,42 +235,82 @@ def exportar_csv_unidad(request):
         unidad = UnidadAdministrativa.objects.get(pk=unidad_id)
 
     asistencias = RegistroAsistencia.objects.filter(
-        trabajador__unidad=unidad,
+        unidad=unidad,
         fecha__range=(fi, ff)
-    ).select_related("trabajador", "incidencia")
+    ).order_by("trabajador__apellido_paterno", "fecha")
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = (
-        f'attachment; filename=\"reporte_unidad_{unidad}_{fi.isoformat()}_a_{ff.isoformat()}.csv\"'
+    comprimir = pide_gzip(request)
+    bloques = bloques_en_cache(
+        ("csv_unidad", unidad.pk, fi, ff, comprimir),
+        lambda: contenido_csv(ENCABEZADOS_UNIDAD, filas_unidad(asistencias), comprimir),
+        unidad_id=unidad.pk,
+    )
+    return respuesta_bloques(
+        f"reporte_unidad_{unidad}_{fi.isoformat()}_a_{ff.isoformat()}", bloques, comprimir
     )
-
-    writer = csv.writer(response)
-    writer.writerow([
-        "Trabajador",
-        "Fecha", "Entrada", "Salida",
-        "Estatus", "Minutos Retardo", "Horas Trabajadas",
-        "Tipo Incidencia"
-    ])
-
-    for a in asistencias.order_by("trabajador__apellido_paterno", "fecha"):
-        writer.writerow([
-            str(a.trabajador),
-            a.fecha,
-            a.hora_entrada,
-            a.hora_salida,
-            a.estatus,
-            a.minutos_retardo,
-            a.horas_trabajadas,
-            a.incidencia.descripcion if a.incidencia else ""
-        ])
-
-    return response
 
 # ============================================================
 # 3. REPORTE PERSONAL DEL TRABAJADOR
 # ============================================================
 
+from datetime import date
+
+from django.db.models import Count, Q, Sum
+from django.http import JsonResponse
+from django.views import View
+
+from core.paginacion import PaginadorKeyset
+
+# Registros por página del historial personal (HTML y JSON)
+POR_PAGINA_PERSONAL = 31
+ORDEN_PERSONAL = ("-fecha", "-id")
+
+
+def periodo_personal(request):
+    """
+    (fi, ff) del reporte personal. Sin fechas válidas en ?fi= / ?ff= es el
+    mes en curso hasta hoy: antes se mostraba todo el historial.
+    """
+    hoy = now().date()
+    try:
+        fi = parse_date(request.GET.get("fi") or "")
+        ff = parse_date(request.GET.get("ff") or "")
+    except ValueError:
+        # Formato correcto pero fecha inexistente (ej. 2025-02-30)
+        fi = ff = None
+    fi = fi or date(hoy.year, hoy.month, 1)
+    ff = ff or hoy
+    if fi > ff:
+        fi, ff = ff, fi
+    return fi, ff
+
+
+def asistencias_personales(trabajador, fi, ff):
+    return (
+        RegistroAsistencia.objects
+        .filter(trabajador=trabajador, fecha__range=(fi, ff))
+        .select_related("incidencia")
+    )
+
+
+def resumen_personal(asistencias):
+    """Totales del periodo en una sola consulta."""
+    return asistencias.order_by().aggregate(
+        registros=Count("id"),
+        asistencias=Count("id", filter=Q(estatus__in=RegistroAsistencia.ESTADOS_ASISTIO)),
+        retardos=Count("id", filter=Q(estatus="RETARDO")),
+        faltas=Count("id", filter=Q(estatus="FALTA")),
+        justificadas=Count("id", filter=Q(estatus="JUSTIFICADA")),
+        minutos_retardo=Sum("minutos_retardo"),
+        horas_trabajadas=Sum("horas_trabajadas"),
+    )
+
+
 class ReportePersonalView(TrabajadorOJefeMixin, TemplateView):
+    """
+    Encabezado con los totales del periodo y la primera página de registros;
+    las siguientes se piden a ReportePersonalDatosView ("Cargar más").
+    """
     template_name = "reports/reporte_personal.html"
 
     def get_context_data(self, **kwargs):
@@ -262,23 +318,53 @@ class ReportePersonalView(TrabajadorOJefeMixin, TemplateView):
         perfil = self.request.user.perfilusuario
         trabajador = perfil.trabajador
 
-        # Fechas recibidas por GET
-        fi = self.request.GET.get("fi")
-        ff = self.request.GET.get("ff")
-
-        qs = RegistroAsistencia.objects.filter(
-            trabajador=trabajador
-        ).select_related("incidencia")
-
-        if fi and ff:
-            qs = qs.filter(fecha__range=(fi, ff))
+        fi, ff = periodo_personal(self.request)
+        qs = asistencias_personales(trabajador, fi, ff)
+        pagina = PaginadorKeyset(qs, ORDEN_PERSONAL, POR_PAGINA_PERSONAL).pagina()
 
         context["trabajador"] = trabajador
-        context["asistencias"] = qs.order_by("fecha")
+        context["asistencias"] = pagina.object_list
+        context["page_obj"] = pagina
+        context["resumen"] = resumen_personal(qs)
         context["fi"] = fi
         context["ff"] = ff
         return context
 
+
+class ReportePersonalDatosView(TrabajadorOJefeMixin, View):
+    """
+    JSON con la siguiente página del historial del trabajador (paginación por
+    llave con ?cursor=). Cada registro va como datos y además las filas ya
+    generadas con la misma plantilla de la tabla.
+    """
+
+    def get(self, request):
+        trabajador = request.user.perfilusuario.trabajador
+        fi, ff = periodo_personal(request)
+
+        pagina = PaginadorKeyset(
+            asistencias_personales(trabajador, fi, ff), ORDEN_PERSONAL, POR_PAGINA_PERSONAL
+        ).pagina(request.GET.get("cursor"))
+
+        return JsonResponse({
+            "registros": [
+                {
+                    "fecha": a.fecha.isoformat(),
+                    "hora_entrada": a.hora_entrada.strftime("%H:%M") if a.hora_entrada else None,
+                    "hora_salida": a.hora_salida.strftime("%H:%M") if a.hora_salida else None,
+                    "horas_trabajadas": str(a.horas_trabajadas),
+                    "estatus": a.estatus,
+                    "minutos_retardo": a.minutos_retardo,
+                    "incidencia": str(a.incidencia) if a.incidencia else None,
+                }
+                for a in pagina.object_list
+            ],
+            "html": render_to_string(
+                "reports/filas_personal.html", {"asistencias": pagina.object_list}
+            ),
+            "siguiente": pagina.cursor_siguiente,
+        })
+
 # ============================================================
 # DASHBOARD DE REPORTES
 # ============================================================
@@ -296,3 +382,385 @@ class ReportesDashboardView(TemplateView):
         context["es_trabajador"] = perfil.rol == "TRAB"
 
         return context
+
+# ============================================================
+# 4. REPORTES EN SEGUNDO PLANO (ADMIN / JEFE)
+# Los CSV de rangos grandes se generan con `procesar_reportes`
+# (reports/trabajos.py); aquí se solicitan, se consulta el avance
+# y se descargan.
+# ============================================================
+
+import os
+
+from django.contrib import messages
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.views.generic import ListView
+
+from .models import ReporteJob
+from .trabajos import ruta_archivo
+
+
+def trabajos_visibles(user):
+    """ADMIN ve todos los trabajos; JEFE solo los de su unidad."""
+    perfil = user.perfilusuario
+    trabajos = ReporteJob.objects.select_related("unidad", "trabajador", "solicitado_por")
+
+    if perfil.rol == "ADMIN":
+        return trabajos
+    if perfil.rol == "JEFE" and perfil.trabajador:
+        return trabajos.filter(unidad_id=perfil.trabajador.unidad_id)
+    return trabajos.none()
+
+
+class SolicitarReporteView(AdminOJefeMixin, View):
+    """Encola un reporte con los mismos parámetros que los CSV directos."""
+
+    def post(self, request):
+        tipo = request.POST.get("tipo")
+        fi = parse_date(request.POST.get("fi") or "")
+        ff = parse_date(request.POST.get("ff") or "")
+
+        if tipo not in ("UNIDAD", "TRABAJADOR") or not fi or not ff:
+            return HttpResponse("Parámetros incompletos", status=400)
+        if fi > ff:
+            return HttpResponse("La fecha de inicio no puede ser mayor a la fecha fin.", status=400)
+
+        perfil = request.user.perfilusuario
+        trabajador = None
+
+        if tipo == "TRABAJADOR":
+            trabajador = get_object_or_404(Trabajador, pk=request.POST.get("t"))
+            # JEFE solo puede exportar de trabajadores de su unidad
+            if perfil.rol == "JEFE" and trabajador.unidad_id != perfil.trabajador.unidad_id:
+                return HttpResponseForbidden("No tiene permiso para ver este trabajador.")
+            unidad = trabajador.unidad
+        elif perfil.rol == "JEFE":
+            # Igual que en el CSV: siempre su unidad
+            unidad = perfil.trabajador.unidad
+        else:
+            unidad = get_object_or_404(UnidadAdministrativa, pk=request.POST.get("u"))
+
+        ReporteJob.objects.create(
+            tipo=tipo,
+            unidad=unidad,
+            trabajador=trabajador,
+            fecha_inicio=fi,
+            fecha_fin=ff,
+            comprimir=request.POST.get("gzip") in ("1", "true", "si"),
+            solicitado_por=request.user,
+        )
+        messages.success(
+            request,
+            "El reporte se está generando. Podrá descargarlo desde esta página cuando termine."
+        )
+        return redirect("reports:trabajos")
+
+
+class ReporteJobListView(AdminOJefeMixin, ListView):
+    template_name = "reports/trabajos.html"
+    context_object_name = "trabajos"
+    paginate_by = 25
+
+    def get_queryset(self):
+        return trabajos_visibles(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # La página se recarga sola mientras haya algo en curso
+        context["hay_activos"] = any(t.activo for t in context["trabajos"])
+        return context
+
+
+@login_required
+def descargar_reporte(request, pk):
+    if request.user.perfilusuario.rol not in ("ADMIN", "JEFE"):
+        return HttpResponseForbidden("No tiene permiso para descargar reportes.")
+
+    trabajo = get_object_or_404(trabajos_visibles(request.user), pk=pk, estatus="TERMINADO")
+    ruta = ruta_archivo(trabajo)
+    if not trabajo.archivo or not os.path.exists(ruta):
+        raise Http404("El archivo del reporte ya no está disponible.")
+
+    if trabajo.tipo == "CIERRE":
+        # El cierre deja un archivo por unidad; se descarga el manifiesto
+        content_type = "application/json"
+    elif trabajo.comprimir:
+        content_type = "application/gzip"
+    else:
+        content_type = "text/csv; charset=utf-8"
+
+    return FileResponse(
+        open(ruta, "rb"),
+        as_attachment=True,
+        filename=trabajo.nombre_descarga,
+        content_type=content_type,
+    )
+
+
+# ============================================================
+# 5. KÁRDEX MENSUAL (ADMIN / JEFE)
+# Totales por trabajador y mes ya calculados (attendance.KardexMensual):
+# un año de 10k trabajadores son ~120k filas en lugar de millones de
+# registros diarios.
+# ============================================================
+
+from django.core.paginator import Paginator
+
+from attendance.models import KardexMensual
+from .exportacion import ENCABEZADOS_KARDEX, filas_kardex
+from .forms import ReporteKardexForm
+
+CAMPOS_KARDEX = (
+    "dias_registrados", "asistencias", "retardos", "faltas",
+    "justificados", "inhabiles", "minutos_retardo", "horas_trabajadas",
+)
+
+
+def kardex_del_periodo(user, unidad, anio, mes_inicio, mes_fin):
+    """KardexMensual de [mes_inicio, mes_fin] de `anio` con el alcance del rol."""
+    kardex = KardexMensual.objects.filter(
+        mes__gte=date(anio, mes_inicio, 1),
+        mes__lte=date(anio, mes_fin, 1),
+    )
+
+    perfil = user.perfilusuario
+    if perfil.rol == "JEFE":
+        # Igual que en los demás reportes: siempre su unidad
+        return kardex.filter(unidad_id=perfil.trabajador.unidad_id)
+    if unidad is not None:
+        return kardex.filter(unidad=unidad)
+    return kardex
+
+
+class ReporteKardexView(AdminOJefeMixin, TemplateView):
+    template_name = "reports/reporte_kardex.html"
+    paginate_by = 100
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        datos = self.request.GET if "anio" in self.request.GET else None
+        form = ReporteKardexForm(
+            datos, user=self.request.user, initial={"anio": now().year}
+        )
+        context["form"] = form
+        if not form.is_valid():
+            return context
+
+        kardex = kardex_del_periodo(
+            self.request.user,
+            form.cleaned_data["unidad"],
+            form.cleaned_data["anio"],
+            form.cleaned_data["mes_inicio"],
+            form.cleaned_data["mes_fin"],
+        )
+        sumas = {campo: Sum(campo) for campo in CAMPOS_KARDEX}
+
+        # Un renglón por trabajador con la suma de sus meses
+        por_trabajador = (
+            kardex
+            .values(
+                "trabajador", "trabajador__numero_empleado",
+                "trabajador__nombre", "trabajador__apellido_paterno",
+            )
+            .annotate(**sumas)
+            .order_by("trabajador__apellido_paterno", "trabajador")
+        )
+        pagina = Paginator(por_trabajador, self.paginate_by).get_page(self.request.GET.get("page"))
+
+        consulta = self.request.GET.copy()
+        consulta.pop("page", None)
+
+        context.update({
+            "page_obj": pagina,
+            "renglones": pagina.object_list,
+            "totales": kardex.aggregate(**sumas),
+            "querystring": consulta.urlencode(),
+        })
+        return context
+
+
+@login_required
+def exportar_csv_kardex(request):
+    perfil = request.user.perfilusuario
+    if perfil.rol not in ("ADMIN", "JEFE"):
+        return HttpResponseForbidden("No tiene permiso para ver este reporte.")
+
+    form = ReporteKardexForm(request.GET, user=request.user)
+    if not form.is_valid():
+        return HttpResponse("Parámetros incompletos o inválidos", status=400)
+
+    anio = form.cleaned_data["anio"]
+    kardex = kardex_del_periodo(
+        request.user,
+        form.cleaned_data["unidad"],
+        anio,
+        form.cleaned_data["mes_inicio"],
+        form.cleaned_data["mes_fin"],
+    ).order_by("trabajador__apellido_paterno", "trabajador", "mes")
+
+    return respuesta_csv(
+        f"kardex_{anio}_{form.cleaned_data['mes_inicio']:02d}_a_{form.cleaned_data['mes_fin']:02d}",
+        ENCABEZADOS_KARDEX,
+        filas_kardex(kardex),
+        comprimir=pide_gzip(request),
+    )
+
+
+# ============================================================
+# 6. ANÁLISIS DE PUNTUALIDAD POR UNIDAD (ADMIN / JEFE)
+# ============================================================
+
+from .analitica import analizar_unidad
+
+
+class ReporteAnaliticaView(AdminOJefeMixin, TemplateView):
+    template_name = "reports/analitica_unidad.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        datos = self.request.GET if "fecha_inicio" in self.request.GET else None
+        form = ReporteUnidadForm(datos, user=self.request.user)
+        context["form"] = form
+        if not form.is_valid():
+            return context
+
+        unidad = form.cleaned_data["unidad"]
+        fi = form.cleaned_data["fecha_inicio"]
+        ff = form.cleaned_data["fecha_fin"]
+
+        # Doble seguro: si es JEFE, siempre forzamos su unidad
+        perfil = self.request.user.perfilusuario
+        if perfil.rol == "JEFE":
+            unidad = perfil.trabajador.unidad
+
+        if fi > ff:
+            form.add_error("fecha_fin", "La fecha final no puede ser anterior a la inicial.")
+            return context
+
+        context.update({
+            "unidad": unidad,
+            "fi": fi,
+            "ff": ff,
+            "consultado": True,
+            "estadisticas": valor_en_cache(
+                ("analitica_unidad", unidad.pk, fi, ff),
+                lambda: analizar_unidad(unidad.pk, fi, ff),
+                unidad_id=unidad.pk,
+            ),
+        })
+        return context
+
+
+# ============================================================
+# 7. CONSOLIDADO POR JERARQUÍA DE UNIDADES (ADMIN / JEFE)
+# Totales de una unidad y de todas sus sub-unidades en un solo reporte.
+# ============================================================
+
+from .consolidado import Totales, arbol_consolidado, recorrido
+from .forms import ReporteConsolidadoForm
+
+
+class ReporteConsolidadoView(AdminOJefeMixin, TemplateView):
+    template_name = "reports/reporte_consolidado.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        datos = self.request.GET if "fecha_inicio" in self.request.GET else None
+        form = ReporteConsolidadoForm(datos, user=self.request.user)
+        context["form"] = form
+        if not form.is_valid():
+            return context
+
+        unidad = form.cleaned_data["unidad"]
+        fi = form.cleaned_data["fecha_inicio"]
+        ff = form.cleaned_data["fecha_fin"]
+
+        # El JEFE solo puede elegir su unidad o una de sus sub-unidades
+        # (ver ReporteConsolidadoForm); sin unidad, la suya.
+        perfil = self.request.user.perfilusuario
+        if perfil.rol == "JEFE" and unidad is None:
+            unidad = perfil.trabajador.unidad
+
+        raices = arbol_consolidado(unidad.pk if unidad else None, fi, ff)
+
+        total = Totales()
+        for raiz in raices:
+            total.sumar(raiz.rama)
+
+        context.update({
+            "consultado": True,
+            "unidad": unidad,
+            "fi": fi,
+            "ff": ff,
+            "filas": recorrido(raices),
+            "total": total,
+        })
+        return context
+
+
+# ============================================================
+# 8. FEED DE CAMBIOS PARA NÓMINA (API)
+# GET /reports/api/cambios/<asistencias|incidencias>/?cursor=...
+# Primera consulta: ?desde=<fecha y hora ISO> (o nada, para todo).
+# ============================================================
+
+import hmac
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from .cambios import TIPOS, CursorInvalido, pagina_cambios
+
+TOKEN_CAMBIOS = getattr(settings, "REPORTES_CAMBIOS_TOKEN", "")
+
+
+def autorizado_cambios(request):
+    """Token de nómina en `Authorization: Token <token>` o sesión de ADMIN."""
+    tipo, _, token = request.headers.get("Authorization", "").partition(" ")
+    if TOKEN_CAMBIOS and tipo.lower() == "token":
+        return hmac.compare_digest(token.strip(), TOKEN_CAMBIOS)
+
+    return (
+        request.user.is_authenticated
+        and hasattr(request.user, "perfilusuario")
+        and request.user.perfilusuario.rol == "ADMIN"
+    )
+
+
+def api_cambios(request, tipo):
+    if request.method != "GET":
+        return JsonResponse({"error": "Solo se permite GET."}, status=405)
+    if not autorizado_cambios(request):
+        return JsonResponse({"error": "No autorizado."}, status=401)
+    if tipo not in TIPOS:
+        return JsonResponse({"error": f"Tipo desconocido; use uno de: {', '.join(TIPOS)}."}, status=404)
+
+    desde = None
+    if request.GET.get("desde"):
+        try:
+            desde = parse_datetime(request.GET["desde"])
+        except ValueError:
+            desde = None
+        if desde is None:
+            return JsonResponse({"error": "`desde` debe ser una fecha y hora ISO."}, status=400)
+        if is_naive(desde):
+            desde = make_aware(desde)
+
+    try:
+        limite = int(request.GET.get("limite") or 0) or None
+    except ValueError:
+        return JsonResponse({"error": "`limite` debe ser un número."}, status=400)
+    if limite is not None and limite < 1:
+        return JsonResponse({"error": "`limite` debe ser mayor a cero."}, status=400)
+
+    try:
+        pagina = pagina_cambios(tipo, cursor=request.GET.get("cursor"), desde=desde, limite=limite)
+    except CursorInvalido as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(pagina)
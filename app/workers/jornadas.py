@@ -0,0 +1,126 @@
+# workers/jornadas.py
+# Índice de intervalos para resolver la jornada vigente por fecha
+#
+# RegistroAsistencia.jornada_vigente() hace una consulta por registro. Para
+# procesos que recorren muchos trabajadores y días (importaciones, faltas,
+# recálculos, reportes, incidencias) conviene cargar el historial de
+# asignaciones de un conjunto de trabajadores en una sola consulta y
+# responder "¿qué jornada aplicaba el día D?" con bisect.
+
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from django.db.models import Q
+
+from .models import TrabajadorJornada
+
+
+class JornadaTimeline:
+    """
+    Por trabajador guarda segmentos disjuntos y ordenados
+    (inicio, fin, JornadaLaboral). Si dos asignaciones se traslapan gana la
+    de menor id, igual que jornada_vigente() (.first() sin ordering explícito).
+    """
+
+    def __init__(self, asignaciones=()):
+        por_trabajador = {}
+        for asignacion in asignaciones:
+            # Sin fecha de inicio nunca es vigente (fecha_inicio__lte no aplica a NULL)
+            if asignacion.trabajador_id is None or asignacion.fecha_inicio is None:
+                continue
+            por_trabajador.setdefault(asignacion.trabajador_id, []).append(asignacion)
+
+        self._inicios = {}
+        self._segmentos = {}
+        for trabajador_id, lista in por_trabajador.items():
+            segmentos = _segmentar(lista)
+            self._segmentos[trabajador_id] = segmentos
+            self._inicios[trabajador_id] = [s[0] for s in segmentos]
+
+    @classmethod
+    def cargar(cls, trabajadores=None, fi=None, ff=None):
+        """
+        Carga en una consulta las asignaciones de `trabajadores` (ids,
+        queryset o None para todos) que se traslapan con [fi, ff].
+        """
+        qs = TrabajadorJornada.objects.select_related('jornada')
+
+        if trabajadores is not None:
+            qs = qs.filter(trabajador__in=trabajadores)
+        if ff is not None:
+            qs = qs.filter(fecha_inicio__lte=ff)
+        if fi is not None:
+            qs = qs.filter(Q(fecha_fin__gte=fi) | Q(fecha_fin__isnull=True))
+
+        return cls(qs)
+
+    def __contains__(self, trabajador_id):
+        return trabajador_id in self._segmentos
+
+    def trabajadores(self):
+        return self._segmentos.keys()
+
+    def jornada(self, trabajador_id, fecha):
+        """JornadaLaboral vigente para el trabajador en `fecha`, o None."""
+        inicios = self._inicios.get(trabajador_id)
+        if not inicios:
+            return None
+
+        i = bisect_right(inicios, fecha) - 1
+        if i < 0:
+            return None
+
+        _, fin, jornada = self._segmentos[trabajador_id][i]
+        return jornada if fecha <= fin else None
+
+    def segmentos(self, trabajador_id, fi=None, ff=None):
+        """Itera (inicio, fin, jornada) recortados a [fi, ff]."""
+        for inicio, fin, jornada in self._segmentos.get(trabajador_id, ()):
+            if (ff is not None and inicio > ff) or (fi is not None and fin < fi):
+                continue
+            yield (
+                max(inicio, fi) if fi else inicio,
+                min(fin, ff) if ff else fin,
+                jornada,
+            )
+
+
+def _segmentar(asignaciones):
+    """Convierte asignaciones posiblemente traslapadas en segmentos disjuntos."""
+    limites = set()
+    for a in asignaciones:
+        limites.add(a.fecha_inicio)
+        if a.fecha_fin is not None and a.fecha_fin < date.max:
+            limites.add(a.fecha_fin + timedelta(days=1))
+    limites = sorted(limites)
+
+    segmentos = []
+    for i, inicio in enumerate(limites):
+        fin = limites[i + 1] - timedelta(days=1) if i + 1 < len(limites) else date.max
+
+        vigentes = [
+            a for a in asignaciones
+            if a.fecha_inicio <= inicio and (a.fecha_fin is None or a.fecha_fin >= inicio)
+        ]
+        if not vigentes:
+            continue
+
+        jornada = min(vigentes, key=lambda a: a.pk).jornada
+
+        # Unir con el segmento anterior si es contiguo y con la misma jornada
+        if (
+            segmentos
+            and _misma_jornada(segmentos[-1][2], jornada)
+            and segmentos[-1][1] + timedelta(days=1) == inicio
+        ):
+            segmentos[-1] = (segmentos[-1][0], fin, jornada)
+        else:
+            segmentos.append((inicio, fin, jornada))
+
+    return segmentos
+
+
+def _misma_jornada(a, b):
+    if a is None or b is None:
+        return a is b
+    return a.pk == b.pk
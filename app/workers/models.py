@@ -2,6 +2,21 @@ from django.db import models
 from core.audit import AuditMixin
 from core.models import UnidadAdministrativa, Puesto, TipoNombramiento
 from django.core.validators import RegexValidator
+import re
+import unicodedata
+
+# Abreviaturas aceptadas en JornadaLaboral.dias_semana (0 = lunes)
+DIAS_ABREVIADOS = {
+    'lunes': 0, 'lun': 0, 'lu': 0, 'l': 0,
+    'martes': 1, 'mar': 1, 'ma': 1, 'm': 1,
+    'miercoles': 2, 'mie': 2, 'mi': 2, 'x': 2,
+    'jueves': 3, 'jue': 3, 'ju': 3, 'j': 3,
+    'viernes': 4, 'vie': 4, 'vi': 4, 'v': 4,
+    'sabado': 5, 'sab': 5, 'sa': 5, 's': 5,
+    'domingo': 6, 'dom': 6, 'do': 6, 'd': 6,
+}
+
+LUNES_A_VIERNES = frozenset(range(5))
 
 class Trabajador(AuditMixin, models.Model):
     """
@@ -137,6 +152,14 @@ class JornadaLaboral(AuditMixin, models.Model):
             return f"{self.descripcion} ({self.hora_entrada.strftime('%H:%M')} - {self.hora_salida.strftime('%H:%M')})"
         return self.descripcion or "Jornada sin nombre"
 
+    def dias_laborables(self):
+        """
+        Interpreta `dias_semana` ("Lunes a Viernes (L-V)", "L,M,X,J,V", "L-S"...)
+        y regresa el conjunto de días de la semana (0 = lunes).
+        Si el texto no se puede interpretar se asume lunes a viernes.
+        """
+        return interpretar_dias_semana(self.dias_semana)
+
     class Meta:
         verbose_name = "Jornada Laboral"
         verbose_name_plural = "Jornadas Laborales"
@@ -177,3 +200,36 @@ class TrabajadorJornada(AuditMixin, models.Model):
     class Meta:
         verbose_name = "Asignación de Jornada"
         verbose_name_plural = "Historial de Jornadas"
+
+
+def interpretar_dias_semana(texto):
+    if not texto:
+        return LUNES_A_VIERNES
+
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode().lower()
+
+    # Si hay abreviatura entre paréntesis, es la forma más precisa
+    parentesis = re.search(r'\(([^)]*)\)', texto)
+    if parentesis:
+        texto = parentesis.group(1)
+
+    dias = set()
+    for parte in re.split(r'[,;/]+|\s+y\s+', texto):
+        extremos = [p for p in re.split(r'\s*(?:-|\ba\b)\s*', parte.strip()) if p]
+        numeros = [DIAS_ABREVIADOS.get(p.strip(' .')) for p in extremos]
+
+        if not numeros or None in numeros:
+            continue
+
+        if len(numeros) == 2:
+            inicio, fin = numeros
+            dia = inicio
+            while True:
+                dias.add(dia)
+                if dia == fin:
+                    break
+                dia = (dia + 1) % 7
+        else:
+            dias.update(numeros)
+
+    return frozenset(dias) or LUNES_A_VIERNES